@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+"""Benchmark suite for storage, model and CLI hot paths.
+
+Generates synthetic stores of each requested size, times the hot paths
+against them and writes machine-readable JSON so runs can be compared.
+
+Usage:
+    python benchmarks/bench.py --sizes 1000,100000 --output results.json
+    python benchmarks/bench.py --compare baseline.json --threshold 0.2
+    python benchmarks/bench.py --backends json,journal,sqlite --sizes 1000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from todo_cli import backends  # noqa: E402
+from todo_cli.models import Todo  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+WORDS = (
+    "buy call email fix review write plan book pay clean update send check read "
+    "groceries mom report bug docs invoice meeting flight taxes garage release"
+).split()
+
+
+def generate_records(count: int, seed: int = 0, done_ratio: float = 0.5) -> Iterator[dict]:
+    """Yield ``count`` synthetic todo dicts with ascending ids."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(1, count + 1):
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6)))
+        yield {
+            "id": i,
+            "title": title,
+            "description": title * 2 if rng.random() < 0.3 else None,
+            "status": "done" if rng.random() < done_ratio else "pending",
+            "created_at": (start + timedelta(seconds=i * 37)).isoformat(),
+        }
+
+
+def write_store(path: Path, count: int) -> None:
+    """Write a JSON store of ``count`` synthetic todos without holding it all in memory."""
+    with open(path, "w") as f:
+        f.write("[")
+        for i, record in enumerate(generate_records(count)):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(record, indent=2))
+        f.write("]")
+
+
+def open_storage(backend: str, path: Path):
+    """Open ``path`` with the given backend, migrating the JSON seed as needed.
+
+    A backend that keeps nothing on disk is loaded from the seed instead.
+    """
+    # sqlite migrates a todos.json seed into the todos.db next to it.
+    storage = backends.open_storage(backend, str(path.with_suffix(".db") if backend == "sqlite" else path))
+    if not storage.watch_paths():
+        with open(path) as f:
+            storage.import_todos((Todo.from_dict(r) for r in json.load(f)), keep_ids=True)
+    return storage
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    """Return the best wall time of ``repeat`` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_cli(workdir: Path, backend: str, *args: str) -> None:
+    """Run the CLI in a fresh interpreter against ``workdir``."""
+    env = dict(os.environ, PYTHONPATH=str(SRC), TODO_BACKEND=backend)
+    subprocess.run(
+        [sys.executable, "-c", "from todo_cli.cli import app; app()", *args],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+
+
+def bench_size(backend: str, size: int, repeat: int, render_limit: int) -> List[dict]:
+    """Run every benchmark against a store of ``size`` todos."""
+    results = []
+
+    def record(name: str, seconds: Optional[float], ops: int = 1, note: str = "") -> None:
+        entry = {"name": name, "backend": backend, "size": size, "seconds": seconds, "ops": ops}
+        if note:
+            entry["note"] = note
+        results.append(entry)
+        shown = "skipped" if seconds is None else f"{seconds * 1000:10.2f} ms"
+        print(f"  {backend:8} {name:24} {size:>9}  {shown} {note}", file=sys.stderr)
+
+    workdir = Path(tempfile.mkdtemp(prefix="todo-bench-"))
+    try:
+        seed = workdir / "seed.json"
+        write_store(seed, size)
+        path = workdir / "todos.json"
+
+        def fresh():
+            for p in workdir.iterdir():
+                if p != seed:
+                    p.unlink()
+            shutil.copy(seed, path)
+            return open_storage(backend, path)
+
+        middle = size // 2 or 1
+
+        record("open_and_create", timed(lambda: fresh().create("bench"), repeat))
+        storage = fresh()
+        on_disk = bool(storage.watch_paths())
+        record("create_warm", timed(lambda: storage.create("bench"), repeat))
+        record("get_all", timed(lambda: open_storage(backend, path).get_all(), repeat))
+        record("get_all_warm", timed(storage.get_all, repeat))
+        record("get_by_id", timed(lambda: open_storage(backend, path).get_by_id(middle), repeat))
+        record("get_by_id_warm", timed(lambda: storage.get_by_id(middle), repeat))
+        record("iter_first_page", timed(lambda: list(open_storage(backend, path).iter_todos(limit=50)), repeat))
+        record("update", timed(lambda: storage.update(middle, title="renamed"), repeat))
+        ids = iter(range(1, size + 1))
+        record("delete", timed(lambda: storage.delete(next(ids)), repeat))
+
+        records = list(generate_records(min(size, 100_000)))
+        record(
+            "model_round_trip",
+            timed(lambda: [Todo.from_dict(r).to_dict() for r in records], repeat),
+            ops=len(records),
+        )
+
+        if not on_disk:
+            for name in ("list_render", "cli_cold_add", "cli_cold_list_page"):
+                record(name, None, note="backend keeps nothing on disk")
+        elif size <= render_limit:
+            from typer.testing import CliRunner
+
+            from todo_cli.cli import app
+
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                runner = CliRunner()
+                record("list_render", timed(lambda: runner.invoke(app, ["--backend", backend, "list"]), 1))
+            finally:
+                os.chdir(cwd)
+        else:
+            record("list_render", None, note=f"size > --render-limit {render_limit}")
+
+        if on_disk:
+            record("cli_cold_add", timed(lambda: run_cli(workdir, backend, "add", "bench"), repeat))
+            record("cli_cold_list_page", timed(lambda: run_cli(workdir, backend, "list", "--limit", "20"), repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float) -> List[str]:
+    """Return a message for every result slower than baseline by more than ``threshold``."""
+    def key(r):
+        return (r["name"], r.get("backend", "json"), r["size"])
+
+    old = {key(r): r["seconds"] for r in baseline if r.get("seconds") is not None}
+    regressions = []
+    for r in results:
+        before = old.get(key(r))
+        if before is None or r["seconds"] is None or before <= 0:
+            continue
+        change = r["seconds"] / before - 1
+        if change > threshold:
+            regressions.append(
+                f"{r['name']} [{key(r)[1]}, {r['size']}]: "
+                f"{before * 1000:.2f} ms -> {r['seconds'] * 1000:.2f} ms (+{change:.0%})"
+            )
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmarks and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated store sizes"
+    )
+    parser.add_argument(
+        "--backends", default="json", help=f"Comma-separated backends ({','.join(backends.names())})"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions per benchmark")
+    parser.add_argument(
+        "--render-limit", type=int, default=100_000, help="Skip 'todo list' rendering above this size"
+    )
+    parser.add_argument("--output", help="Write results JSON to this file (default: stdout)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging")
+    args = parser.parse_args()
+    for backend in args.backends.split(","):
+        try:
+            backends.get_factory(backend)
+        except ValueError as e:
+            parser.error(str(e))
+
+    results: List[dict] = []
+    for backend in args.backends.split(","):
+        for size in (int(s) for s in args.sizes.split(",")):
+            results.extend(bench_size(backend, size, args.repeat, args.render_limit))
+
+    report: Dict[str, object] = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""Check the import-time budget of the todo CLI.
+
+Runs ``python -X importtime -c "import <module>"`` a few times, takes the
+fastest cumulative time for the module, and fails if it exceeds the budget
+or if any forbidden (heavy, command-specific) module was imported.
+
+Usage:
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --budget-ms 200 --forbid textual
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+DEFAULT_FORBIDDEN = ("textual", "rich.table", "sqlite3")
+
+
+def measure(module: str) -> dict:
+    """Import ``module`` in a fresh interpreter and return cumulative times in microseconds."""
+    src = Path(__file__).resolve().parent.parent / "src"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(src), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def main() -> int:
+    """Run the check and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="todo_cli.cli", help="Module to import")
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="Maximum cumulative import time")
+    parser.add_argument("--runs", type=int, default=5, help="Take the fastest of this many runs")
+    parser.add_argument(
+        "--forbid", action="append", help="Module that must not be imported (repeatable)"
+    )
+    args = parser.parse_args()
+    forbidden = args.forbid or DEFAULT_FORBIDDEN
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda times: times.get(args.module, 0))
+    elapsed_ms = best.get(args.module, 0) / 1000
+
+    ok = True
+    loaded = sorted(
+        name for name in best
+        if any(name == f or name.startswith(f + ".") for f in forbidden)
+    )
+    if loaded:
+        print(f"FAIL: {args.module} imports forbidden modules: {', '.join(loaded)}")
+        ok = False
+    if elapsed_ms > args.budget_ms:
+        print(f"FAIL: import {args.module} took {elapsed_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        ok = False
+
+    top = sorted(best.items(), key=lambda item: item[1], reverse=True)[:10]
+    print(f"import {args.module}: {elapsed_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, micros in top:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,427 @@
+"""Hot/cold partitioned JSON storage.
+
+Pending todos (and recently completed ones) live in the regular JSON store,
+which stays small. Archiving moves completed todos into
+``<file>.archive``, an append-only file of compressed blocks, each a JSON
+array of records sorted by id. ``<file>.archive.blocks`` indexes the blocks
+with their offset, codec and the ids still live in each; it is replaced
+atomically after a block is appended, so a torn append is never referenced.
+
+Blocks are only decompressed when done todos are read. Deleting or editing
+an archived todo only drops its id from the block index (an edited todo
+moves back to the hot file); the bytes are reclaimed when the archive is
+repacked. A repack writes a new generation of the block file
+(``<file>.archive.g<n>``) that the index names, so replacing the index
+switches blocks and offsets over together.
+"""
+import glob
+import heapq
+import lzma
+import os
+import re
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from todo_cli import fileformat, tracing
+from todo_cli.durability import Durability, Syncer, atomic_write
+from todo_cli.fileformat import FileFormat
+from todo_cli.locking import FileLock
+from todo_cli.models import Todo, TodoColumns, TodoStats, TodoStatus
+from todo_cli.query import Query, scan
+from todo_cli.storage import TodoStorage, _sort_by_id
+
+CODECS = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+class Archive:
+    """Append-only store of compressed blocks of done todos.
+
+    Callers hold the store's file lock around ``append``, ``discard`` and
+    ``repack``.
+    """
+
+    def __init__(self, path: Path, codec: str = "zlib", cached_blocks: int = 8, syncer: Optional[Syncer] = None):
+        """Initialize with the archive path, codec for new blocks and decompressed-block cache size."""
+        if codec not in CODECS:
+            raise ValueError(f"Unknown archive codec {codec!r}")
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".blocks")
+        self.codec = codec
+        self.cached_blocks = cached_blocks
+        self.syncer = syncer or Syncer()
+        self._sig: Optional[Tuple[int, int, int]] = None
+        self._blocks: List[dict] = []
+        self._where: Dict[int, dict] = {}
+        self._dead = 0
+        self._generation = 0
+        self.max_id = 0
+        self._decoded: "OrderedDict[int, List[dict]]" = OrderedDict()
+
+    def refresh(self) -> None:
+        """Reload the block index if another writer replaced it."""
+        try:
+            st = self.index_path.stat()
+        except FileNotFoundError:
+            sig = None
+        else:
+            sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if sig == self._sig:
+            return
+        meta = fileformat.loads(self.index_path.read_bytes()) if sig else {}
+        self._set_index(meta.get("blocks", []), meta.get("max_id", 0), meta.get("dead", 0), meta.get("generation", 0))
+        self._sig = sig
+
+    def _generation_path(self, generation: int) -> Path:
+        """Block file of a repack generation; generation 0 is the archive path itself."""
+        return self.path.with_name(f"{self.path.name}.g{generation}") if generation else self.path
+
+    @property
+    def block_path(self) -> Path:
+        """Block file the current index points into."""
+        return self._generation_path(self._generation)
+
+    def _set_index(self, blocks: List[dict], max_id: int, dead: int, generation: int = 0) -> None:
+        """Install a block index and rebuild the id lookup."""
+        self._blocks = blocks
+        self.max_id = max_id
+        self._dead = dead
+        self._generation = generation
+        self._where = {todo_id: block for block in blocks for todo_id in block["ids"]}
+        # A repack may have reused offsets for different blocks.
+        self._decoded.clear()
+
+    def _write_index(self) -> None:
+        """Atomically replace the block index with the in-memory one."""
+        blocks = [b for b in self._blocks if b["ids"]]
+        content = fileformat.dumps(
+            {"blocks": blocks, "max_id": self.max_id, "dead": self._dead, "generation": self._generation}
+        )
+        atomic_write(self.index_path, content, self.syncer)
+        self._blocks = blocks
+        st = self.index_path.stat()
+        self._sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def __contains__(self, todo_id: int) -> bool:
+        return todo_id in self._where
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _read_block(self, block: dict) -> List[dict]:
+        """Decompress a block and return its live records in id order."""
+        records = self._decoded.get(block["offset"])
+        if records is None:
+            with tracing.span("archive.decompress", records=len(block["ids"])) as span, open(self.block_path, "rb") as f:
+                f.seek(block["offset"])
+                data = f.read(block["length"])
+                span.add(bytes_read=len(data))
+                records = fileformat.loads(CODECS[block["codec"]][1](data))
+            self._decoded[block["offset"]] = records
+            while len(self._decoded) > self.cached_blocks:
+                self._decoded.popitem(last=False)
+        else:
+            self._decoded.move_to_end(block["offset"])
+        live = set(block["ids"])
+        return [r for r in records if r["id"] in live]
+
+    def get(self, todo_id: int) -> Optional[dict]:
+        """Return the archived record for ``todo_id``, decompressing one block."""
+        block = self._where.get(todo_id)
+        if block is None:
+            return None
+        return next(r for r in self._read_block(block) if r["id"] == todo_id)
+
+    def iter_records(self, after_id: Optional[int] = None) -> Iterator[dict]:
+        """Yield archived records in id order, decompressing blocks as they are reached."""
+        blocks = sorted(
+            (b for b in self._blocks if b["ids"] and (after_id is None or b["ids"][-1] > after_id)),
+            key=lambda b: b["ids"][0],
+        )
+        heap: List[Tuple[int, int, dict, Iterator[dict]]] = []
+        opened = 0
+        while heap or opened < len(blocks):
+            if opened < len(blocks) and (not heap or blocks[opened]["ids"][0] < heap[0][0]):
+                records = iter(self._read_block(blocks[opened]))
+                first = next(records, None)
+                if first is not None:
+                    heapq.heappush(heap, (first["id"], opened, first, records))
+                opened += 1
+                continue
+            _, n, record, records = heapq.heappop(heap)
+            yield record
+            following = next(records, None)
+            if following is not None:
+                heapq.heappush(heap, (following["id"], n, following, records))
+
+    def append(self, records: List[dict]) -> None:
+        """Write ``records`` as a new block and publish it in the index."""
+        records = sorted(records, key=lambda r: r["id"])
+        self._drop(r["id"] for r in records)
+        self._append_block(self.block_path, records)
+        self.max_id = max(self.max_id, records[-1]["id"])
+        self._write_index()
+
+    def _append_block(self, path: Path, records: List[dict]) -> None:
+        """Compress ``records`` onto the end of ``path`` and add the block to the in-memory index."""
+        with tracing.span("archive.compress", records=len(records)) as span:
+            data = CODECS[self.codec][0](fileformat.dumps(records))
+            span.add(bytes_written=len(data))
+        with open(path, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(data)
+            f.flush()
+            # The block must be on disk before an index naming it is.
+            self.syncer.sync(f.fileno())
+        ids = [r["id"] for r in records]
+        block = {"offset": offset, "length": len(data), "codec": self.codec, "ids": ids}
+        self._blocks.append(block)
+        self._where.update((todo_id, block) for todo_id in ids)
+
+    def _drop(self, ids: Iterable[int]) -> int:
+        """Remove ids from the blocks holding them; return how many were live."""
+        gone: Dict[int, Tuple[dict, Set[int]]] = {}
+        for todo_id in ids:
+            block = self._where.pop(todo_id, None)
+            if block is not None:
+                gone.setdefault(id(block), (block, set()))[1].add(todo_id)
+        for block, dropped in gone.values():
+            block["ids"] = [i for i in block["ids"] if i not in dropped]
+        count = sum(len(dropped) for _, dropped in gone.values())
+        self._dead += count
+        return count
+
+    def discard(self, ids: Iterable[int]) -> None:
+        """Forget archived copies of ``ids`` (deleted, or moved back to the hot file)."""
+        if self._drop(ids):
+            self._write_index()
+
+    @property
+    def garbage(self) -> int:
+        """Number of records in the archive file that are no longer live."""
+        return self._dead
+
+    def repack(self, block_size: int) -> None:
+        """Rewrite live records into fresh blocks of ``block_size``, dropping garbage.
+
+        The blocks go to the next generation's file, which only becomes live
+        when the index naming it replaces the old one; a crash before that
+        leaves the old generation in use. The generation before the new one
+        is kept for readers still holding its index, older ones are removed.
+        """
+        records = list(self.iter_records())
+        previous = self.block_path
+        generation = self._generation + 1
+        target = self._generation_path(generation)
+        target.unlink(missing_ok=True)  # left behind by a repack that never published
+        try:
+            self._blocks, self._where, self._dead = [], {}, 0
+            self._decoded.clear()
+            for start in range(0, len(records), block_size):
+                self._append_block(target, records[start:start + block_size])
+            self._generation = generation
+            self._write_index()
+        except BaseException:
+            target.unlink(missing_ok=True)
+            self._sig = None
+            self.refresh()
+            raise
+        for path in [self.path, *self.path.parent.glob(f"{glob.escape(self.path.name)}.g*")]:
+            if path not in (previous, target) and re.fullmatch(r"(\.g\d+)?", path.name[len(self.path.name):]):
+                path.unlink(missing_ok=True)
+
+
+class PartitionedTodoStorage(TodoStorage):
+    """JSON storage that keeps done todos in a compressed archive.
+
+    Reads and writes of pending todos only touch the hot file. Done todos
+    move to the archive when ``archive`` is called, or automatically once
+    more than ``archive_after`` of them sit in the hot file.
+    """
+
+    def __init__(
+        self,
+        filepath: str = "todos.json",
+        file_format: Optional[FileFormat] = None,
+        codec: str = "zlib",
+        archive_after: Optional[int] = 1000,
+        block_size: int = 1000,
+        durability: Optional[Durability] = None,
+    ):
+        """Initialize storage with the hot file path and archive settings."""
+        self.archive_path = Path(filepath).with_name(Path(filepath).name + ".archive")
+        self.archived = Archive(self.archive_path, codec, syncer=Syncer(durability))
+        self.archive_after = archive_after
+        self.block_size = block_size
+        self._leaving: Set[int] = set()
+        super().__init__(filepath, file_format, durability)
+
+    def _set_cache(self, todos: Dict[int, dict]) -> None:
+        """Cache the hot todos; ids keep counting past archived ones."""
+        super()._set_cache(todos)
+        self.archived.refresh()
+        self._max_id = max(self._max_id, self.archived.max_id)
+
+    def _commit(self, batch: List) -> None:
+        """Apply a batch, then archive if too many done todos piled up."""
+        with self._lock:
+            self._leaving = set()
+            super()._commit(batch)
+            if self.archive_after is not None and self._cache is not None:
+                done = sum(1 for t in self._cache.values() if t["status"] == TodoStatus.DONE.value)
+                if done > self.archive_after:
+                    self.archive()
+
+    def _after_save(self, todos: Dict[int, dict], changed: Set[int], loaded_sig) -> None:
+        """Drop archived copies superseded by the saved hot file."""
+        if self._leaving:
+            self.archived.discard(self._leaving)
+            self._leaving = set()
+        super()._after_save(todos, changed, loaded_sig)
+
+    def _scan(self, status: Optional[TodoStatus] = None, after_id: Optional[int] = None) -> Iterator[dict]:
+        """Merge hot and archived records by id.
+
+        Pending reads skip the archive, and cursor reads skip the archive
+        blocks that end at or before ``after_id``.
+        """
+        hot = tuple(self._load().values())
+        if status == TodoStatus.PENDING:
+            return iter(hot)
+        self.archived.refresh()
+        ids = {t["id"] for t in hot}
+        archived = (r for r in self.archived.iter_records(after_id) if r["id"] not in ids)
+        return heapq.merge(hot, archived, key=lambda r: r["id"])
+
+    def _indexable(self, todos: Dict[int, dict]) -> Iterable[dict]:
+        """Search covers archived todos too."""
+        return chain(todos.values(), (r for r in self.archived.iter_records() if r["id"] not in todos))
+
+    def get_all(self, status: Optional[TodoStatus] = None) -> List[Todo]:
+        """Get all todos, optionally filtered by status."""
+        return list(self.iter_todos(status=status))
+
+    def get_columns(self, status: Optional[TodoStatus] = None) -> TodoColumns:
+        """Get all todos as compact columns, optionally filtered by status."""
+        with self._lock:
+            records = list(self._scan(status))
+        with tracing.span("model.columns", records=len(records)):
+            columns = TodoColumns.from_records(records)
+        return columns.filter_status(status) if status else columns
+
+    def query(self, query: Query) -> List[Todo]:
+        """Run a filtered, sorted listing over hot and (unless pending-only) archived todos."""
+        with self._lock:
+            records = self._scan(query.status, query.after_id)
+        return [Todo.from_dict(t) for t in scan(records, query)]
+
+    def get_by_id(self, todo_id: int) -> Optional[Todo]:
+        """Get todo by ID from the hot file, then the archive."""
+        with self._lock:
+            t = self._load().get(todo_id)
+            if t is None:
+                self.archived.refresh()
+                t = self.archived.get(todo_id)
+        return Todo.from_dict(t) if t is not None else None
+
+    def stats(self) -> TodoStats:
+        """Return the hot file's aggregates plus the archived (done) todos."""
+        with self._lock:
+            stats = super().stats()
+            self.archived.refresh()
+            stats.counts[TodoStatus.DONE.value] += len(self.archived)
+            stats.next_id = max(stats.next_id, self.archived.max_id + 1)
+        return stats
+
+    def _savepoint(self):
+        """Also capture which archived todos are leaving the archive."""
+        return super()._savepoint(), set(self._leaving)
+
+    def _rollback(self, savepoint) -> None:
+        """Restore state captured by ``_savepoint``."""
+        parent, self._leaving = savepoint
+        super()._rollback(parent)
+
+    def _update_op(self, todo_id: int, **kwargs):
+        """Mutation updating a todo; an archived todo moves back to the hot file."""
+        if "status" in kwargs:
+            kwargs["status"] = TodoStatus(kwargs["status"]).value
+
+        def op(todos):
+            t = todos.get(todo_id)
+            if t is None:
+                if todo_id in self._leaving:
+                    return None, ()  # deleted earlier in this commit
+                self.archived.refresh()
+                t = self.archived.get(todo_id)
+                if t is None:
+                    return None, ()
+                t = dict(t)
+                todos[todo_id] = t
+                _sort_by_id(todos)
+                self._leaving.add(todo_id)
+            t.update(kwargs)
+            return Todo.from_dict(t), (todo_id,)
+
+        return op
+
+    def _delete_op(self, todo_id: int):
+        """Mutation deleting a todo from the hot file or the archive."""
+        def op(todos):
+            if todos.pop(todo_id, None) is None:
+                self.archived.refresh()
+                if todo_id not in self.archived or todo_id in self._leaving:
+                    return False, ()
+                self._leaving.add(todo_id)
+            return True, (todo_id,)
+
+        return op
+
+    def import_todos(self, todos: Iterable[Todo], chunk_size: int = 10000, keep_ids: bool = False) -> int:
+        """Bulk-insert todos; with ``keep_ids``, archived ids count as taken."""
+        if keep_ids:
+            todos = list(todos)
+            with self._lock:
+                self.archived.refresh()
+                for t in todos:
+                    if t.id in self.archived:
+                        raise ValueError(f"Todo with ID {t.id} already exists")
+        return super().import_todos(todos, chunk_size=chunk_size, keep_ids=keep_ids)
+
+    def archive(self, older_than: Optional[datetime] = None) -> int:
+        """Move done todos (created before ``older_than``, if given) to the archive.
+
+        Returns the number of todos archived. The archive is repacked once
+        more of it is garbage than live data.
+        """
+        with self._lock, FileLock(self.lock_path), tracing.span("archive.run") as span:
+            todos = self._load()
+            loaded_sig = self._cache_sig
+            cutoff = older_than.isoformat() if older_than else None
+            moving = [
+                t for t in todos.values()
+                if t["status"] == TodoStatus.DONE.value and (cutoff is None or t["created_at"] < cutoff)
+            ]
+            if not moving:
+                return 0
+            for start in range(0, len(moving), self.block_size):
+                self.archived.append(moving[start:start + self.block_size])
+            for t in moving:
+                del todos[t["id"]]
+            self._save(todos)
+            # The same todos exist, just elsewhere: only restamp the search index.
+            self._after_save(todos, (), loaded_sig)
+            if self.archived.garbage > len(self.archived):
+                self.archived.repack(self.block_size)
+            span.add(records=len(moving))
+        return len(moving)
+
+    def watch_paths(self) -> List[Path]:
+        """Files whose changes mean another writer touched the store."""
+        return [self.filepath, self.archived.index_path]
@@ -0,0 +1,108 @@
+"""Asyncio front end for the todo storage backends.
+
+``AsyncTodoStorage`` runs the blocking storage calls in an executor so file
+I/O and JSON parsing never block the event loop. Identical reads issued
+while one is already in flight share its result, and concurrent writes run
+on separate threads where the backend's group commit (``TodoStorage``)
+folds them into one save.
+"""
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from itertools import islice
+from typing import AsyncIterator, Callable, Dict, Hashable, Iterable, List, Optional
+
+from todo_cli.batch import BatchOp, BatchResult
+from todo_cli.models import Todo, TodoStats, TodoStatus
+from todo_cli.backends import Storage, open_storage
+
+
+class AsyncTodoStorage:
+    """Awaitable wrapper around a storage backend.
+
+    A read only joins an in-flight read that started after the caller's
+    last completed write, so a task always sees its own writes.
+    """
+
+    def __init__(self, storage: Optional[Storage] = None, executor: Optional[Executor] = None):
+        """Initialize with a storage backend (the configured one by default) and executor.
+
+        With no executor, the event loop's default thread pool is used.
+        """
+        self.storage = storage if storage is not None else open_storage()
+        self.executor = executor
+        self._reads: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        """Run a blocking call in the executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def _read(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """Run a read, sharing the result with identical reads in flight."""
+        key = (key, self._generation)
+        future = self._reads.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+            self._reads[key] = future
+            future.add_done_callback(lambda f: self._reads.pop(key, None) if self._reads.get(key) is f else None)
+        # One caller giving up must not cancel the read for the others.
+        return await asyncio.shield(future)
+
+    async def _write(self, fn: Callable, *args, **kwargs):
+        """Run a write; later reads will not join reads started before it."""
+        try:
+            return await self._run(fn, *args, **kwargs)
+        finally:
+            self._generation += 1
+
+    async def create(self, title: str, description: Optional[str] = None) -> Todo:
+        """Create a new todo."""
+        return await self._write(self.storage.create, title, description)
+
+    async def get_all(self, status: Optional[TodoStatus] = None) -> List[Todo]:
+        """Get all todos, optionally filtered by status."""
+        return list(await self._read(("get_all", status), self.storage.get_all, status))
+
+    async def get_by_id(self, todo_id: int) -> Optional[Todo]:
+        """Get todo by ID."""
+        return await self._read(("get_by_id", todo_id), self.storage.get_by_id, todo_id)
+
+    async def update(self, todo_id: int, **kwargs) -> Optional[Todo]:
+        """Update todo by ID."""
+        return await self._write(self.storage.update, todo_id, **kwargs)
+
+    async def delete(self, todo_id: int) -> bool:
+        """Delete todo by ID."""
+        return await self._write(self.storage.delete, todo_id)
+
+    async def apply_batch(self, ops: Iterable[BatchOp], atomic: bool = False) -> List[BatchResult]:
+        """Run add/complete/delete operations in one transaction."""
+        return await self._write(self.storage.apply_batch, list(ops), atomic)
+
+    async def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Todo]:
+        """Find todos whose title or description contain every query word."""
+        return list(await self._read(("search", query, limit, prefix), self.storage.search, query, limit, prefix))
+
+    async def stats(self) -> TodoStats:
+        """Return counts per status, the next id and the last write time."""
+        return await self._read("stats", self.storage.stats)
+
+    async def iter_todos(
+        self,
+        status: Optional[TodoStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[Todo]:
+        """Stream todos, fetching ``chunk_size`` at a time in the executor."""
+        todos = self.storage.iter_todos(status=status, limit=limit, offset=offset, after_id=after_id)
+        while True:
+            chunk = await self._run(lambda: list(islice(todos, chunk_size)))
+            for todo in chunk:
+                yield todo
+            if len(chunk) < chunk_size:
+                return
@@ -0,0 +1,152 @@
+"""Storage backend protocol and registry.
+
+Every backend implements ``Storage``. The CLI, the daemon and the TUI only
+talk to stores through it, and open them with ``open_storage``, which picks
+the backend and the store location from, in order:
+
+- explicit arguments (``todo --backend ... --store ...``),
+- ``TODO_BACKEND`` and ``TODO_STORE``,
+- the backend's default file in the working directory.
+
+Backends are registered by name with a factory taking the store path (None
+for the default). Third-party engines can ``register`` themselves, or be
+installed under the ``todo_cli.backends`` entry point group, and are then
+selectable like the built-in ones.
+"""
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Protocol, runtime_checkable
+
+from todo_cli.batch import BatchOp, BatchResult
+from todo_cli.models import Todo, TodoColumns, TodoStats, TodoStatus
+from todo_cli.query import Query
+
+ENTRY_POINT_GROUP = "todo_cli.backends"
+DEFAULT_BACKEND = "json"
+
+
+@runtime_checkable
+class Storage(Protocol):
+    """Operations every storage backend provides.
+
+    Backend-specific maintenance (``convert`` on the JSON store, ``archive``
+    on the partitioned one, ``close``) is not part of the protocol.
+    """
+
+    def create(self, title: str, description: Optional[str] = None) -> Todo: ...
+
+    def get_all(self, status: Optional[TodoStatus] = None) -> List[Todo]: ...
+
+    def get_columns(self, status: Optional[TodoStatus] = None) -> TodoColumns: ...
+
+    def iter_todos(
+        self,
+        status: Optional[TodoStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+    ) -> Iterator[Todo]: ...
+
+    def query(self, query: Query) -> List[Todo]: ...
+
+    def get_by_id(self, todo_id: int) -> Optional[Todo]: ...
+
+    def update(self, todo_id: int, **kwargs) -> Optional[Todo]: ...
+
+    def delete(self, todo_id: int) -> bool: ...
+
+    def apply_batch(self, ops: Iterable[BatchOp], atomic: bool = False) -> List[BatchResult]: ...
+
+    def import_todos(self, todos: Iterable[Todo], chunk_size: int = 10000, keep_ids: bool = False) -> int: ...
+
+    def stats(self) -> TodoStats: ...
+
+    def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Todo]: ...
+
+    def watch_paths(self) -> List[Path]: ...
+
+
+Factory = Callable[[Optional[str]], Storage]
+
+_registry: Dict[str, Factory] = {}
+
+
+def register(name: str, factory: Factory) -> None:
+    """Make a backend selectable as ``name``; replaces any previous one."""
+    _registry[name] = factory
+
+
+def _entry_points():
+    """Installed backend entry points."""
+    from importlib.metadata import entry_points
+
+    return entry_points(group=ENTRY_POINT_GROUP)
+
+
+def names() -> List[str]:
+    """Names of every registered and installed backend."""
+    return list(dict.fromkeys([*_registry, *(ep.name for ep in _entry_points())]))
+
+
+def get_factory(name: str) -> Factory:
+    """Return the factory registered as ``name``; raises ``ValueError`` if there is none."""
+    if name not in _registry:
+        for ep in _entry_points():
+            if ep.name == name:
+                register(name, ep.load())
+                break
+        else:
+            raise ValueError(f"Unknown storage backend {name!r} (available: {', '.join(names())})")
+    return _registry[name]
+
+
+def selected_backend(name: Optional[str] = None) -> str:
+    """Return ``name``, or the configured backend if it is None."""
+    return name or os.environ.get("TODO_BACKEND") or DEFAULT_BACKEND
+
+
+def open_storage(name: Optional[str] = None, path: Optional[str] = None) -> Storage:
+    """Open a store with the selected backend at the selected location."""
+    path = path or os.environ.get("TODO_STORE") or None
+    return get_factory(selected_backend(name))(path)
+
+
+def _json(path: Optional[str]) -> Storage:
+    from todo_cli.storage import TodoStorage
+    return TodoStorage(path or "todos.json")
+
+
+def _journal(path: Optional[str]) -> Storage:
+    from todo_cli.journal import JournalTodoStorage
+    return JournalTodoStorage(path or "todos.json")
+
+
+def _sqlite(path: Optional[str]) -> Storage:
+    from todo_cli.sqlite_storage import SqliteTodoStorage
+    if path is None:
+        return SqliteTodoStorage()
+    source = Path(path).with_suffix(".json")
+    return SqliteTodoStorage(path, migrate_from=str(source) if source != Path(path) else None)
+
+
+def _indexed(path: Optional[str]) -> Storage:
+    from todo_cli.offsets import IndexedTodoStorage
+    return IndexedTodoStorage(path or "todos.json")
+
+
+def _partitioned(path: Optional[str]) -> Storage:
+    from todo_cli.archive import PartitionedTodoStorage
+    return PartitionedTodoStorage(path or "todos.json")
+
+
+def _memory(path: Optional[str]) -> Storage:
+    from todo_cli.memory import MemoryTodoStorage
+    return MemoryTodoStorage()
+
+
+register("json", _json)
+register("journal", _journal)
+register("sqlite", _sqlite)
+register("indexed", _indexed)
+register("partitioned", _partitioned)
+register("memory", _memory)
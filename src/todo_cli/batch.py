@@ -0,0 +1,117 @@
+"""Batches of todo operations applied in one storage transaction.
+
+``todo batch`` reads one operation per line, either shell-style words or
+a JSON object:
+
+    add "Buy milk" "2 litres"
+    complete 3 4 5
+    delete 7
+    {"op": "add", "title": "Call Bob", "description": null}
+    {"op": "complete", "id": 8}
+
+Blank lines and lines starting with ``#`` are skipped. Every backend's
+``apply_batch`` runs the whole list with one load and one write.
+"""
+import json
+import shlex
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterable, Iterator, Optional
+
+from todo_cli.models import Todo
+
+
+class BatchAction(str, Enum):
+    """Operations a batch can contain."""
+    ADD = "add"
+    COMPLETE = "complete"
+    DELETE = "delete"
+
+
+@dataclass
+class BatchOp:
+    """One operation of a batch: an ``add`` with its title, or an id to complete or delete."""
+
+    action: BatchAction
+    todo_id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        if self.action == BatchAction.ADD:
+            return {"op": self.action.value, "title": self.title, "description": self.description}
+        return {"op": self.action.value, "id": self.todo_id}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BatchOp":
+        """Create from dictionary; raises ``ValueError`` if it is not a valid operation."""
+        action = BatchAction(data.get("op"))
+        if action == BatchAction.ADD:
+            if not isinstance(data.get("title"), str):
+                raise ValueError("add needs a title")
+            return cls(action, title=data["title"], description=data.get("description"))
+        if not isinstance(data.get("id"), int):
+            raise ValueError(f"{action.value} needs an integer id")
+        return cls(action, todo_id=data["id"])
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one operation: the todo it touched, or why it failed."""
+
+    op: BatchOp
+    todo: Optional[Todo] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "op": self.op.to_dict(),
+            "todo": self.todo.to_dict() if self.todo is not None else None,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BatchResult":
+        """Create from dictionary."""
+        todo = Todo.from_dict(data["todo"]) if data.get("todo") is not None else None
+        return cls(BatchOp.from_dict(data["op"]), todo, data.get("error"))
+
+
+def not_found(op: BatchOp) -> BatchResult:
+    """Result for an operation on an id that does not exist."""
+    return BatchResult(op, error=f"Todo with ID {op.todo_id} not found")
+
+
+def _parse_words(words: list) -> Iterator[BatchOp]:
+    """Operations from one shell-style line."""
+    action = BatchAction(words[0])
+    if action == BatchAction.ADD:
+        if not 2 <= len(words) <= 3:
+            raise ValueError("usage: add TITLE [DESCRIPTION]")
+        yield BatchOp(action, title=words[1], description=words[2] if len(words) == 3 else None)
+        return
+    if len(words) < 2:
+        raise ValueError(f"usage: {action.value} ID [ID...]")
+    for word in words[1:]:
+        yield BatchOp(action, todo_id=int(word))
+
+
+def parse_batch(lines: Iterable[str]) -> Iterator[BatchOp]:
+    """Parse batch input; a bad line raises ``ValueError`` naming its line number."""
+    for n, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            if line.startswith("{"):
+                yield BatchOp.from_dict(json.loads(line))
+            else:
+                yield from list(_parse_words(shlex.split(line)))
+        except ValueError as e:
+            raise ValueError(f"Invalid operation on line {n}: {e}") from e
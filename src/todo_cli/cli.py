@@ -1,22 +1,166 @@
-"""CLI commands for todo app using typer and rich for beautiful output."""
+"""CLI commands for todo app using typer and rich for beautiful output.
+
+Heavy dependencies (textual for the TUI, rich for output) are imported
+inside the commands that need them, so importing this module only pays for
+typer, and scripted calls writing plain output (``todo list --format ids``,
+``todo export``) never load rich at all. Check with
+``python scripts/check_import_time.py``.
+"""
+import json
+import shlex
+import sys
+from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import typer
-from rich.console import Console
-from rich.table import Table
+from click.core import ParameterSource
+
+from todo_cli import backends, durability, tracing
+from todo_cli.batch import BatchAction, BatchOp, BatchResult, parse_batch
+from todo_cli.durability import Durability
+from todo_cli.fileformat import FileFormat
+from todo_cli.models import Todo, TodoStatus
+from todo_cli.query import Query, SortKey
+from todo_cli.transfer import (
+    ListFormat,
+    TransferFormat,
+    chunked,
+    detect_format,
+    read_records,
+    validate_records,
+    write_listing,
+    write_records,
+)
+
+if TYPE_CHECKING:
+    from rich.table import Table
+
+
+class _Console:
+    """The rich console, created on first print.
+
+    ``rich.console`` imports ``rich.table`` itself, so it is deferred like
+    the table.
+    """
+
+    def __init__(self):
+        self._console = None
+
+    def print(self, *args, **kwargs) -> None:
+        """Print through ``rich.console.Console.print``."""
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console()
+        self._console.print(*args, **kwargs)
 
-from todo_cli.models import TodoStatus
-from todo_cli.storage import TodoStorage
-from todo_cli.tui import run_tui
 
 app = typer.Typer(help="╔═══════════════════════════════════════╗\n║      ✦ CLI Todo App ✦               ║\n╚═══════════════════════════════════════╝")
-console = Console()
+console = _Console()
+storage_app = typer.Typer(help="Maintain the todo store")
+app.add_typer(storage_app, name="storage")
+
+
+state = {"backend": backends.DEFAULT_BACKEND, "store": None, "daemon": True, "durability": None}
+
+
+def _check_backend(name: str) -> str:
+    """Reject names that no registered or installed backend has."""
+    try:
+        backends.get_factory(name)
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    return name
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    backend: str = typer.Option(
+        backends.DEFAULT_BACKEND,
+        "--backend",
+        "-b",
+        envvar="TODO_BACKEND",
+        callback=_check_backend,
+        help="Storage backend: json, journal, sqlite, indexed, partitioned, memory or an installed one",
+    ),
+    store: Optional[str] = typer.Option(
+        None, "--store", envvar="TODO_STORE", help="Store file (default: the backend's file in this directory)"
+    ),
+    profile: bool = typer.Option(False, "--profile", help="Print a per-phase timing summary to stderr"),
+    profile_output: Optional[Path] = typer.Option(
+        None, "--profile-output", help="Append trace spans to this file as JSON lines"
+    ),
+    cprofile: Optional[Path] = typer.Option(None, "--cprofile", help="Write a cProfile dump to this file"),
+    daemon: bool = typer.Option(
+        True, "--daemon/--no-daemon", envvar="TODO_DAEMON", help="Use a running 'todo serve' if there is one"
+    ),
+    durability_policy: Durability = typer.Option(
+        Durability.ALWAYS, "--durability", envvar="TODO_DURABILITY", help="When writes are fsynced to disk"
+    ),
+):
+    """Manage todos from the command line."""
+    state["backend"] = backend
+    state["store"] = store
+    state["daemon"] = daemon
+    durability.configure(durability_policy)
+    # Only a policy asked for explicitly has to match a running daemon's.
+    explicit = ctx.get_parameter_source("durability_policy") != ParameterSource.DEFAULT
+    state["durability"] = durability_policy if explicit else None
+
+    if cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump_profile():
+            profiler.disable()
+            profiler.dump_stats(str(cprofile))
+
+        ctx.call_on_close(dump_profile)
+
+    if profile or profile_output:
+        tracing.enable()
+
+        def report():
+            tracing.report(str(profile_output) if profile_output else None)
+            tracing.disable()
+            tracing.reset()
+
+        ctx.call_on_close(report)
+
+    if tracing.ENABLED:
+        command_span = tracing.span(f"cli.{ctx.invoked_subcommand}")
+        command_span.__enter__()
+        ctx.call_on_close(lambda: command_span.__exit__(None, None, None))
+
+
+def get_storage():
+    """Get storage for the selected backend, through its daemon if one is running."""
+    if state["daemon"]:
+        from todo_cli.daemon import connect, socket_path
+
+        remote = connect(socket_path(state["backend"], state["store"]))
+        if remote is not None:
+            wanted = state["durability"]
+            served = remote.durability() if wanted is not None else None
+            if served is not None and served != wanted.value:
+                remote.close()
+                console.print(
+                    f"\n[bold red]✗ Error:[/bold red] the running daemon writes with --durability {served}; "
+                    f"restart it with --durability {wanted.value}, or pass --no-daemon"
+                )
+                raise typer.Exit(1)
+            return remote
+    return open_storage()
 
 
-def get_storage() -> TodoStorage:
-    """Get storage instance."""
-    return TodoStorage()
+def open_storage():
+    """Open the store of the selected backend directly."""
+    return backends.open_storage(state["backend"], state["store"])
 
 
 @app.command()
@@ -40,31 +184,161 @@ def add(
         console.print(f"   [dim]Description:[/dim] {todo.description}")
 
 
+def _todo_table(title: Optional[str]) -> "Table":
+    """Create an empty todo table."""
+    from rich.table import Table
+
+    table = Table(title=title, show_header=True, header_style="bold magenta")
+    table.add_column("ID", style="cyan", width=6)
+    table.add_column("Title", style="white")
+    table.add_column("Status", style="yellow", width=10)
+    table.add_column("Created", style="dim", width=20)
+    return table
+
+
 @app.command()
 def list(
     status: Optional[TodoStatus] = typer.Option(None, "--status", "-s", help="Filter by status"),
+    limit: Optional[int] = typer.Option(None, "--limit", "-n", min=0, help="Show at most this many todos"),
+    offset: int = typer.Option(0, "--offset", min=0, help="Skip this many todos"),
+    after: Optional[int] = typer.Option(None, "--after", help="Only show todos with an ID above this cursor"),
+    since: Optional[datetime] = typer.Option(None, "--since", help="Only todos created at or after this time"),
+    until: Optional[datetime] = typer.Option(None, "--until", help="Only todos created before this time"),
+    title_prefix: Optional[str] = typer.Option(
+        None, "--title-prefix", help="Only todos whose title starts with this (case-insensitive)"
+    ),
+    sort: Optional[SortKey] = typer.Option(None, "--sort", help="Sort order (default: id)"),
+    reverse: bool = typer.Option(False, "--reverse", help="Reverse the sort order"),
+    page_size: int = typer.Option(500, "--page-size", min=1, help="Rows rendered per table"),
+    fmt: ListFormat = typer.Option(ListFormat.TABLE, "--format", "-f", help="Output format"),
+    no_color: bool = typer.Option(False, "--no-color", help="Plain-text table without styling (faster)"),
+    max_rows: int = typer.Option(
+        10000, "--max-rows", min=0, help="Cap table rows when no --limit is given (0 for no cap)"
+    ),
 ):
     """List all todos.
 
+    Todos are streamed from storage and rendered one page at a time, so
+    memory use depends on the page size rather than the store size. The
+    json, jsonl, tsv and ids formats write straight to stdout for piping
+    and are never capped. Date, title and sort options run through the
+    storage's sorted indexes.
+
     Examples:
         todo list
         todo list --status pending
         todo list -s done
+        todo list --limit 20 --offset 40
+        todo list --limit 20 --after 120
+        todo list --since 2025-01-01 --until 2025-02-01 --sort created
+        todo list --title-prefix "fix" --sort title --reverse
+        todo list --format jsonl | jq .title
+        todo list --format ids --status done
+    """
+    storage = get_storage()
+    queried = bool(since or until or title_prefix is not None or sort or reverse)
+
+    def fetch(count: Optional[int]):
+        if queried:
+            return iter(storage.query(Query(
+                status=status, since=since, until=until, title_prefix=title_prefix, after_id=after,
+                sort=sort or SortKey.ID, reverse=reverse, limit=count, offset=offset,
+            )))
+        return iter(storage.iter_todos(status=status, limit=count, offset=offset, after_id=after))
+
+    if fmt != ListFormat.TABLE:
+        with tracing.span("cli.write") as span:
+            span.add(records=write_listing(fetch(limit), sys.stdout, fmt))
+        return
+
+    if limit is None and max_rows:
+        limit = max_rows
+    # Fetch one extra row to know whether a next page exists.
+    todos = fetch(None if limit is None else limit + 1)
+
+    shown = 0
+    last_id = None
+    with tracing.span("cli.render") as span:
+        for page in chunked(islice(todos, limit), page_size):
+            if no_color:
+                _print_plain_page(page, header=shown == 0)
+            else:
+                _print_table_page(page, header=shown == 0)
+            shown += len(page)
+            last_id = page[-1].id
+        span.add(records=shown)
+
+    echo = typer.echo if no_color else lambda text: console.print(f"[dim]{text}[/dim]")
+    if not shown:
+        echo("\n╶ No todos found. Use 'todo add' to create one.")
+    elif limit is not None and next(todos, None) is not None:
+        args = []
+        if status:
+            args += ["--status", status.value]
+        if since:
+            args += ["--since", since.isoformat()]
+        if until:
+            args += ["--until", until.isoformat()]
+        if title_prefix is not None:
+            args += ["--title-prefix", shlex.quote(title_prefix)]
+        if sort:
+            args += ["--sort", sort.value]
+        if reverse:
+            args.append("--reverse")
+        args += ["--limit", str(limit)]
+        if sort in (None, SortKey.ID) and not reverse:
+            args += ["--after", str(last_id)]
+        else:
+            if after is not None:
+                args += ["--after", str(after)]
+            args += ["--offset", str(offset + shown)]
+        echo(f"╶ Next page: todo list {' '.join(args)}")
+
+
+def _print_table_page(page: List[Todo], header: bool) -> None:
+    """Print one page of todos as a rich table."""
+    table = _todo_table("\n✦ Your Todos" if header else None)
+    for todo in page:
+        status_style = "green" if todo.status == TodoStatus.DONE else "yellow"
+        table.add_row(
+            str(todo.id),
+            todo.title,
+            f"[{status_style}]{todo.status.value}[/{status_style}]",
+            todo.created_at[:10],
+        )
+    if header:
+        console.print("\n")
+    console.print(table)
+
+
+def _print_plain_page(page: List[Todo], header: bool) -> None:
+    """Print one page of todos as fixed-width plain text."""
+    lines = [f"{'ID':<6} {'Status':<8} {'Created':<10} Title"] if header else []
+    lines.extend(f"{t.id:<6} {t.status.value:<8} {t.created_at[:10]:<10} {t.title}" for t in page)
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+@app.command()
+def search(
+    query: str = typer.Argument(..., help="Words to search for"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Maximum results"),
+    exact: bool = typer.Option(False, "--exact", help="Match whole words only, not prefixes"),
+):
+    """Search todo titles and descriptions, best matches first.
+
+    Examples:
+        todo search groceries
+        todo search "rep bug" --limit 5
+        todo search invoice --exact
     """
     storage = get_storage()
-    todos = storage.get_all(status=status)
+    todos = storage.search(query, limit=limit, prefix=not exact)
 
     if not todos:
-        console.print("\n[dim]╶ No todos found. Use 'todo add' to create one.[/dim]")
+        console.print(f"\n[dim]╶ No todos match '{query}'.[/dim]")
         return
 
-    # Create beautiful table
-    table = Table(title="\n✦ Your Todos", show_header=True, header_style="bold magenta")
-    table.add_column("ID", style="cyan", width=6)
-    table.add_column("Title", style="white")
-    table.add_column("Status", style="yellow", width=10)
-    table.add_column("Created", style="dim", width=20)
-
+    table = _todo_table(f"\n✦ Matches for '{query}'")
     for todo in todos:
         status_style = "green" if todo.status == TodoStatus.DONE else "yellow"
         table.add_row(
@@ -73,21 +347,55 @@ def list(
             f"[{status_style}]{todo.status.value}[/{status_style}]",
             todo.created_at[:10],
         )
-
     console.print("\n")
     console.print(table)
 
 
+def _selected_ops(storage, action: BatchAction, todo_ids: Optional[List[int]], status: Optional[TodoStatus]) -> List[BatchOp]:
+    """Batch operations for the ids given on the command line plus those matching ``status``."""
+    ids = dict.fromkeys(todo_ids or [])
+    if status is not None:
+        ids.update(dict.fromkeys(t.id for t in storage.iter_todos(status=status)))
+    return [BatchOp(action, todo_id=i) for i in ids]
+
+
+def _report_batch(results: List[BatchResult], atomic: bool, done: str) -> None:
+    """Print failed items and a summary; exit 1 if any item failed."""
+    failed = [r for r in results if not r.ok]
+    for r in failed:
+        console.print(f"[bold red]✗ {r.op.action.value} {r.op.todo_id or r.op.title}:[/bold red] {r.error}")
+    if failed and atomic:
+        console.print(f"\n[bold red]✗ {len(failed)} of {len(results)} operations failed; nothing was changed[/bold red]")
+    else:
+        console.print(f"\n✨ [bold green]{len(results) - len(failed)} todos {done}[/bold green]")
+    if failed:
+        raise typer.Exit(1)
+
+
 @app.command()
 def complete(
-    todo_id: int = typer.Argument(..., help="Todo ID to complete"),
+    todo_ids: Optional[List[int]] = typer.Argument(None, help="Todo IDs to complete"),
+    status: Optional[TodoStatus] = typer.Option(None, "--status", "-s", help="Also complete every todo with this status"),
+    atomic: bool = typer.Option(False, "--atomic", help="Change nothing if any todo is missing"),
 ):
-    """Mark a todo as done.
+    """Mark todos as done.
+
+    Several ids, or a status filter, are completed in one transaction.
 
     Examples:
         todo complete 1
+        todo complete 3 4 5 --atomic
+        todo complete --status pending
     """
     storage = get_storage()
+    if status is not None or len(todo_ids or []) != 1:
+        if status is None and not todo_ids:
+            console.print("\n[bold red]✗ Error:[/bold red] Give todo ids or --status")
+            raise typer.Exit(1)
+        ops = _selected_ops(storage, BatchAction.COMPLETE, todo_ids, status)
+        _report_batch(storage.apply_batch(ops, atomic=atomic), atomic, "marked as done")
+        return
+    todo_id = todo_ids[0]
     todo = storage.get_by_id(todo_id)
 
     if not todo:
@@ -104,14 +412,28 @@ def complete(
 
 @app.command()
 def delete(
-    todo_id: int = typer.Argument(..., help="Todo ID to delete"),
+    todo_ids: Optional[List[int]] = typer.Argument(None, help="Todo IDs to delete"),
+    status: Optional[TodoStatus] = typer.Option(None, "--status", "-s", help="Also delete every todo with this status"),
+    atomic: bool = typer.Option(False, "--atomic", help="Change nothing if any todo is missing"),
 ):
-    """Delete a todo.
+    """Delete todos.
+
+    Several ids, or a status filter, are deleted in one transaction.
 
     Examples:
         todo delete 1
+        todo delete 3 4 5
+        todo delete --status done
     """
     storage = get_storage()
+    if status is not None or len(todo_ids or []) != 1:
+        if status is None and not todo_ids:
+            console.print("\n[bold red]✗ Error:[/bold red] Give todo ids or --status")
+            raise typer.Exit(1)
+        ops = _selected_ops(storage, BatchAction.DELETE, todo_ids, status)
+        _report_batch(storage.apply_batch(ops, atomic=atomic), atomic, "deleted")
+        return
+    todo_id = todo_ids[0]
     todo = storage.get_by_id(todo_id)
 
     if not todo:
@@ -125,6 +447,203 @@ def delete(
     console.print(f"\n[bold red]✗ Todo {todo_id} deleted[/bold red]")
 
 
+@app.command()
+def batch(
+    source: str = typer.Argument("-", help="File of operations ('-' for stdin)"),
+    atomic: bool = typer.Option(False, "--atomic", help="Apply all operations or none"),
+):
+    """Run add/complete/delete operations from a file in one transaction.
+
+    One operation per line, shell-quoted or as a JSON object:
+    'add TITLE [DESCRIPTION]', 'complete ID [ID...]', 'delete ID [ID...]',
+    '{"op": "complete", "id": 3}'. Failed items are reported and the
+    rest still apply, unless --atomic is given.
+
+    Examples:
+        todo batch ops.txt
+        printf 'complete 1 2\\ndelete 3\\n' | todo batch --atomic
+    """
+    try:
+        fp = sys.stdin if source == "-" else open(source)
+    except OSError as e:
+        console.print(f"\n[bold red]✗ Error:[/bold red] {e}")
+        raise typer.Exit(1)
+    try:
+        ops = tuple(parse_batch(fp))
+    except ValueError as e:
+        console.print(f"\n[bold red]✗ Error:[/bold red] {e}")
+        raise typer.Exit(1)
+    finally:
+        if fp is not sys.stdin:
+            fp.close()
+    _report_batch(get_storage().apply_batch(ops, atomic=atomic), atomic, "changed")
+
+
+@app.command("import")
+def import_todos(
+    source: str = typer.Argument(..., help="File to import ('-' for stdin)"),
+    fmt: Optional[TransferFormat] = typer.Option(
+        None, "--format", "-f", help="Input format (default: from file extension)"
+    ),
+    chunk_size: int = typer.Option(10000, "--chunk-size", min=1, help="Records per commit"),
+    keep_ids: bool = typer.Option(False, "--keep-ids", help="Keep ids from the file instead of renumbering"),
+):
+    """Import todos from a JSONL or CSV file.
+
+    Examples:
+        todo import backup.jsonl
+        todo import todos.csv --keep-ids
+        cat dump.jsonl | todo import - --format jsonl
+    """
+    fmt = fmt or detect_format(source)
+    storage = get_storage()
+    try:
+        fp = sys.stdin if source == "-" else open(source, newline="")
+    except OSError as e:
+        console.print(f"\n[bold red]✗ Error:[/bold red] {e}")
+        raise typer.Exit(1)
+
+    try:
+        records = validate_records(read_records(fp, fmt), keep_ids=keep_ids)
+        count = storage.import_todos(records, chunk_size=chunk_size, keep_ids=keep_ids)
+    except ValueError as e:
+        console.print(f"\n[bold red]✗ Error:[/bold red] {e}")
+        raise typer.Exit(1)
+    finally:
+        if fp is not sys.stdin:
+            fp.close()
+
+    console.print(f"\n✨ [bold green]Imported {count} todos[/bold green]")
+
+
+@app.command()
+def export(
+    destination: str = typer.Argument("-", help="File to write ('-' for stdout)"),
+    fmt: Optional[TransferFormat] = typer.Option(
+        None, "--format", "-f", help="Output format (default: from file extension)"
+    ),
+    status: Optional[TodoStatus] = typer.Option(None, "--status", "-s", help="Filter by status"),
+):
+    """Export todos to a JSONL or CSV file.
+
+    Examples:
+        todo export backup.jsonl
+        todo export todos.csv --status pending
+        todo export --format csv > todos.csv
+    """
+    fmt = fmt or detect_format(None if destination == "-" else destination)
+    storage = get_storage()
+    todos = storage.iter_todos(status=status)
+
+    if destination == "-":
+        write_records(todos, sys.stdout, fmt)
+        return
+
+    with open(destination, "w", newline="") as fp:
+        count = write_records(todos, fp, fmt)
+    console.print(f"\n✨ [bold green]Exported {count} todos to {destination}[/bold green]")
+
+
+@app.command()
+def stats(
+    as_json: bool = typer.Option(False, "--json", help="Print the stats as JSON"),
+):
+    """Show counts per status, the next id and the last write time.
+
+    Reads only the store's stats record, not the todos themselves.
+
+    Examples:
+        todo stats
+        todo stats --json
+    """
+    storage = get_storage()
+    result = storage.stats()
+    if as_json:
+        sys.stdout.write(json.dumps({**result.to_dict(), "total": result.total}) + "\n")
+        return
+    console.print(f"\n[bold]✦ {result.total} todos[/bold]")
+    for status in TodoStatus:
+        style = "green" if status == TodoStatus.DONE else "yellow"
+        console.print(f"  [{style}]{status.value:<8}[/{style}] {result.counts.get(status.value, 0)}")
+    console.print(f"  [dim]next id  {result.next_id}[/dim]")
+    console.print(f"  [dim]modified {result.modified or 'unknown'}[/dim]")
+
+
+@storage_app.command("convert")
+def storage_convert(
+    to: FileFormat = typer.Option(FileFormat.COMPACT, "--to", help="Layout to write"),
+):
+    """Rewrite the JSON store in another layout and keep saving in it.
+
+    Legacy stores are upgraded to the versioned format automatically; use
+    this to switch between the compact and pretty layouts.
+
+    Examples:
+        todo storage convert
+        todo storage convert --to pretty
+    """
+    if state["backend"] != "json":
+        console.print("\n[bold red]✗ Error:[/bold red] storage convert only applies to the json backend")
+        raise typer.Exit(1)
+    storage = get_storage()
+    count = storage.convert(to)
+    console.print(f"\n✨ [bold green]Converted {count} todos to the {to.value} layout[/bold green]")
+
+
+@app.command()
+def archive(
+    older_than: Optional[int] = typer.Option(
+        None, "--older-than", min=0, help="Only archive done todos created more than this many days ago"
+    ),
+):
+    """Move done todos into the compressed archive.
+
+    Examples:
+        todo --backend partitioned archive
+        todo --backend partitioned archive --older-than 30
+    """
+    if state["backend"] != "partitioned":
+        console.print("\n[bold red]✗ Error:[/bold red] archive only applies to the partitioned backend")
+        raise typer.Exit(1)
+    storage = get_storage()
+    cutoff = None if older_than is None else datetime.now() - timedelta(days=older_than)
+    count = storage.archive(older_than=cutoff)
+    console.print(f"\n✨ [bold green]Archived {count} done todos[/bold green]")
+
+
+@app.command()
+def serve(
+    socket: Optional[Path] = typer.Option(
+        None, "--socket", help="Socket to listen on (default: .todo-<backend>[-<store hash>].sock, or TODO_SOCKET)"
+    ),
+):
+    """Keep the store loaded and answer other todo commands over a Unix socket.
+
+    While it runs, commands for the same backend and socket talk to it
+    instead of loading the store themselves; without it they fall back to
+    direct access.
+
+    Examples:
+        todo serve &
+        todo --backend sqlite serve --socket /tmp/todo.sock
+    """
+    from todo_cli.daemon import serve as start_server, socket_path
+
+    path = socket or socket_path(state["backend"], state["store"])
+    try:
+        server = start_server(open_storage(), path)
+    except (FileExistsError, OSError) as e:
+        console.print(f"\n[bold red]✗ Error:[/bold red] {e}")
+        raise typer.Exit(1)
+    console.print(f"\n[bold green]Serving {state['backend']} store on {path}[/bold green] [dim](Ctrl+C to stop)[/dim]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 @app.command()
 def tui():
     """Launch interactive terminal UI.
@@ -134,7 +653,9 @@ def tui():
     """
     console.print("\n[bold yellow]Launching Terminal UI...[/bold yellow]")
     console.print("[dim]Press 'q' to exit[/dim]\n")
-    run_tui()
+    from todo_cli.tui import run_tui
+
+    run_tui(get_storage())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,328 @@
+"""Serve a todo store over a Unix socket.
+
+``todo serve`` keeps one storage instance (with its parsed todos, caches
+and search index) alive and answers requests from CLI invocations, which
+then skip loading the store themselves. The protocol is one JSON object
+per line in each direction:
+
+    {"method": "update", "args": [3], "kwargs": {"status": "done"}}
+    {"todo": {"id": 3, ...}}  |  {"todos": [...]}  |  {"value": ...}
+    {"error": "ValueError", "message": "..."}
+
+Bulk transfers never travel as one message: listings are fetched in pages
+of at most ``PAGE_SIZE`` todos and imports are sent a chunk at a time.
+
+This module only imports the standard library so that connecting stays
+cheap for the CLI.
+"""
+import builtins
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import threading
+from dataclasses import asdict
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from todo_cli.models import Todo, TodoColumns, TodoStats, TodoStatus
+
+PAGE_SIZE = 1000
+
+
+def socket_path(backend: str, store: Optional[str] = None) -> Path:
+    """Return the socket a daemon for ``backend`` and ``store`` listens on.
+
+    ``TODO_SOCKET`` overrides it; by default it sits in the working
+    directory, one per backend and store file: a store given explicitly
+    adds a hash of its absolute path to the name, so a command never
+    reaches a daemon serving a different file.
+    """
+    if os.environ.get("TODO_SOCKET"):
+        return Path(os.environ["TODO_SOCKET"])
+    if store is None:
+        return Path(f".todo-{backend}.sock")
+    digest = hashlib.sha1(str(Path(store).resolve()).encode()).hexdigest()[:12]
+    return Path(f".todo-{backend}-{digest}.sock")
+
+
+def _encode_arg(value):
+    """JSON fallback for request arguments."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Todo):
+        return value.to_dict()
+    raise TypeError(f"Cannot send {type(value).__name__}")
+
+
+def _status(value: Optional[str]) -> Optional[TodoStatus]:
+    return TodoStatus(value) if value is not None else None
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Answer requests from one client connection until it closes."""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            self.wfile.write(json.dumps(self.server.dispatch(json.loads(line))).encode() + b"\n")
+            self.wfile.flush()
+
+
+class TodoServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server answering storage calls for one store."""
+
+    daemon_threads = True
+
+    def __init__(self, storage, path: Path, durability=None):
+        """Bind ``path`` and serve ``storage`` on it.
+
+        ``durability`` is the policy ``storage`` was opened with; by default
+        the one configured now, before any client can change it.
+        """
+        from todo_cli.durability import resolve
+
+        self.storage = storage
+        self.path = Path(path)
+        self.durability = resolve(durability)
+        super().__init__(str(self.path), _Handler)
+
+    def server_close(self) -> None:
+        """Stop listening and remove the socket file."""
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+    def dispatch(self, request: dict) -> dict:
+        """Run one request against the storage and encode its result."""
+        method = request.get("method")
+        args = request.get("args", [])
+        kwargs = request.get("kwargs", {})
+        storage = self.storage
+        try:
+            if method == "create":
+                result = storage.create(*args, **kwargs)
+            elif method == "get_all":
+                result = storage.get_all(_status(kwargs.get("status")))
+            elif method == "get_by_id":
+                result = storage.get_by_id(*args)
+            elif method == "update":
+                result = storage.update(*args, **kwargs)
+            elif method == "delete":
+                result = storage.delete(*args)
+            elif method == "iter_todos":
+                kwargs["status"] = _status(kwargs.get("status"))
+                kwargs["limit"] = min(kwargs.get("limit") or PAGE_SIZE, PAGE_SIZE)
+                result = list(storage.iter_todos(**kwargs))
+            elif method == "query":
+                from todo_cli.query import Query, SortKey
+
+                kwargs["status"] = _status(kwargs.get("status"))
+                kwargs["sort"] = SortKey(kwargs["sort"])
+                for key in ("since", "until"):
+                    if kwargs.get(key):
+                        kwargs[key] = datetime.fromisoformat(kwargs[key])
+                result = storage.query(Query(**kwargs))
+            elif method == "search":
+                result = storage.search(*args, **kwargs)
+            elif method == "import_todos":
+                kwargs["todos"] = [Todo.from_dict(r) for r in kwargs["todos"]]
+                result = storage.import_todos(**kwargs)
+            elif method == "convert":
+                from todo_cli.fileformat import FileFormat
+
+                result = storage.convert(FileFormat(kwargs["file_format"]))
+            elif method == "archive":
+                older_than = kwargs.get("older_than")
+                result = storage.archive(older_than=datetime.fromisoformat(older_than) if older_than else None)
+            elif method == "apply_batch":
+                from todo_cli.batch import BatchOp
+
+                ops = [BatchOp.from_dict(op) for op in kwargs["ops"]]
+                result = [r.to_dict() for r in storage.apply_batch(ops, atomic=kwargs.get("atomic", False))]
+            elif method == "stats":
+                result = storage.stats().to_dict()
+            elif method == "watch_paths":
+                result = [str(Path(p).resolve()) for p in storage.watch_paths()]
+            elif method == "durability":
+                result = self.durability.value
+            else:
+                return {"error": "ValueError", "message": f"Unknown method {method!r}"}
+        except Exception as e:
+            return {"error": type(e).__name__, "message": str(e)}
+        if isinstance(result, Todo):
+            return {"todo": result.to_dict()}
+        if isinstance(result, list) and result and isinstance(result[0], Todo):
+            return {"todos": [t.to_dict() for t in result]}
+        return {"value": result}
+
+
+class RemoteStorage:
+    """Storage client that forwards calls to a running ``todo serve``."""
+
+    def __init__(self, path: Path):
+        """Connect to the daemon at ``path``; raises OSError if none is listening."""
+        self.path = Path(path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(str(self.path))
+        except OSError:
+            self._sock.close()
+            raise
+        self._file = self._sock.makefile("rwb")
+        self._lock = threading.Lock()
+
+    def _call(self, method: str, *args, **kwargs):
+        """Send one request and decode the reply."""
+        request = json.dumps({"method": method, "args": args, "kwargs": kwargs}, default=_encode_arg)
+        with self._lock:
+            self._file.write(request.encode() + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        if not line:
+            raise ConnectionError("todo daemon closed the connection")
+        reply = json.loads(line)
+        if "error" in reply:
+            error = getattr(builtins, reply["error"], None)
+            if not (isinstance(error, type) and issubclass(error, Exception)):
+                error = RuntimeError
+            raise error(reply["message"])
+        if "todo" in reply:
+            return Todo.from_dict(reply["todo"])
+        if "todos" in reply:
+            return [Todo.from_dict(t) for t in reply["todos"]]
+        return reply["value"]
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._file.close()
+        self._sock.close()
+
+    def create(self, title: str, description: Optional[str] = None) -> Todo:
+        """Create a new todo."""
+        return self._call("create", title, description)
+
+    def get_all(self, status: Optional[TodoStatus] = None) -> List[Todo]:
+        """Get all todos, optionally filtered by status."""
+        return self._call("get_all", status=status)
+
+    def get_by_id(self, todo_id: int) -> Optional[Todo]:
+        """Get todo by ID."""
+        return self._call("get_by_id", todo_id)
+
+    def update(self, todo_id: int, **kwargs) -> Optional[Todo]:
+        """Update todo by ID."""
+        return self._call("update", todo_id, **kwargs)
+
+    def delete(self, todo_id: int) -> bool:
+        """Delete todo by ID."""
+        return self._call("delete", todo_id)
+
+    def iter_todos(
+        self,
+        status: Optional[TodoStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+    ) -> Iterator[Todo]:
+        """Yield todos, filtered and paged as ``TodoStorage.iter_todos``.
+
+        They are fetched ``PAGE_SIZE`` at a time, each page resuming after
+        the last id of the one before.
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = PAGE_SIZE if remaining is None else min(remaining, PAGE_SIZE)
+            page = self._call("iter_todos", status=status, limit=size, offset=offset, after_id=after_id)
+            yield from page
+            if len(page) < size:
+                return
+            offset, after_id = 0, page[-1].id
+            if remaining is not None:
+                remaining -= len(page)
+
+    def get_columns(self, status: Optional[TodoStatus] = None) -> TodoColumns:
+        """Get all todos as compact columns, optionally filtered by status."""
+        return TodoColumns.from_records(t.to_dict() for t in self.iter_todos(status=status))
+
+    def query(self, query) -> List[Todo]:
+        """Run a filtered, sorted listing (a ``todo_cli.query.Query``)."""
+        return self._call("query", **asdict(query))
+
+    def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Todo]:
+        """Find todos whose title or description contain every query word."""
+        return self._call("search", query, limit=limit, prefix=prefix)
+
+    def import_todos(self, todos: Iterable[Todo], chunk_size: int = 10000, keep_ids: bool = False) -> int:
+        """Bulk-insert todos and return how many were added.
+
+        Each ``chunk_size`` todos are sent and committed as one request, so
+        with ``keep_ids`` a clash fails its own chunk and earlier chunks
+        stay committed.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be at least 1, not {chunk_size}")
+        todos = iter(todos)
+        count = 0
+        while True:
+            chunk = list(islice(todos, chunk_size))
+            if not chunk:
+                return count
+            count += self._call("import_todos", todos=chunk, chunk_size=chunk_size, keep_ids=keep_ids)
+
+    def convert(self, file_format) -> int:
+        """Rewrite the store in another layout."""
+        return self._call("convert", file_format=file_format)
+
+    def archive(self, older_than: Optional[datetime] = None) -> int:
+        """Move done todos into the archive."""
+        return self._call("archive", older_than=older_than)
+
+    def apply_batch(self, ops: Iterable, atomic: bool = False) -> List:
+        """Run ``todo_cli.batch.BatchOp`` operations in one transaction of the daemon's store."""
+        from todo_cli.batch import BatchResult
+
+        results = self._call("apply_batch", ops=[op.to_dict() for op in ops], atomic=atomic)
+        return [BatchResult.from_dict(r) for r in results]
+
+    def stats(self) -> TodoStats:
+        """Return counts per status, the next id and the last write time."""
+        return TodoStats.from_dict(self._call("stats"))
+
+    def watch_paths(self) -> List[Path]:
+        """Files whose changes mean another writer touched the store."""
+        return [Path(p) for p in self._call("watch_paths")]
+
+    def durability(self) -> str:
+        """The fsync policy the daemon's store writes with (``todo_cli.durability``)."""
+        return self._call("durability")
+
+
+def connect(path: Path) -> Optional[RemoteStorage]:
+    """Return a client for the daemon at ``path``, or None if none is running."""
+    if not Path(path).exists():
+        return None
+    try:
+        return RemoteStorage(path)
+    except OSError:
+        return None
+
+
+def serve(storage, path: Path, durability=None) -> TodoServer:
+    """Bind a server for ``storage`` at ``path``, replacing a stale socket.
+
+    ``durability`` is the policy ``storage`` writes with (see ``TodoServer``).
+
+    Raises ``FileExistsError`` if another daemon is already listening.
+    """
+    path = Path(path)
+    live = connect(path)
+    if live is not None:
+        live.close()
+        raise FileExistsError(f"A todo daemon is already listening on {path}")
+    path.unlink(missing_ok=True)
+    return TodoServer(storage, path, durability)
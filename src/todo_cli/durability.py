@@ -0,0 +1,193 @@
+"""Crash-safe file replacement and the fsync policy.
+
+Stores are never written over in place: ``atomic_write`` writes a temp
+file next to the target and renames it over the target, so a reader or a
+crash sees either the old or the new version, never a torn one. The
+previous version stays behind as a hard link (``<file>.bak``; a copy
+where the filesystem has no hard links) to recover from if the new one
+turns out to be damaged after all, e.g. when it was never flushed to disk.
+
+How hard the data is pushed to disk is a policy (``--durability`` or
+``TODO_DURABILITY``):
+
+- ``always``: fsync every write and the directory entry of every rename.
+- ``interval``: fsync at most once per ``SYNC_INTERVAL`` seconds. Writes
+  in between are flushed with ``os.sync`` once the store has been quiet
+  for an interval, or when the process exits, so a crash loses at most
+  about the last interval's writes (on platforms without ``os.sync``,
+  everything since the last synced write).
+- ``none``: leave flushing to the OS; for bulk jobs that can be re-run.
+"""
+import atexit
+import os
+import shutil
+import threading
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Optional
+
+SYNC_INTERVAL = 1.0
+
+
+class Durability(str, Enum):
+    """When writes are fsynced."""
+    ALWAYS = "always"
+    INTERVAL = "interval"
+    NONE = "none"
+
+
+# Set by ``configure``; until then ``TODO_DURABILITY`` decides.
+POLICY: Optional[Durability] = None
+
+
+def configure(policy: Durability) -> None:
+    """Set the policy of stores opened from now on without an explicit one."""
+    global POLICY
+    POLICY = Durability(policy)
+
+
+def _env_policy() -> Durability:
+    """The policy ``TODO_DURABILITY`` asks for; ``always`` if unset."""
+    value = os.environ.get("TODO_DURABILITY")
+    if not value:
+        return Durability.ALWAYS
+    try:
+        return Durability(value)
+    except ValueError:
+        choices = ", ".join(d.value for d in Durability)
+        raise ValueError(f"TODO_DURABILITY must be one of {choices}, not {value!r}") from None
+
+
+def resolve(policy: Optional[Durability] = None) -> Durability:
+    """Return ``policy``, else the configured ``POLICY``, else ``TODO_DURABILITY``'s."""
+    return Durability(policy or POLICY or _env_policy())
+
+
+class Syncer:
+    """Decides, per write, whether the policy calls for an fsync."""
+
+    def __init__(self, policy: Optional[Durability] = None, interval: float = SYNC_INTERVAL):
+        """Initialize with a policy (the configured ``POLICY`` by default)."""
+        self.policy = resolve(policy)
+        self.interval = interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+        # Deadline of the trailing flush for writes ``due`` skipped, if any.
+        self._deadline: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+        self._at_exit = False
+
+    def due(self) -> bool:
+        """Whether this write should be fsynced.
+
+        A skipped write schedules a trailing ``flush``.
+        """
+        if self.policy == Durability.ALWAYS:
+            return True
+        if self.policy == Durability.NONE:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last < self.interval:
+                self._deadline = now + self.interval
+                if self._timer is None:
+                    self._start_timer(self.interval)
+                if not self._at_exit:
+                    atexit.register(self.flush)
+                    self._at_exit = True
+                return False
+            self._last = now
+            return True
+
+    def _start_timer(self, delay: float) -> None:
+        """Run ``_on_timer`` after ``delay`` seconds; called with the lock held."""
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        """Flush skipped writes, or wait longer while they keep coming."""
+        with self._lock:
+            self._timer = None
+            if self._deadline is None:
+                return
+            remaining = self._deadline - time.monotonic()
+            if remaining > 0:
+                self._start_timer(remaining)
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Push writes ``due`` skipped to disk now (``os.sync``)."""
+        with self._lock:
+            if self._deadline is None:
+                return
+            self._deadline = None
+            self._last = time.monotonic()
+        if hasattr(os, "sync"):
+            os.sync()
+
+    def sync(self, fd: int) -> bool:
+        """Fsync ``fd`` if due; returns whether it did."""
+        if not self.due():
+            return False
+        os.fsync(fd)
+        return True
+
+
+def _fsync_path(path: Path) -> None:
+    """Fsync the file or directory at ``path``."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def sync_dir(path: Path) -> None:
+    """Fsync a directory so renames and new entries in it are durable."""
+    _fsync_path(path)
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """Hard-link ``src`` as ``dst``, or copy it where links are unsupported."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        # No hard links here (e.g. FAT, some network mounts).
+        shutil.copy2(src, dst)
+
+
+def write_file(path: Path, data: bytes, syncer: Syncer) -> bool:
+    """Create or truncate ``path`` with ``data``; returns whether it was fsynced."""
+    # Not mkstemp: that creates files 0600 instead of honouring the umask.
+    path.write_bytes(data)
+    if not syncer.due():
+        return False
+    # fsync flushes the file, not the descriptor, so a fresh one will do.
+    _fsync_path(path)
+    return True
+
+
+def atomic_write(path: Path, data: bytes, syncer: Syncer, backup: Optional[Path] = None) -> None:
+    """Replace ``path`` with ``data`` by writing a temp file and renaming it.
+
+    With ``backup``, the version being replaced is kept there first.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        synced = write_file(tmp, data, syncer)
+        if backup is not None and path.exists():
+            link = tmp.with_name(tmp.name + ".bak")
+            link.unlink(missing_ok=True)
+            link_or_copy(path, link)
+            os.replace(link, backup)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if synced:
+        sync_dir(path.parent)
+
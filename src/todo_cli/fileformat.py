@@ -0,0 +1,142 @@
+"""On-disk format of JSON todo stores.
+
+Version 1 (legacy) is a bare JSON array. Version 2 starts with a one-line
+header naming the format, version and layout (and, when written by
+``TodoStorage``, a ``meta`` record of aggregates), followed by the array:
+
+    {"format":"todo-cli","version":2,"layout":"compact"}
+    [
+    {"id":1,"title":"Buy milk",...},
+    {"id":2,...}
+    ]
+
+The ``compact`` layout writes one minified record per line, about half the
+size of the ``pretty`` (``indent=2``) layout and still plain JSON after the
+header line. Records are encoded with ``orjson`` when it is installed
+(``TODO_CODEC=json`` forces the stdlib codec).
+"""
+import json
+import os
+from enum import Enum
+from typing import AnyStr, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+MAGIC = "todo-cli"
+FORMAT_VERSION = 2
+LEGACY_VERSION = 1
+
+
+class FileFormat(str, Enum):
+    """Layout of records after the header."""
+    COMPACT = "compact"
+    PRETTY = "pretty"
+
+
+_FAST = orjson is not None and os.environ.get("TODO_CODEC", "") != "json"
+CODEC = "orjson" if _FAST else "json"
+
+if _FAST:
+    loads = orjson.loads
+    dumps = orjson.dumps
+else:
+    _encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    def loads(data):
+        """Decode JSON from bytes or str."""
+        return json.loads(data)
+
+    def dumps(obj) -> bytes:
+        """Encode ``obj`` as minified UTF-8 JSON."""
+        return _encode(obj).encode()
+
+
+def header(layout: FileFormat, meta: Optional[dict] = None) -> bytes:
+    """Return the header line for a version 2 store, carrying ``meta`` if given."""
+    head = {"format": MAGIC, "version": FORMAT_VERSION, "layout": layout.value}
+    if meta is not None:
+        head["meta"] = meta
+    return dumps(head) + b"\n"
+
+
+def read_header(data: AnyStr) -> Tuple[int, FileFormat, int]:
+    """Return ``(version, layout, body offset)`` for the start of a store file.
+
+    ``data`` needs to hold at least the header line. Raises ``ValueError``
+    for a header from another program or a newer version.
+    """
+    if data[:1] not in ("{", b"{"):
+        return LEGACY_VERSION, FileFormat.PRETTY, 0
+    end = data.find("\n" if isinstance(data, str) else b"\n")
+    end = len(data) if end < 0 else end + 1
+    meta = loads(data[:end])
+    if meta.get("format") != MAGIC:
+        raise ValueError("Not a todo store")
+    version = meta.get("version")
+    if not isinstance(version, int) or version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported store format version {version}; upgrade todo-cli")
+    return version, FileFormat(meta.get("layout", FileFormat.COMPACT.value)), end
+
+
+def read_meta(data: AnyStr) -> Optional[dict]:
+    """Return the metadata record from the start of a store file, if it has one."""
+    if data[:1] not in ("{", b"{"):
+        return None
+    end = data.find("\n" if isinstance(data, str) else b"\n")
+    return loads(data[:len(data) if end < 0 else end]).get("meta")
+
+
+def is_complete(path) -> bool:
+    """Cheap check that a store file was written out in full.
+
+    Looks only at the header and the last bytes: a torn or unflushed write
+    leaves a bad header, or no closing bracket at the end. An empty file
+    does not pass.
+    """
+    with open(path, "rb") as f:
+        head = f.read(4096)
+        size = os.fstat(f.fileno()).st_size
+        f.seek(max(size - 64, 0))
+        tail = f.read()
+    try:
+        read_header(head)
+    except ValueError:
+        return False
+    return tail.rstrip().endswith(b"]")
+
+
+def decode(data: bytes) -> Tuple[int, FileFormat, List[dict]]:
+    """Decode a whole store file into ``(version, layout, records)``."""
+    version, layout, start = read_header(data)
+    body = data[start:]
+    return version, layout, loads(body) if body.strip() else []
+
+
+def encode(
+    records: Iterable[dict],
+    layout: FileFormat = FileFormat.COMPACT,
+    offsets: Optional[List[Tuple[int, int, int]]] = None,
+    meta: Optional[dict] = None,
+) -> bytes:
+    """Encode records as a version 2 store file, with ``meta`` in the header.
+
+    For the compact layout, ``offsets`` (if given) is filled with an
+    ``(id, offset, length)`` entry locating each record's line.
+    """
+    head = header(layout, meta)
+    if layout == FileFormat.PRETTY:
+        body = json.dumps(list(records), indent=2, ensure_ascii=False).encode()
+        return head + body + b"\n"
+    lines = [dumps(r) for r in records] if offsets is None else []
+    if offsets is not None:
+        pos = len(head) + 2
+        for r in records:
+            line = dumps(r)
+            lines.append(line)
+            offsets.append((r["id"], pos, len(line)))
+            pos += len(line) + 2
+    body = b",\n".join(lines)
+    return head + (b"[\n" + body + b"\n]\n" if body else b"[]\n")
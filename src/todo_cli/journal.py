@@ -0,0 +1,469 @@
+"""Append-only journal storage backend for todos.
+
+Every mutation appends one JSON line to a journal file that sits next to the
+snapshot (``todos.json.journal``). State is rebuilt by replaying the journal
+on top of the last snapshot, so a write costs O(1) instead of a full rewrite.
+Once the journal grows past a size or ratio threshold it is compacted into a
+new snapshot.
+"""
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from todo_cli import fileformat, tracing
+from todo_cli.batch import BatchAction, BatchOp, BatchResult, not_found
+from todo_cli.durability import Durability, Syncer, atomic_write, sync_dir, write_file
+from todo_cli.locking import FileLock
+from todo_cli.models import Todo, TodoColumns, TodoStats, TodoStatus
+from todo_cli.query import Query, scan
+from todo_cli.transfer import chunked
+
+
+class JournalTodoStorage:
+    """Snapshot + append-only journal storage for todos.
+
+    The snapshot uses the same file format as ``TodoStorage`` (compact
+    layout) so either backend can open a compacted store; a legacy snapshot
+    is read as is and replaced by the next compaction.
+    """
+
+    def __init__(
+        self,
+        filepath: str = "todos.json",
+        compact_min_bytes: int = 64 * 1024,
+        compact_max_bytes: int = 8 * 1024 * 1024,
+        compact_ratio: float = 0.5,
+        background: bool = True,
+        durability: Optional[Durability] = None,
+    ):
+        """Initialize storage with snapshot path and compaction thresholds.
+
+        The journal is compacted when it reaches ``compact_max_bytes``, or
+        when it is at least ``compact_min_bytes`` and ``compact_ratio`` times
+        the size of the snapshot. ``durability`` sets when appends and
+        compactions are fsynced (``todo_cli.durability``).
+        """
+        self.filepath = Path(filepath)
+        self.journal_path = self.filepath.with_name(self.filepath.name + ".journal")
+        self.lock_path = self.filepath.with_name(self.filepath.name + ".lock")
+        self.index_path = self.filepath.with_name(self.filepath.name + ".idx")
+        self.compact_min_bytes = compact_min_bytes
+        self.compact_max_bytes = compact_max_bytes
+        self.compact_ratio = compact_ratio
+        self.background = background
+        self._syncer = Syncer(durability)
+
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        self._todos: Dict[int, dict] = {}
+        self._unordered = False
+        self._max_id = 0
+        self._counts: Dict[str, int] = {}
+        self._snapshot_modified: Optional[str] = None
+        self._offset = 0
+        self._snapshot_sig: Optional[Tuple[int, int, int]] = None
+        self._snapshot_size = 0
+        self._search_index = None
+
+        self._ensure_file()
+        self._reload()
+
+    def _ensure_file(self) -> None:
+        """Ensure snapshot and journal files exist."""
+        if not self.filepath.exists():
+            atomic_write(self.filepath, fileformat.encode([]), self._syncer)
+        if not self.journal_path.exists():
+            self.journal_path.touch()
+
+    def _stat_sig(self, path: Path) -> Optional[Tuple[int, int, int]]:
+        """Return an (inode, mtime_ns, size) signature for ``path``."""
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _reload(self) -> None:
+        """Rebuild state from the snapshot and the whole journal."""
+        self._snapshot_sig = self._stat_sig(self.filepath)
+        with tracing.span("storage.read") as span:
+            content = self.filepath.read_bytes()
+            span.add(bytes_read=len(content))
+        self._snapshot_size = len(content)
+        with tracing.span("storage.decode") as span:
+            _, _, records = fileformat.decode(content)
+            self._todos = {t["id"]: t for t in records}
+            self._unordered = any(a["id"] > b["id"] for a, b in zip(records, records[1:]))
+            span.add(records=len(records))
+        meta = fileformat.read_meta(content)
+        stats = TodoStats.of(records)
+        self._counts = stats.counts
+        # Ids of todos deleted before the last compaction stay retired.
+        self._max_id = max(max(self._todos, default=0), (meta["next_id"] if meta else 1) - 1)
+        self._snapshot_modified = meta.get("modified") if meta else None
+        self._offset = 0
+        self._replay()
+
+    def _replay(self) -> None:
+        """Apply journal records appended since the last replay."""
+        with tracing.span("journal.replay") as span:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            lines = data[:end].splitlines()
+            for line in lines:
+                try:
+                    record = fileformat.loads(line)
+                except ValueError:
+                    # Torn write from a crashed writer; the rest is still valid.
+                    continue
+                self._apply(record)
+            self._offset += end
+            span.add(bytes_read=len(data), records=len(lines))
+
+    def _apply(self, record: dict) -> None:
+        """Apply a single journal record to the in-memory state."""
+        if record["op"] == "put":
+            todo = record["todo"]
+            old = self._todos.get(todo["id"])
+            if old is not None:
+                self._counts[old["status"]] -= 1
+            elif todo["id"] < self._max_id:
+                self._unordered = True
+            self._todos[todo["id"]] = todo
+            self._counts[todo["status"]] = self._counts.get(todo["status"], 0) + 1
+            self._max_id = max(self._max_id, todo["id"])
+        elif record["op"] == "del":
+            old = self._todos.pop(record["id"], None)
+            if old is not None:
+                self._counts[old["status"]] -= 1
+
+    def _values(self) -> Tuple[dict, ...]:
+        """Return the todos in id order."""
+        if self._unordered:
+            self._todos = dict(sorted(self._todos.items()))
+            self._unordered = False
+        return tuple(self._todos.values())
+
+    def _refresh(self) -> None:
+        """Pick up changes made by other writers since the last refresh."""
+        journal_size = self.journal_path.stat().st_size
+        if self._stat_sig(self.filepath) != self._snapshot_sig or journal_size < self._offset:
+            # Snapshot replaced or journal truncated by a compaction.
+            self._reload()
+        elif journal_size > self._offset:
+            self._replay()
+
+    def _append(self, *records: dict) -> None:
+        """Append records to the journal in one write and apply them."""
+        before = self._stamp()
+        data = b"".join(fileformat.dumps(r) + b"\n" for r in records)
+        with tracing.span("journal.append", bytes_written=len(data), records=len(records)):
+            with open(self.journal_path, "ab") as f:
+                if f.tell() > self._offset:
+                    # Terminate a torn tail so these records start on their own line.
+                    data = b"\n" + data
+                f.write(data)
+                f.flush()
+                self._syncer.sync(f.fileno())
+                self._offset = f.tell()
+        for record in records:
+            self._apply(record)
+
+        index = self._open_index()
+        if index is not None and index.stamp == before:
+            with index.conn:
+                index.upsert(r["todo"] for r in records if r["op"] == "put")
+                index.remove(r["id"] for r in records if r["op"] == "del")
+                index.stamp = self._stamp()
+
+    def _stamp(self) -> str:
+        """Signature of the state this instance has replayed up to."""
+        return json.dumps([self._snapshot_sig, self._offset])
+
+    def _open_index(self, create: bool = False):
+        """Return the search index, or None if it was never built."""
+        if self._search_index is None and (create or self.index_path.exists()):
+            from todo_cli.search import SearchIndex
+
+            self._search_index = SearchIndex.open(self.index_path)
+        return self._search_index
+
+    def _needs_compaction(self) -> bool:
+        """Check whether the journal crossed a compaction threshold."""
+        if self._offset >= self.compact_max_bytes:
+            return True
+        return (
+            self._offset >= self.compact_min_bytes
+            and self._offset >= self.compact_ratio * self._snapshot_size
+        )
+
+    def _maybe_compact(self) -> None:
+        """Start a compaction if a threshold is crossed and none is running.
+
+        Must be called without holding the file lock, which ``compact``
+        acquires itself.
+        """
+        if not self._needs_compaction():
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if not self.background:
+            self.compact()
+            return
+        # Non-daemon so a short-lived CLI process finishes the compaction
+        # before exiting instead of abandoning it.
+        self._compactor = threading.Thread(target=self.compact, name="todo-compactor")
+        self._compactor.start()
+
+    def compact(self) -> None:
+        """Fold the journal into a new snapshot."""
+        with self._lock, FileLock(self.lock_path):
+            self._refresh()
+            todos = self._values()
+            covered = self._offset
+            snapshot_sig = self._snapshot_sig
+            stats = self.stats()
+
+        # Serialise outside the lock; records are replaced, never mutated.
+        # Each compaction writes its own temp files, so a concurrent one can
+        # never rename this snapshot into place or vice versa.
+        content = fileformat.encode(todos, meta=stats.to_dict())
+        tmp_snapshot = self._temp_path(self.filepath)
+        tmp_journal = None
+        try:
+            synced = write_file(tmp_snapshot, content, self._syncer)
+
+            with self._lock, FileLock(self.lock_path):
+                if self._stat_sig(self.filepath) != snapshot_sig:
+                    # Another writer compacted in the meantime.
+                    return
+                with open(self.journal_path, "rb") as f:
+                    f.seek(covered)
+                    tail = f.read()
+                tmp_journal = self._temp_path(self.journal_path)
+                synced = write_file(tmp_journal, tail, self._syncer) or synced
+                before = self._stamp()
+                os.replace(tmp_snapshot, self.filepath)
+                os.replace(tmp_journal, self.journal_path)
+                if synced:
+                    sync_dir(self.filepath.parent)
+                self._snapshot_sig = self._stat_sig(self.filepath)
+                self._snapshot_size = len(content)
+                self._snapshot_modified = stats.modified
+                self._offset -= covered
+                # Compaction rewrites files but not content; carry the index over.
+                index = self._open_index()
+                if index is not None and index.stamp == before:
+                    with index.conn:
+                        index.stamp = self._stamp()
+        finally:
+            tmp_snapshot.unlink(missing_ok=True)
+            if tmp_journal is not None:
+                tmp_journal.unlink(missing_ok=True)
+
+    @staticmethod
+    def _temp_path(path: Path) -> Path:
+        """Create a uniquely named, empty temp file next to ``path``."""
+        fd, name = tempfile.mkstemp(prefix=path.name + ".", suffix=".compact", dir=path.parent)
+        os.close(fd)
+        return Path(name)
+
+    def wait_for_compaction(self) -> None:
+        """Block until a running background compaction finishes."""
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def create(self, title: str, description: Optional[str] = None) -> Todo:
+        """Create a new todo."""
+        with self._lock, FileLock(self.lock_path):
+            self._refresh()
+            todo = Todo(id=self._max_id + 1, title=title, description=description)
+            self._append({"op": "put", "todo": todo.to_dict()})
+        self._maybe_compact()
+        return todo
+
+    def watch_paths(self) -> List[Path]:
+        """Files whose changes mean another writer touched the store."""
+        return [self.filepath, self.journal_path]
+
+    def get_all(self, status: Optional[TodoStatus] = None) -> List[Todo]:
+        """Get all todos, optionally filtered by status."""
+        with self._lock:
+            self._refresh()
+            todos = self._values()
+        if status:
+            todos = [t for t in todos if t["status"] == status.value]
+        return [Todo.from_dict(t) for t in todos]
+
+    def get_columns(self, status: Optional[TodoStatus] = None) -> TodoColumns:
+        """Get all todos as compact columns, optionally filtered by status."""
+        with self._lock:
+            self._refresh()
+            todos = self._values()
+        columns = TodoColumns.from_records(todos)
+        return columns.filter_status(status) if status else columns
+
+    def iter_todos(
+        self,
+        status: Optional[TodoStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+    ) -> Iterator[Todo]:
+        """Yield todos lazily, optionally filtered by status and paged."""
+        with self._lock:
+            self._refresh()
+            todos = self._values()
+        matches = (
+            t for t in todos
+            if (status is None or t["status"] == status.value)
+            and (after_id is None or t["id"] > after_id)
+        )
+        stop = None if limit is None else offset + limit
+        for t in islice(matches, offset, stop):
+            yield Todo.from_dict(t)
+
+    def query(self, query: Query) -> List[Todo]:
+        """Run a filtered, sorted listing by scanning the replayed todos."""
+        with self._lock:
+            self._refresh()
+            todos = self._values()
+        return [Todo.from_dict(t) for t in scan(todos, query)]
+
+    def get_by_id(self, todo_id: int) -> Optional[Todo]:
+        """Get todo by ID."""
+        with self._lock:
+            self._refresh()
+            t = self._todos.get(todo_id)
+        return Todo.from_dict(t) if t is not None else None
+
+    def stats(self) -> TodoStats:
+        """Return counts per status, the next id and the last write time.
+
+        Counts are kept up to date as records are applied, so this only
+        replays journal records this instance has not seen yet.
+        """
+        with self._lock:
+            self._refresh()
+            modified = self._snapshot_modified
+            if self._offset:
+                mtime = self.journal_path.stat().st_mtime
+                modified = datetime.fromtimestamp(mtime).isoformat(timespec="microseconds")
+            return TodoStats(dict(self._counts), self._max_id + 1, modified)
+
+    def update(self, todo_id: int, **kwargs) -> Optional[Todo]:
+        """Update todo by ID."""
+        # Checked before the lock: a bad record in the journal would break every later replay.
+        if "status" in kwargs:
+            kwargs["status"] = TodoStatus(kwargs["status"]).value
+        with self._lock, FileLock(self.lock_path):
+            self._refresh()
+            t = self._todos.get(todo_id)
+            if t is None:
+                return None
+            t = dict(t)
+            t.update(kwargs)
+            self._append({"op": "put", "todo": t})
+        self._maybe_compact()
+        return Todo.from_dict(t)
+
+    def delete(self, todo_id: int) -> bool:
+        """Delete todo by ID."""
+        with self._lock, FileLock(self.lock_path):
+            self._refresh()
+            if todo_id not in self._todos:
+                return False
+            self._append({"op": "del", "id": todo_id})
+        self._maybe_compact()
+        return True
+
+    def apply_batch(self, ops: Iterable[BatchOp], atomic: bool = False) -> List[BatchResult]:
+        """Run add/complete/delete operations as one journal append.
+
+        Each operation gets a result; completing or deleting a missing id
+        fails that item only. With ``atomic``, any failure means nothing
+        is appended.
+        """
+        ops = list(ops)
+        with self._lock, FileLock(self.lock_path):
+            self._refresh()
+            # Todos as this batch leaves them (None: deleted by it).
+            view: Dict[int, Optional[dict]] = {}
+            records = []
+            results = []
+            next_id = self._max_id + 1
+            for op in ops:
+                if op.action == BatchAction.ADD:
+                    todo = Todo(id=next_id, title=op.title, description=op.description)
+                    next_id += 1
+                    view[todo.id] = todo.to_dict()
+                    records.append({"op": "put", "todo": view[todo.id]})
+                    results.append(BatchResult(op, todo))
+                    continue
+                t = view[op.todo_id] if op.todo_id in view else self._todos.get(op.todo_id)
+                if t is None:
+                    results.append(not_found(op))
+                elif op.action == BatchAction.COMPLETE:
+                    t = view[op.todo_id] = {**t, "status": TodoStatus.DONE.value}
+                    records.append({"op": "put", "todo": t})
+                    results.append(BatchResult(op, Todo.from_dict(t)))
+                else:
+                    view[op.todo_id] = None
+                    records.append({"op": "del", "id": op.todo_id})
+                    results.append(BatchResult(op))
+            if records and not (atomic and not all(r.ok for r in results)):
+                self._append(*records)
+        self._maybe_compact()
+        return results
+
+    def import_todos(self, todos: Iterable[Todo], chunk_size: int = 10000, keep_ids: bool = False) -> int:
+        """Bulk-insert todos, appending one journal write per chunk.
+
+        Unless ``keep_ids`` is set, ids are reassigned after the current
+        maximum. With it, a chunk containing an id that is already taken
+        raises ``ValueError``; earlier chunks stay committed.
+        """
+        count = 0
+        for chunk in chunked(todos, chunk_size):
+            with self._lock, FileLock(self.lock_path):
+                self._refresh()
+                if keep_ids:
+                    seen = set()
+                    for todo in chunk:
+                        if todo.id in self._todos or todo.id in seen:
+                            raise ValueError(f"Todo with ID {todo.id} already exists")
+                        seen.add(todo.id)
+                else:
+                    for todo_id, todo in enumerate(chunk, start=self._max_id + 1):
+                        todo.id = todo_id
+                self._append(*({"op": "put", "todo": t.to_dict()} for t in chunk))
+            count += len(chunk)
+            self._maybe_compact()
+        return count
+
+    def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Todo]:
+        """Find todos whose title or description contain every query word.
+
+        The index is built on first use and rebuilt if another writer
+        changed the store without maintaining it.
+        """
+        with self._lock:
+            self._refresh()
+            index = self._open_index(create=True)
+            if index.stamp != self._stamp():
+                with FileLock(self.lock_path), index.conn:
+                    self._refresh()
+                    with tracing.span("search.rebuild", records=len(self._todos)):
+                        index.rebuild(self._todos.values())
+                    index.stamp = self._stamp()
+            with tracing.span("search.query") as span:
+                hits = index.search(query, limit=limit, prefix=prefix)
+                span.add(records=len(hits))
+            return [Todo.from_dict(self._todos[i]) for i, _ in hits if i in self._todos]
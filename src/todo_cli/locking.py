@@ -0,0 +1,109 @@
+"""Cross-process file locking and in-process group commit."""
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
+
+
+class FileLock:
+    """Advisory exclusive lock held on a sidecar lock file.
+
+    Uses ``fcntl.flock``, which is tied to the open file description, so it
+    serialises threads holding separate ``FileLock`` objects as well as
+    separate processes. On platforms without ``fcntl`` it is a no-op.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize lock for the given lock file path."""
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "FileLock":
+        """Block until the lock is acquired."""
+        if fcntl is not None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(fd)
+                raise
+            self._fd = fd
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Release the lock."""
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class _Pending:
+    """A mutation waiting to be committed."""
+
+    __slots__ = ("op", "result", "error", "done")
+
+    def __init__(self, op: Callable):
+        self.op = op
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+
+class GroupCommitter:
+    """Batch mutations from concurrent callers into a single commit.
+
+    The first caller becomes the leader and commits every mutation queued
+    up to that point; callers arriving while a commit is in flight wait and
+    are committed together in the next batch. ``commit`` receives the list
+    of pending mutations and must set ``result`` or ``error`` on each; if it
+    raises instead, every caller in the batch gets that error.
+    """
+
+    def __init__(self, commit: Callable[[List[_Pending]], None]):
+        """Initialize with the function that commits a batch."""
+        self._commit = commit
+        self._cond = threading.Condition()
+        self._queue: List[_Pending] = []
+        self._leader_active = False
+
+    def submit(self, op: Callable) -> Any:
+        """Queue a mutation and return its result once committed."""
+        pending = _Pending(op)
+        with self._cond:
+            self._queue.append(pending)
+            while not pending.done and self._leader_active:
+                self._cond.wait()
+            if pending.done:
+                return self._unwrap(pending)
+            self._leader_active = True
+            batch, self._queue = self._queue, []
+
+        try:
+            self._commit(batch)
+        except BaseException as e:
+            # The batch failed as a whole, though not necessarily before
+            # reaching the disk (e.g. the directory fsync after the rename
+            # failed). Work after a good save must not raise here: see
+            # ``TodoStorage._commit``.
+            for p in batch:
+                p.error = e
+        finally:
+            with self._cond:
+                for p in batch:
+                    p.done = True
+                self._leader_active = False
+                self._cond.notify_all()
+        return self._unwrap(pending)
+
+    @staticmethod
+    def _unwrap(pending: _Pending) -> Any:
+        """Return the result of a committed mutation or raise its error."""
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
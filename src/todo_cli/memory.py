@@ -0,0 +1,218 @@
+"""In-memory storage backend for todos.
+
+Nothing is read from or written to disk: the store lives as long as the
+instance. It is meant for tests and throwaway runs, and behind ``todo
+serve`` (``todo --backend memory serve &``) as a scratch store that other
+commands share until the daemon stops.
+"""
+import sqlite3
+import threading
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Collection, Dict, Iterable, Iterator, List, Optional
+
+from todo_cli.batch import BatchAction, BatchOp, BatchResult, not_found
+from todo_cli.models import Todo, TodoColumns, TodoStats, TodoStatus
+from todo_cli.query import Query, TodoIndex
+from todo_cli.storage import _sort_by_id
+
+
+class MemoryTodoStorage:
+    """Dict-backed storage for todos, with the same public API as ``TodoStorage``.
+
+    Records are kept as dicts keyed by id, in id order. The query and search
+    indexes are built on first use and then patched by every write, the
+    search index in a private in-memory SQLite database.
+    """
+
+    def __init__(self, todos: Iterable[Todo] = ()):
+        """Initialize storage, optionally seeded with ``todos`` (ids kept)."""
+        self._lock = threading.RLock()
+        self._todos: Dict[int, dict] = {}
+        self._max_id = 0
+        self._modified: Optional[str] = None
+        self._query_index: Optional[TodoIndex] = None
+        self._search_index = None
+        if todos:
+            self.import_todos(todos, keep_ids=True)
+
+    def _changed(self, ids: Collection[int]) -> None:
+        """Bring the indexes and the write time up to date after a mutation."""
+        if not ids:
+            return
+        self._modified = datetime.now().isoformat(timespec="microseconds")
+        if self._query_index is not None:
+            for i in ids:
+                if i in self._todos:
+                    self._query_index.add(self._todos[i])
+                else:
+                    self._query_index.remove(i)
+        if self._search_index is not None:
+            with self._search_index.conn:
+                self._search_index.upsert(self._todos[i] for i in ids if i in self._todos)
+                self._search_index.remove(i for i in ids if i not in self._todos)
+
+    def create(self, title: str, description: Optional[str] = None) -> Todo:
+        """Create a new todo."""
+        with self._lock:
+            todo = Todo(id=self._max_id + 1, title=title, description=description)
+            self._todos[todo.id] = todo.to_dict()
+            self._max_id = todo.id
+            self._changed((todo.id,))
+        return todo
+
+    def watch_paths(self) -> List[Path]:
+        """Files whose changes mean another writer touched the store: none."""
+        return []
+
+    def get_all(self, status: Optional[TodoStatus] = None) -> List[Todo]:
+        """Get all todos, optionally filtered by status."""
+        with self._lock:
+            todos = list(self._todos.values())
+        if status:
+            todos = [t for t in todos if t["status"] == status.value]
+        return [Todo.from_dict(t) for t in todos]
+
+    def get_columns(self, status: Optional[TodoStatus] = None) -> TodoColumns:
+        """Get all todos as compact columns, optionally filtered by status."""
+        with self._lock:
+            columns = TodoColumns.from_records(tuple(self._todos.values()))
+        return columns.filter_status(status) if status else columns
+
+    def iter_todos(
+        self,
+        status: Optional[TodoStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+    ) -> Iterator[Todo]:
+        """Yield todos lazily, optionally filtered by status and paged."""
+        with self._lock:
+            todos = tuple(self._todos.values())
+        matches = (
+            t for t in todos
+            if (status is None or t["status"] == status.value)
+            and (after_id is None or t["id"] > after_id)
+        )
+        stop = None if limit is None else offset + limit
+        for t in islice(matches, offset, stop):
+            yield Todo.from_dict(t)
+
+    def query(self, query: Query) -> List[Todo]:
+        """Run a filtered, sorted listing through the secondary indexes."""
+        with self._lock:
+            if self._query_index is None:
+                self._query_index = TodoIndex(self._todos.values())
+            records = self._query_index.select(query, self._todos)
+            return [Todo.from_dict(r) for r in records]
+
+    def get_by_id(self, todo_id: int) -> Optional[Todo]:
+        """Get todo by ID."""
+        with self._lock:
+            t = self._todos.get(todo_id)
+            return Todo.from_dict(t) if t is not None else None
+
+    def stats(self) -> TodoStats:
+        """Return counts per status, the next id and the last write time."""
+        with self._lock:
+            return TodoStats.of(self._todos.values(), self._max_id + 1, self._modified)
+
+    def update(self, todo_id: int, **kwargs) -> Optional[Todo]:
+        """Update todo by ID."""
+        if "status" in kwargs:
+            kwargs["status"] = TodoStatus(kwargs["status"]).value
+        with self._lock:
+            t = self._todos.get(todo_id)
+            if t is None:
+                return None
+            t.update(kwargs)
+            self._changed((todo_id,))
+            return Todo.from_dict(t)
+
+    def delete(self, todo_id: int) -> bool:
+        """Delete todo by ID."""
+        with self._lock:
+            if self._todos.pop(todo_id, None) is None:
+                return False
+            self._changed((todo_id,))
+            return True
+
+    def apply_batch(self, ops: Iterable[BatchOp], atomic: bool = False) -> List[BatchResult]:
+        """Run add/complete/delete operations as one unit.
+
+        Each operation gets a result; completing or deleting a missing id
+        fails that item only. With ``atomic``, any failure means nothing
+        is applied.
+        """
+        ops = list(ops)
+        with self._lock:
+            # Todos as this batch leaves them (None: deleted by it).
+            view: Dict[int, Optional[dict]] = {}
+            results = []
+            next_id = self._max_id + 1
+            for op in ops:
+                if op.action == BatchAction.ADD:
+                    todo = Todo(id=next_id, title=op.title, description=op.description)
+                    next_id += 1
+                    view[todo.id] = todo.to_dict()
+                    results.append(BatchResult(op, todo))
+                    continue
+                t = view[op.todo_id] if op.todo_id in view else self._todos.get(op.todo_id)
+                if t is None:
+                    results.append(not_found(op))
+                elif op.action == BatchAction.COMPLETE:
+                    t = view[op.todo_id] = {**t, "status": TodoStatus.DONE.value}
+                    results.append(BatchResult(op, Todo.from_dict(t)))
+                else:
+                    view[op.todo_id] = None
+                    results.append(BatchResult(op))
+            if atomic and not all(r.ok for r in results):
+                return results
+            for i, t in view.items():
+                if t is None:
+                    self._todos.pop(i, None)
+                else:
+                    self._todos[i] = t
+            self._max_id = next_id - 1
+            self._changed(view)
+        return results
+
+    def import_todos(self, todos: Iterable[Todo], chunk_size: int = 10000, keep_ids: bool = False) -> int:
+        """Bulk-insert todos and return how many were added.
+
+        There is nothing to batch writes for, so ``chunk_size`` is ignored
+        and the import is all or nothing. Unless ``keep_ids`` is set, ids are
+        reassigned after the current maximum; with it, an id that is already
+        taken raises ``ValueError``.
+        """
+        records = [t.to_dict() for t in todos]
+        with self._lock:
+            if keep_ids:
+                seen = set()
+                for r in records:
+                    if r["id"] in self._todos or r["id"] in seen:
+                        raise ValueError(f"Todo with ID {r['id']} already exists")
+                    seen.add(r["id"])
+            else:
+                for todo_id, r in enumerate(records, start=self._max_id + 1):
+                    r["id"] = todo_id
+            for r in records:
+                self._todos[r["id"]] = r
+            self._max_id = max(self._max_id, max(self._todos, default=0))
+            if keep_ids:
+                _sort_by_id(self._todos)
+            self._changed([r["id"] for r in records])
+        return len(records)
+
+    def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Todo]:
+        """Find todos whose title or description contain every query word."""
+        with self._lock:
+            if self._search_index is None:
+                from todo_cli.search import SearchIndex
+
+                self._search_index = SearchIndex(sqlite3.connect(":memory:", check_same_thread=False))
+                with self._search_index.conn:
+                    self._search_index.rebuild(self._todos.values())
+            hits = self._search_index.search(query, limit=limit, prefix=prefix)
+            return [Todo.from_dict(self._todos[i]) for i, _ in hits if i in self._todos]
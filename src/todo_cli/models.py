@@ -1,8 +1,10 @@
 """Todo data models."""
+from array import array
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Optional
 
 
 class TodoStatus(str, Enum):
@@ -11,7 +13,10 @@ class TodoStatus(str, Enum):
     DONE = "done"
 
 
-@dataclass
+_STATUS_BY_VALUE = {s.value: s for s in TodoStatus}
+
+
+@dataclass(slots=True)
 class Todo:
     """Todo item model."""
 
@@ -34,10 +39,153 @@ class Todo:
     @classmethod
     def from_dict(cls, data: dict) -> "Todo":
         """Create from dictionary."""
+        status = data.get("status", "pending")
+        created_at = data.get("created_at")
         return cls(
             id=data["id"],
             title=data["title"],
             description=data.get("description"),
-            status=TodoStatus(data.get("status", TodoStatus.PENDING)),
-            created_at=data.get("created_at", datetime.now().isoformat()),
+            status=_STATUS_BY_VALUE.get(status) or TodoStatus(status),
+            created_at=created_at if created_at is not None else datetime.now().isoformat(),
+        )
+
+
+@dataclass
+class TodoStats:
+    """Aggregates a store keeps up to date on every write.
+
+    ``next_id`` is a high-water mark: ids of deleted todos are not reused.
+    ``modified`` is the ISO time of the last write, if known.
+    """
+
+    counts: Dict[str, int]
+    next_id: int = 1
+    modified: Optional[str] = None
+
+    @property
+    def total(self) -> int:
+        """Number of todos in the store."""
+        return sum(self.counts.values())
+
+    @classmethod
+    def of(cls, records: Iterable[dict], next_id: int = 1, modified: Optional[str] = None) -> "TodoStats":
+        """Count ``records`` by status."""
+        counts = dict.fromkeys(_STATUS_BY_VALUE, 0)
+        for r in records:
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+        return cls(counts, next_id, modified)
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {"next_id": self.next_id, "counts": dict(self.counts), "modified": self.modified}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TodoStats":
+        """Create from dictionary."""
+        counts = dict.fromkeys(_STATUS_BY_VALUE, 0)
+        counts.update(data.get("counts", {}))
+        return cls(counts, data.get("next_id", 1), data.get("modified"))
+
+
+_STATUS_CODES: List[TodoStatus] = list(TodoStatus)
+_CODE_BY_VALUE = {s.value: code for code, s in enumerate(_STATUS_CODES)}
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def epoch_micros(created_at) -> int:
+    """Return a naive ISO timestamp (or datetime) as microseconds since the epoch, 0 if invalid."""
+    try:
+        if not isinstance(created_at, datetime):
+            created_at = datetime.fromisoformat(created_at)
+        return (created_at - _EPOCH) // _MICROSECOND
+    except (TypeError, ValueError):
+        return 0
+
+
+class TodoColumns:
+    """Column-oriented, read-only container for many todos.
+
+    Ids and ``created_at`` (microseconds since the epoch, as naive time) are
+    stored in ``array`` buffers and statuses as one byte code per todo, so a
+    large list costs a fraction of the memory of ``Todo`` objects and status
+    filters scan a byte buffer. Timestamps that do not round-trip exactly
+    are kept verbatim on the side.
+    """
+
+    __slots__ = ("ids", "titles", "descriptions", "statuses", "created", "_created_raw")
+
+    def __init__(self):
+        """Initialize empty columns."""
+        self.ids = array("q")
+        self.titles: List[str] = []
+        self.descriptions: List[Optional[str]] = []
+        self.statuses = bytearray()
+        self.created = array("q")
+        self._created_raw: Dict[int, str] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "TodoColumns":
+        """Build columns from todo dicts."""
+        columns = cls()
+        for record in records:
+            columns.append(record)
+        return columns
+
+    def append(self, record: dict) -> None:
+        """Append one todo dict."""
+        self.ids.append(record["id"])
+        self.titles.append(record["title"])
+        self.descriptions.append(record.get("description"))
+        self.statuses.append(_CODE_BY_VALUE[record.get("status", "pending")])
+        created_at = record.get("created_at")
+        micros = epoch_micros(created_at)
+        self.created.append(micros)
+        if self._format_created(micros) != created_at:
+            self._created_raw[len(self.ids) - 1] = created_at
+
+    @staticmethod
+    def _format_created(micros: int) -> str:
+        """Format an epoch-microsecond timestamp as an ISO string."""
+        return (_EPOCH + micros * _MICROSECOND).isoformat()
+
+    def __len__(self) -> int:
+        """Return the number of todos."""
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> Todo:
+        """Materialise the todo at position ``i``."""
+        if i < 0:
+            i += len(self.ids)
+        created_at = self._created_raw.get(i)
+        return Todo(
+            id=self.ids[i],
+            title=self.titles[i],
+            description=self.descriptions[i],
+            status=_STATUS_CODES[self.statuses[i]],
+            created_at=created_at if created_at is not None else self._format_created(self.created[i]),
         )
+
+    def __iter__(self) -> Iterator[Todo]:
+        """Materialise todos one at a time."""
+        for i in range(len(self.ids)):
+            yield self[i]
+
+    def select(self, positions: Iterable[int]) -> "TodoColumns":
+        """Return new columns holding only the given positions."""
+        columns = TodoColumns()
+        for i in positions:
+            columns.ids.append(self.ids[i])
+            columns.titles.append(self.titles[i])
+            columns.descriptions.append(self.descriptions[i])
+            columns.statuses.append(self.statuses[i])
+            columns.created.append(self.created[i])
+            if i in self._created_raw:
+                columns._created_raw[len(columns.ids) - 1] = self._created_raw[i]
+        return columns
+
+    def filter_status(self, status: TodoStatus) -> "TodoColumns":
+        """Return the todos with the given status."""
+        code = _CODE_BY_VALUE[TodoStatus(status).value]
+        mask = bytes(self.statuses).translate(bytes(int(c == code) for c in range(256)))
+        return self.select(compress(range(len(self.ids)), mask))
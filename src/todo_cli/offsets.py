@@ -0,0 +1,269 @@
+"""JSON storage with a memory-mapped id -> byte range index.
+
+The compact file layout puts every record on its own line, so a record can
+be read, and often rewritten, without touching the rest of the file. The
+``<file>.offsets`` sidecar maps each id to its line as a fixed-size table
+indexed by ``id - min_id``; it records the signature of the file it
+describes and is rebuilt by a line scan (no JSON parse) when that no longer
+matches.
+"""
+import mmap
+import os
+import re
+import struct
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from todo_cli import fileformat, tracing
+from todo_cli.durability import Durability
+from todo_cli.fileformat import FileFormat
+from todo_cli.locking import FileLock
+from todo_cli.models import Todo, TodoStats, TodoStatus
+from todo_cli.storage import TodoStorage
+
+MAGIC = b"TODOOFF1"
+# magic, file inode, mtime_ns, size, min id, entry count
+_HEADER = struct.Struct("<8sQqqqq")
+# byte offset, length (0 = no todo with this id)
+_ENTRY = struct.Struct("<qi")
+_ID_RE = re.compile(rb'\{"id":(-?\d+)[,}]')
+# Ids are handed out sequentially; give up on tables mostly made of gaps.
+MAX_SPARSENESS = 4
+
+
+def scan_offsets(data) -> Iterator[Tuple[int, int, int]]:
+    """Yield ``(id, offset, length)`` for each record line of a compact store."""
+    _, layout, pos = fileformat.read_header(data[:4096])
+    if layout != FileFormat.COMPACT:
+        raise ValueError("Only compact stores can be indexed")
+    end = len(data)
+    while pos < end:
+        nl = data.find(b"\n", pos)
+        if nl < 0:
+            nl = end
+        line_end = nl - 1 if nl > pos and data[nl - 1:nl] == b"," else nl
+        if data[pos:pos + 1] == b"{":
+            line = data[pos:line_end]
+            match = _ID_RE.match(line)
+            todo_id = int(match.group(1)) if match else fileformat.loads(line)["id"]
+            yield todo_id, pos, line_end - pos
+        pos = nl + 1
+
+
+class OffsetIndex:
+    """Read-only view of an offsets sidecar."""
+
+    def __init__(self, path: Path):
+        """Map the sidecar at ``path``."""
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, ino, mtime_ns, size, self.min_id, self.count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != _HEADER.size + self.count * _ENTRY.size:
+            self._map.close()
+            raise ValueError(f"Corrupt offsets index {path}")
+        self.sig = (ino, mtime_ns, size)
+
+    @staticmethod
+    def write(path: Path, sig: Tuple[int, int, int], entries: List[Tuple[int, int, int]]) -> bool:
+        """Write a sidecar describing a file with signature ``sig``.
+
+        Returns False (and removes any old sidecar) if the ids are too
+        sparse for a dense table.
+        """
+        min_id = min((e[0] for e in entries), default=0)
+        count = max((e[0] for e in entries), default=min_id - 1) - min_id + 1
+        if count > MAX_SPARSENESS * len(entries) + 1024:
+            path.unlink(missing_ok=True)
+            return False
+        table = bytearray(count * _ENTRY.size)
+        for todo_id, offset, length in entries:
+            _ENTRY.pack_into(table, (todo_id - min_id) * _ENTRY.size, offset, length)
+        fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, *sig, min_id, count))
+                f.write(table)
+            os.replace(tmp, path)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+        return True
+
+    @staticmethod
+    def restamp(path: Path, sig: Tuple[int, int, int]) -> None:
+        """Point an existing sidecar at a new signature of the same layout."""
+        with open(path, "r+b") as f:
+            f.seek(8)
+            f.write(struct.pack("<Qqq", *sig))
+
+    def lookup(self, todo_id: int) -> Optional[Tuple[int, int]]:
+        """Return ``(offset, length)`` of the record for ``todo_id``."""
+        i = todo_id - self.min_id
+        if not 0 <= i < self.count:
+            return None
+        offset, length = _ENTRY.unpack_from(self._map, _HEADER.size + i * _ENTRY.size)
+        return (offset, length) if length else None
+
+    def close(self) -> None:
+        """Unmap the sidecar."""
+        self._map.close()
+
+
+class IndexedTodoStorage(TodoStorage):
+    """JSON storage with O(1) point reads and in-place updates.
+
+    ``get_by_id`` maps the store and decodes only the requested line.
+    ``update`` rewrites a record inside its own line when the new encoding
+    fits (padding with spaces), which covers completing a todo, and patches
+    the header aggregates the same way; anything else, and every create and
+    delete, is a regular full save that also rewrites the sidecar. The store
+    is always kept in the compact layout.
+
+    In-place updates are the one write that does not go through an atomic
+    rename; they overwrite a single line and the header, each a few hundred
+    bytes, and are fsynced as the durability policy says.
+    """
+
+    def __init__(self, filepath: str = "todos.json", durability: Optional[Durability] = None):
+        """Initialize storage with file path."""
+        self.offsets_path = Path(filepath).with_name(Path(filepath).name + ".offsets")
+        self._offsets: Optional[OffsetIndex] = None
+        self._new_offsets: Optional[List[Tuple[int, int, int]]] = None
+        super().__init__(filepath, file_format=FileFormat.COMPACT, durability=durability)
+
+    def _encode(self, todos: Dict[int, dict]) -> bytes:
+        """Serialise todos and remember where each record lands."""
+        self._new_offsets = []
+        return fileformat.encode(todos.values(), self._layout, offsets=self._new_offsets, meta=self._meta(todos))
+
+    def _save(self, todos: Dict[int, dict]) -> None:
+        """Save todos to file and write the matching sidecar."""
+        try:
+            super()._save(todos)
+            if self._layout != FileFormat.COMPACT:
+                self.offsets_path.unlink(missing_ok=True)
+                return
+            with tracing.span("offsets.write", records=len(self._new_offsets)):
+                OffsetIndex.write(self.offsets_path, self._cache_sig, self._new_offsets)
+        finally:
+            self._new_offsets = None
+
+    def _index(self, sig: Tuple[int, int, int]) -> Optional[OffsetIndex]:
+        """Return the sidecar for the file state ``sig``, rebuilding it if stale."""
+        if self._offsets is not None and self._offsets.sig == sig:
+            return self._offsets
+        if self._offsets is not None:
+            self._offsets.close()
+            self._offsets = None
+        try:
+            index = OffsetIndex(self.offsets_path)
+        except (OSError, ValueError):
+            index = None
+        if index is None or index.sig != sig:
+            if index is not None:
+                index.close()
+            with open(self.filepath, "rb") as f, tracing.span("offsets.scan") as span:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    try:
+                        entries = list(scan_offsets(data))
+                    except ValueError:
+                        return None
+                span.add(records=len(entries))
+            if self._stat_sig() != sig or not OffsetIndex.write(self.offsets_path, sig, entries):
+                return None  # changed while scanning, or too sparse: fall back
+            index = OffsetIndex(self.offsets_path)
+        self._offsets = index
+        return index
+
+    def _read_line(self, offset: int, length: int) -> bytes:
+        """Read one record line through a memory map."""
+        with open(self.filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return data[offset:offset + length]
+
+    def get_by_id(self, todo_id: int) -> Optional[Todo]:
+        """Get todo by ID, decoding only its record."""
+        with self._lock:
+            sig = self._stat_sig()
+            if self._cache is not None and sig == self._cache_sig:
+                return super().get_by_id(todo_id)
+            index = self._index(sig)
+            if index is None:
+                return super().get_by_id(todo_id)
+            where = index.lookup(todo_id)
+            if where is None:
+                return None
+            with tracing.span("offsets.read", records=1):
+                record = fileformat.loads(self._read_line(*where))
+        return Todo.from_dict(record)
+
+    def update(self, todo_id: int, **kwargs) -> Optional[Todo]:
+        """Update todo by ID, in place when the record still fits its line."""
+        if "status" in kwargs:
+            kwargs["status"] = TodoStatus(kwargs["status"]).value
+        with self._lock, FileLock(self.lock_path):
+            sig = self._stat_sig()
+            index = self._index(sig)
+            where = index.lookup(todo_id) if index is not None else None
+            if where is not None:
+                offset, length = where
+                record = fileformat.loads(self._read_line(offset, length))
+                old_status = record["status"]
+                record.update(kwargs)
+                line = fileformat.dumps(record)
+                head = self._patched_header(old_status, record["status"])
+                if len(line) <= length and head is not None:
+                    self._write_in_place([(0, head), (offset, line.ljust(length))])
+                    if self._cache is not None and self._cache_sig == sig:
+                        self._cache[todo_id] = record
+                    else:
+                        self._cache = None
+                    self._cache_sig = self._offsets.sig
+                    self._after_save({todo_id: record}, (todo_id,), sig)
+                    return Todo.from_dict(record)
+            elif index is not None:
+                return None
+        return super().update(todo_id, **kwargs)
+
+    def _patched_header(self, old_status: str, new_status: str) -> Optional[bytes]:
+        """Header line for an in-place update, or None if it outgrows the current one.
+
+        Trailing spaces pad a shorter header, so records keep their offsets.
+        """
+        with open(self.filepath, "rb") as f:
+            first = f.read(4096)
+        end = first.find(b"\n")
+        meta = fileformat.read_meta(first)
+        if meta is None or end < 0:
+            return None
+        stats = TodoStats.from_dict(meta)
+        stats.counts[old_status] -= 1
+        stats.counts[new_status] = stats.counts.get(new_status, 0) + 1
+        stats.modified = datetime.now().isoformat(timespec="microseconds")
+        head = fileformat.header(FileFormat.COMPACT, stats.to_dict())[:-1]
+        return head.ljust(end) if len(head) <= end else None
+
+    def _write_in_place(self, writes: List[Tuple[int, bytes]]) -> None:
+        """Overwrite ``(offset, data)`` spans of the file and restamp the sidecar."""
+        with tracing.span("offsets.write_in_place", bytes_written=sum(len(d) for _, d in writes)):
+            fd = os.open(self.filepath, os.O_WRONLY)
+            try:
+                for offset, data in writes:
+                    os.pwrite(fd, data, offset)
+                self._syncer.sync(fd)
+                # Same inode and size: make sure the mtime moves so other
+                # processes' caches notice, even within one clock tick.
+                now = time.time_ns()
+                os.utime(fd, ns=(now, max(now, self._offsets.sig[1] + 1)))
+            finally:
+                os.close(fd)
+        sig = self._stat_sig()
+        OffsetIndex.restamp(self.offsets_path, sig)
+        self._offsets.sig = sig
+
+    def watch_paths(self) -> List[Path]:
+        """Files whose changes mean another writer touched the store."""
+        return [self.filepath]
@@ -0,0 +1,163 @@
+"""Filtered, sorted queries over todos.
+
+``TodoIndex`` keeps sorted secondary indexes on ``created_at`` (as epoch
+microseconds) and on case-folded titles next to the id order. A query
+bisects the index that narrows it most (the ``since``/``until`` range or
+the title prefix) and walks only that slice, so its cost follows the
+number of rows in range rather than the size of the store. When the
+walked index is also the requested sort order, rows stream out and
+``limit`` stops the walk early; otherwise the slice is sorted.
+
+``scan`` answers the same queries by filtering a record stream, for
+backends without these indexes.
+"""
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from todo_cli.models import TodoStatus, epoch_micros
+
+_TOP = "\U0010ffff"
+
+
+class SortKey(str, Enum):
+    """Orders ``todo list`` can sort by."""
+    ID = "id"
+    CREATED = "created"
+    TITLE = "title"
+
+
+@dataclass
+class Query:
+    """Filters, order and paging of a todo listing.
+
+    ``since`` is inclusive and ``until`` exclusive; ``title_prefix`` is
+    matched case-insensitively.
+    """
+
+    status: Optional[TodoStatus] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    title_prefix: Optional[str] = None
+    after_id: Optional[int] = None
+    sort: SortKey = SortKey.ID
+    reverse: bool = False
+    limit: Optional[int] = None
+    offset: int = 0
+
+    def __post_init__(self):
+        self._since = None if self.since is None else epoch_micros(self.since)
+        self._until = None if self.until is None else epoch_micros(self.until)
+        self._prefix = None if self.title_prefix is None else self.title_prefix.casefold()
+
+    def matches(self, record: dict) -> bool:
+        """Whether ``record`` passes every filter."""
+        if self.status is not None and record["status"] != self.status.value:
+            return False
+        if self.after_id is not None and record["id"] <= self.after_id:
+            return False
+        if self._since is not None or self._until is not None:
+            created = epoch_micros(record.get("created_at"))
+            if self._since is not None and created < self._since:
+                return False
+            if self._until is not None and created >= self._until:
+                return False
+        return self._prefix is None or record["title"].casefold().startswith(self._prefix)
+
+    def sort_key(self) -> Callable[[dict], tuple]:
+        """Key function for the requested order; ties break by id."""
+        if self.sort == SortKey.CREATED:
+            return lambda r: (epoch_micros(r.get("created_at")), r["id"])
+        if self.sort == SortKey.TITLE:
+            return lambda r: (r["title"].casefold(), r["id"])
+        return lambda r: (r["id"],)
+
+    def page(self, records: Iterable[dict]) -> List[dict]:
+        """Apply ``offset`` and ``limit`` to records already in order."""
+        stop = None if self.limit is None else self.offset + self.limit
+        return list(islice(records, self.offset, stop))
+
+
+def scan(records: Iterable[dict], query: Query) -> List[dict]:
+    """Answer ``query`` by filtering records given in id order."""
+    matches = (r for r in records if query.matches(r))
+    if query.sort != SortKey.ID or query.reverse:
+        matches = sorted(matches, key=query.sort_key(), reverse=query.reverse)
+    return query.page(matches)
+
+
+class TodoIndex:
+    """Sorted secondary indexes over a set of todo records."""
+
+    def __init__(self, records: Iterable[dict] = ()):
+        """Build the indexes from ``records``."""
+        self._keys: Dict[int, Tuple[int, str]] = {
+            r["id"]: (epoch_micros(r.get("created_at")), r["title"].casefold()) for r in records
+        }
+        self._ids = sorted(self._keys)
+        self._created = sorted((created, i) for i, (created, _) in self._keys.items())
+        self._titles = sorted((title, i) for i, (_, title) in self._keys.items())
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, record: dict) -> None:
+        """Index a new or changed record."""
+        self.remove(record["id"])
+        created, title = self._keys[record["id"]] = (
+            epoch_micros(record.get("created_at")), record["title"].casefold()
+        )
+        insort(self._ids, record["id"])
+        insort(self._created, (created, record["id"]))
+        insort(self._titles, (title, record["id"]))
+
+    def remove(self, todo_id: int) -> None:
+        """Drop a record from the indexes, if present."""
+        keys = self._keys.pop(todo_id, None)
+        if keys is None:
+            return
+        created, title = keys
+        del self._ids[bisect_left(self._ids, todo_id)]
+        del self._created[bisect_left(self._created, (created, todo_id))]
+        del self._titles[bisect_left(self._titles, (title, todo_id))]
+
+    def _ranges(self, query: Query) -> List[Tuple[int, SortKey, int, int]]:
+        """Candidate ``(size, index, start, stop)`` slices narrowing ``query``."""
+        ranges = []
+        if query._since is not None or query._until is not None:
+            start = 0 if query._since is None else bisect_left(self._created, (query._since,))
+            stop = len(self._created) if query._until is None else bisect_left(self._created, (query._until,))
+            ranges.append((max(stop - start, 0), SortKey.CREATED, start, stop))
+        if query._prefix is not None:
+            start = bisect_left(self._titles, (query._prefix,))
+            stop = bisect_left(self._titles, (query._prefix + _TOP,))
+            ranges.append((stop - start, SortKey.TITLE, start, stop))
+        if query.after_id is not None:
+            start = bisect_left(self._ids, query.after_id + 1)
+            ranges.append((len(self._ids) - start, SortKey.ID, start, len(self._ids)))
+        return ranges
+
+    def _walk(self, key: SortKey, start: int, stop: int, reverse: bool) -> Iterator[int]:
+        """Yield ids from a slice of one index."""
+        positions = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+        if key == SortKey.ID:
+            return (self._ids[p] for p in positions)
+        entries = self._created if key == SortKey.CREATED else self._titles
+        return (entries[p][1] for p in positions)
+
+    def select(self, query: Query, records: Dict[int, dict]) -> List[dict]:
+        """Answer ``query`` against ``records``, the todos this index describes."""
+        ranges = self._ranges(query)
+        # Prefer the smallest slice; on a tie, the one already in sort order.
+        size, key, start, stop = min(
+            ranges or [(len(self._ids), query.sort, 0, len(self._ids))],
+            key=lambda r: (r[0], r[1] != query.sort),
+        )
+        rows = (records[i] for i in self._walk(key, start, stop, query.reverse))
+        matches = (r for r in rows if query.matches(r))
+        if key != query.sort:
+            matches = sorted(matches, key=query.sort_key(), reverse=query.reverse)
+        return query.page(matches)
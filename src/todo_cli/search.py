@@ -0,0 +1,194 @@
+"""Persisted inverted index for full-text todo search."""
+import json
+import math
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+
+TITLE_WEIGHT = 2.0
+PREFIX_PENALTY = 0.8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_postings (
+    term TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    tf REAL NOT NULL,
+    PRIMARY KEY (term, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_search_postings_id ON search_postings (id);
+CREATE TABLE IF NOT EXISTS search_docs (id INTEGER PRIMARY KEY, record TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS search_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def term_frequencies(record: dict) -> Dict[str, float]:
+    """Return weighted term frequencies for a todo's title and description."""
+    tf: Dict[str, float] = {}
+    for term in tokenize(record.get("title")):
+        tf[term] = tf.get(term, 0.0) + TITLE_WEIGHT
+    for term in tokenize(record.get("description")):
+        tf[term] = tf.get(term, 0.0) + 1.0
+    return tf
+
+
+class SearchIndex:
+    """Inverted index over todo titles and descriptions.
+
+    Postings are rows of ``(term, id, tf)`` keyed by term then id in SQLite,
+    so a prefix lookup is a B-tree range scan and re-indexing one todo only
+    touches its own postings. Each indexed todo is also stored whole, so
+    hits can be returned without loading the store. The caller owns
+    transactions: the index shares the connection it is given.
+
+    File-backed stores record a ``stamp`` of the store file the index was
+    last synchronised with, so an index left behind by a writer that did not
+    maintain it is detected and rebuilt.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, create: bool = True):
+        """Initialize the index on an open connection.
+
+        ``create`` makes sure the tables exist; ``executescript`` commits any
+        open transaction, so pass False when attaching inside one.
+        """
+        self._conn = conn
+        if create:
+            self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def open(cls, path: Path) -> "SearchIndex":
+        """Open (or create) a standalone index database."""
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return cls(conn)
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self._conn.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The connection holding the index, for transaction control."""
+        return self._conn
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Read a metadata value."""
+        row = self._conn.execute("SELECT value FROM search_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """Write a metadata value."""
+        self._conn.execute(
+            "INSERT INTO search_meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    @property
+    def stamp(self) -> Optional[str]:
+        """Signature of the store state the index reflects."""
+        return self.get_meta("stamp")
+
+    @stamp.setter
+    def stamp(self, value: str) -> None:
+        self.set_meta("stamp", value)
+
+    def _doc_count(self) -> int:
+        """Number of indexed todos."""
+        return int(self.get_meta("docs") or 0)
+
+    def upsert(self, records: Iterable[dict]) -> None:
+        """Index or re-index todos."""
+        added = 0
+        for record in records:
+            todo_id = record["id"]
+            self._conn.execute("DELETE FROM search_postings WHERE id = ?", (todo_id,))
+            added += self._conn.execute(
+                "INSERT OR IGNORE INTO search_docs (id, record) VALUES (?, '')", (todo_id,)
+            ).rowcount
+            self._conn.execute(
+                "UPDATE search_docs SET record = ? WHERE id = ?", (json.dumps(record), todo_id)
+            )
+            self._conn.executemany(
+                "INSERT INTO search_postings (term, id, tf) VALUES (?, ?, ?)",
+                ((term, todo_id, tf) for term, tf in term_frequencies(record).items()),
+            )
+        if added:
+            self.set_meta("docs", str(self._doc_count() + added))
+
+    def remove(self, ids: Iterable[int]) -> None:
+        """Drop todos from the index."""
+        removed = 0
+        for todo_id in ids:
+            self._conn.execute("DELETE FROM search_postings WHERE id = ?", (todo_id,))
+            removed += self._conn.execute("DELETE FROM search_docs WHERE id = ?", (todo_id,)).rowcount
+        if removed:
+            self.set_meta("docs", str(self._doc_count() - removed))
+
+    def rebuild(self, records: Iterable[dict]) -> None:
+        """Replace the whole index with the given todos."""
+        self._conn.execute("DELETE FROM search_postings")
+        self._conn.execute("DELETE FROM search_docs")
+        self.set_meta("docs", "0")
+        self.upsert(records)
+
+    def records(self, ids: List[int]) -> List[dict]:
+        """Return the indexed todo dicts for ``ids``, in the given order."""
+        found = {}
+        for i in range(0, len(ids), 500):
+            batch = ids[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            for todo_id, record in self._conn.execute(
+                f"SELECT id, record FROM search_docs WHERE id IN ({placeholders})", batch
+            ):
+                found[todo_id] = json.loads(record)
+        return [found[i] for i in ids if i in found]
+
+    def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Tuple[int, float]]:
+        """Return ``(id, score)`` pairs matching every query token, best first.
+
+        Each query token matches equal terms and, with ``prefix``, any term
+        starting with it (scored slightly lower). Scores are tf-idf sums.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        docs = max(self._doc_count(), 1)
+        scores: Optional[Dict[int, float]] = None
+        for token in dict.fromkeys(tokens):
+            if prefix:
+                rows = self._conn.execute(
+                    "SELECT term, id, tf FROM search_postings WHERE term >= ? AND term < ?",
+                    (token, token + "\U0010ffff"),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT term, id, tf FROM search_postings WHERE term = ?", (token,)
+                ).fetchall()
+            df: Dict[str, int] = {}
+            for term, _, _ in rows:
+                df[term] = df.get(term, 0) + 1
+            token_scores: Dict[int, float] = {}
+            for term, todo_id, tf in rows:
+                score = tf * math.log(1 + docs / df[term])
+                if term != token:
+                    score *= PREFIX_PENALTY
+                if score > token_scores.get(todo_id, 0.0):
+                    token_scores[todo_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {i: s + token_scores[i] for i, s in scores.items() if i in token_scores}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if limit is None else ranked[:limit]
@@ -0,0 +1,392 @@
+"""Todo storage backend using SQLite."""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from todo_cli import fileformat, tracing
+from todo_cli.batch import BatchAction, BatchOp, BatchResult, not_found
+from todo_cli.durability import Durability, resolve
+from todo_cli.models import Todo, TodoColumns, TodoStats, TodoStatus
+from todo_cli.query import Query, SortKey
+from todo_cli.transfer import chunked
+
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_todos_status ON todos (status);
+CREATE INDEX IF NOT EXISTS idx_todos_created_at ON todos (created_at);
+CREATE INDEX IF NOT EXISTS idx_todos_title ON todos (title COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS todo_counts (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS todo_meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TRIGGER IF NOT EXISTS todos_stats_insert AFTER INSERT ON todos BEGIN
+    INSERT INTO todo_counts VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+    INSERT INTO todo_meta VALUES ('next_id', NEW.id + 1)
+        ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value);
+    INSERT OR REPLACE INTO todo_meta VALUES ('modified', strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'));
+END;
+CREATE TRIGGER IF NOT EXISTS todos_stats_update AFTER UPDATE ON todos BEGIN
+    UPDATE todo_counts SET count = count - 1 WHERE status = OLD.status;
+    INSERT INTO todo_counts VALUES (NEW.status, 1)
+        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+    INSERT OR REPLACE INTO todo_meta VALUES ('modified', strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'));
+END;
+CREATE TRIGGER IF NOT EXISTS todos_stats_delete AFTER DELETE ON todos BEGIN
+    UPDATE todo_counts SET count = count - 1 WHERE status = OLD.status;
+    INSERT OR REPLACE INTO todo_meta VALUES ('modified', strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'));
+END;
+"""
+
+# Ids are never reused: the high-water mark kept by the insert trigger wins
+# over MAX(id) + 1 once the newest todo has been deleted.
+NEXT_ID = """
+SELECT MAX(
+    COALESCE((SELECT value FROM todo_meta WHERE key = 'next_id'), 1),
+    (SELECT COALESCE(MAX(id), 0) + 1 FROM todos)
+)
+"""
+
+COLUMNS = ("id", "title", "description", "status", "created_at")
+
+# SQLite's own crash safety covers atomicity; the policy only picks when it
+# fsyncs. NORMAL in WAL mode syncs at checkpoints, not every commit.
+SYNCHRONOUS = {Durability.ALWAYS: "FULL", Durability.INTERVAL: "NORMAL", Durability.NONE: "OFF"}
+
+
+class SqliteTodoStorage:
+    """SQLite storage for todos, with the same public API as ``TodoStorage``.
+
+    The database runs in WAL mode with indexes on ``status`` and
+    ``created_at``; ``durability`` maps to ``PRAGMA synchronous``. When a
+    new database is created and ``migrate_from`` points at an existing JSON
+    store, its todos are imported once.
+
+    Once ``search`` has been used, its inverted index lives in the same
+    database and is updated in the same transaction as each mutation.
+    Triggers keep per-status counts and the id high-water mark in
+    ``todo_counts`` and ``todo_meta`` for ``stats``.
+    """
+
+    def __init__(
+        self,
+        filepath: str = "todos.db",
+        migrate_from: Optional[str] = "todos.json",
+        durability: Optional[Durability] = None,
+    ):
+        """Initialize storage with database path and optional JSON source."""
+        self.filepath = Path(filepath)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.filepath), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={SYNCHRONOUS[resolve(durability)]}")
+        self._ensure_schema(migrate_from)
+        self._search_index = None
+        self._live_index()
+
+    def _open_index(self, create: bool = True):
+        """Attach the search index tables to this database."""
+        from todo_cli.search import SearchIndex
+
+        self._search_index = SearchIndex(self._conn, create=create)
+        return self._search_index
+
+    def _live_index(self):
+        """Return the search index, noticing one created by another connection.
+
+        Writers call this after their first statement, when the transaction
+        holds the write lock and sees the latest schema, so no connection can
+        build the index between the check and the write.
+        """
+        if self._search_index is None and self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_postings'"
+        ).fetchone():
+            self._open_index(create=False)
+        return self._search_index
+
+    def _ensure_schema(self, migrate_from: Optional[str]) -> None:
+        """Create the schema and run the one-shot JSON migration."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            if version == 0 and migrate_from is not None:
+                self._migrate_json(Path(migrate_from))
+            if version > 0:
+                # Rows written before the stats triggers existed.
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO todo_counts SELECT status, COUNT(*) FROM todos GROUP BY status"
+                )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _migrate_json(self, source: Path) -> None:
+        """Import todos from a JSON store."""
+        if not source.exists():
+            return
+        _, _, records = fileformat.decode(source.read_bytes())
+        rows = (self._to_row(Todo.from_dict(t)) for t in records)
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO todos VALUES (?, ?, ?, ?, ?)", rows
+        )
+
+    @staticmethod
+    def _to_row(todo: Todo) -> tuple:
+        """Convert a todo to a row tuple."""
+        return (todo.id, todo.title, todo.description, todo.status.value, todo.created_at)
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Todo:
+        """Convert a row to a todo."""
+        return Todo(
+            id=row["id"],
+            title=row["title"],
+            description=row["description"],
+            status=TodoStatus(row["status"]),
+            created_at=row["created_at"],
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def _insert(self, title: str, description: Optional[str]) -> Todo:
+        """Insert a todo; the caller holds the lock and a transaction."""
+        todo = Todo(id=0, title=title, description=description)
+        cur = self._conn.execute(
+            f"INSERT INTO todos VALUES (({NEXT_ID}), ?, ?, ?, ?)", self._to_row(todo)[1:]
+        )
+        todo.id = cur.lastrowid
+        if self._live_index() is not None:
+            self._search_index.upsert([todo.to_dict()])
+        return todo
+
+    def create(self, title: str, description: Optional[str] = None) -> Todo:
+        """Create a new todo."""
+        with self._lock, self._conn:
+            return self._insert(title, description)
+
+    def watch_paths(self) -> List[Path]:
+        """Files whose changes mean another writer touched the store."""
+        return [self.filepath, self.filepath.with_name(self.filepath.name + "-wal")]
+
+    def get_all(self, status: Optional[TodoStatus] = None) -> List[Todo]:
+        """Get all todos, optionally filtered by status."""
+        with self._lock, tracing.span("sqlite.query") as span:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT * FROM todos WHERE status = ? ORDER BY id", (status.value,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT * FROM todos ORDER BY id").fetchall()
+            span.add(records=len(rows))
+        with tracing.span("model.from_row", records=len(rows)):
+            return [self._from_row(r) for r in rows]
+
+    def get_columns(self, status: Optional[TodoStatus] = None) -> TodoColumns:
+        """Get all todos as compact columns, optionally filtered by status."""
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT * FROM todos WHERE status = ? ORDER BY id", (status.value,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT * FROM todos ORDER BY id").fetchall()
+        return TodoColumns.from_records(dict(r) for r in rows)
+
+    def iter_todos(
+        self,
+        status: Optional[TodoStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[Todo]:
+        """Yield todos lazily, optionally filtered by status and paged.
+
+        Rows are fetched in keyset-paged batches so the lock is never held
+        while the caller consumes them.
+        """
+        where = "id > ?" if status is None else "status = ? AND id > ?"
+        params = () if status is None else (status.value,)
+        last_id = after_id or 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT * FROM todos WHERE {where} ORDER BY id LIMIT ? OFFSET ?",
+                    (*params, last_id, size, offset),
+                ).fetchall()
+            if not rows:
+                return
+            offset = 0
+            for row in rows:
+                yield self._from_row(row)
+            last_id = rows[-1]["id"]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def query(self, query: Query) -> List[Todo]:
+        """Run a filtered, sorted listing with SQL on the created_at and title indexes."""
+        where, params = [], []
+        if query.status is not None:
+            where.append("status = ?")
+            params.append(query.status.value)
+        if query.after_id is not None:
+            where.append("id > ?")
+            params.append(query.after_id)
+        if query.since is not None:
+            where.append("created_at >= ?")
+            params.append(query.since.isoformat())
+        if query.until is not None:
+            where.append("created_at < ?")
+            params.append(query.until.isoformat())
+        if query.title_prefix is not None:
+            where.append("title >= ? COLLATE NOCASE AND title < ? COLLATE NOCASE")
+            params.extend((query.title_prefix, query.title_prefix + "\U0010ffff"))
+        direction = " DESC" if query.reverse else ""
+        order = {
+            SortKey.ID: "id",
+            SortKey.CREATED: "created_at{0}, id",
+            SortKey.TITLE: "title COLLATE NOCASE{0}, id",
+        }[query.sort].format(direction)
+        sql = f"SELECT * FROM todos {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {order}{direction}"
+        sql += " LIMIT ? OFFSET ?"
+        params.extend((-1 if query.limit is None else query.limit, query.offset))
+        with self._lock, tracing.span("sqlite.query") as span:
+            rows = self._conn.execute(sql, params).fetchall()
+            span.add(records=len(rows))
+        return [self._from_row(r) for r in rows]
+
+    def get_by_id(self, todo_id: int) -> Optional[Todo]:
+        """Get todo by ID."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM todos WHERE id = ?", (todo_id,)).fetchone()
+        return self._from_row(row) if row is not None else None
+
+    def stats(self) -> TodoStats:
+        """Return counts per status, the next id and the last write time."""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, count FROM todo_counts").fetchall())
+            next_id = self._conn.execute(NEXT_ID).fetchone()[0]
+            row = self._conn.execute("SELECT value FROM todo_meta WHERE key = 'modified'").fetchone()
+        return TodoStats.from_dict({"counts": counts, "next_id": next_id, "modified": row and row[0]})
+
+    def update(self, todo_id: int, **kwargs) -> Optional[Todo]:
+        """Update todo by ID."""
+        fields = {}
+        for key, value in kwargs.items():
+            if key not in COLUMNS or key == "id":
+                raise ValueError(f"Unknown todo field: {key}")
+            if key == "status":
+                value = TodoStatus(value).value
+            fields[key] = value
+        with self._lock, self._conn:
+            return self._update_row(todo_id, fields)
+
+    def _update_row(self, todo_id: int, fields: dict) -> Optional[Todo]:
+        """Update a row; the caller holds the lock and a transaction."""
+        if fields:
+            assignments = ", ".join(f"{key} = ?" for key in fields)
+            self._conn.execute(
+                f"UPDATE todos SET {assignments} WHERE id = ?", (*fields.values(), todo_id)
+            )
+        row = self._conn.execute("SELECT * FROM todos WHERE id = ?", (todo_id,)).fetchone()
+        if row is not None and fields and self._live_index() is not None:
+            self._search_index.upsert([dict(row)])
+        return self._from_row(row) if row is not None else None
+
+    def _delete_row(self, todo_id: int) -> bool:
+        """Delete a row; the caller holds the lock and a transaction."""
+        cur = self._conn.execute("DELETE FROM todos WHERE id = ?", (todo_id,))
+        if cur.rowcount and self._live_index() is not None:
+            self._search_index.remove([todo_id])
+        return cur.rowcount > 0
+
+    def delete(self, todo_id: int) -> bool:
+        """Delete todo by ID."""
+        with self._lock, self._conn:
+            return self._delete_row(todo_id)
+
+    def apply_batch(self, ops: Iterable[BatchOp], atomic: bool = False) -> List[BatchResult]:
+        """Run add/complete/delete operations in one transaction.
+
+        Each operation gets a result; completing or deleting a missing id
+        fails that item only. With ``atomic``, any failure rolls the whole
+        transaction back.
+        """
+        results = []
+        with self._lock, self._conn:
+            for op in ops:
+                if op.action == BatchAction.ADD:
+                    results.append(BatchResult(op, self._insert(op.title, op.description)))
+                elif op.action == BatchAction.COMPLETE:
+                    todo = self._update_row(op.todo_id, {"status": TodoStatus.DONE.value})
+                    results.append(BatchResult(op, todo) if todo is not None else not_found(op))
+                else:
+                    results.append(BatchResult(op) if self._delete_row(op.todo_id) else not_found(op))
+            if atomic and not all(r.ok for r in results):
+                self._conn.rollback()
+        return results
+
+    def import_todos(self, todos: Iterable[Todo], chunk_size: int = 10000, keep_ids: bool = False) -> int:
+        """Bulk-insert todos, committing one transaction per chunk.
+
+        Unless ``keep_ids`` is set, ids are reassigned after the current
+        maximum. With it, a chunk containing an id that is already taken
+        raises ``ValueError``; earlier chunks stay committed.
+        """
+        count = 0
+        for chunk in chunked(todos, chunk_size):
+            try:
+                with self._lock, self._conn:
+                    if not keep_ids:
+                        start = self._conn.execute(NEXT_ID).fetchone()[0]
+                        for todo_id, todo in enumerate(chunk, start=start):
+                            todo.id = todo_id
+                    rows = [self._to_row(t) for t in chunk]
+                    self._conn.executemany("INSERT INTO todos VALUES (?, ?, ?, ?, ?)", rows)
+                    if self._live_index() is not None:
+                        self._search_index.upsert(t.to_dict() for t in chunk)
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Todo ID already exists: {e}") from e
+            count += len(chunk)
+        return count
+
+    def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Todo]:
+        """Find todos whose title or description contain every query word.
+
+        The index is built from the table on first use.
+        """
+        with self._lock:
+            if self._search_index is None or self._search_index.stamp is None:
+                with self._conn:
+                    index = self._open_index()
+                    rows = self._conn.execute("SELECT * FROM todos ORDER BY id").fetchall()
+                    with tracing.span("search.rebuild", records=len(rows)):
+                        index.rebuild(dict(r) for r in rows)
+                    index.stamp = "sqlite"
+            with tracing.span("search.query") as span:
+                hits = self._search_index.search(query, limit=limit, prefix=prefix)
+                span.add(records=len(hits))
+            placeholders = ",".join("?" * len(hits))
+            rows = self._conn.execute(
+                f"SELECT * FROM todos WHERE id IN ({placeholders})", [i for i, _ in hits]
+            ).fetchall()
+        by_id = {r["id"]: r for r in rows}
+        return [self._from_row(by_id[i]) for i, _ in hits if i in by_id]
@@ -1,86 +1,544 @@
 """Todo storage backend using JSON file."""
 import json
+import re
+import threading
+import warnings
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from todo_cli.models import Todo, TodoStatus
+from todo_cli import fileformat, tracing
+from todo_cli.batch import BatchAction, BatchOp, BatchResult, not_found
+from todo_cli.durability import Durability, Syncer, atomic_write, link_or_copy
+from todo_cli.fileformat import FileFormat
+from todo_cli.locking import FileLock, GroupCommitter
+from todo_cli.models import Todo, TodoColumns, TodoStats, TodoStatus
+from todo_cli.query import Query, TodoIndex
+
+READ_CHUNK = 64 * 1024
+
+# Whitespace, separators and the opening bracket between top-level records.
+_BETWEEN_RECORDS = re.compile(r"[\s,\[]*")
+
+
+def _sort_by_id(todos: Dict[int, dict]) -> None:
+    """Reorder ``todos`` by id in place unless it already is."""
+    ids = iter(todos)
+    previous = next(ids, None)
+    for todo_id in ids:
+        if todo_id < previous:
+            break
+        previous = todo_id
+    else:
+        return
+    ordered = sorted(todos.items())
+    todos.clear()
+    todos.update(ordered)
 
 
 class TodoStorage:
-    """JSON file storage for todos."""
+    """JSON file storage for todos.
+
+    The parsed file is cached in-process as a dict keyed by id and is
+    revalidated against the file's inode, mtime and size before each reuse,
+    so repeated reads only cost a ``stat`` until another writer touches the
+    file.
+
+    Mutations run under an advisory lock on ``<file>.lock``. Mutations from
+    concurrent threads are group-committed: one load, every queued change
+    applied in order, one save.
+
+    Once ``search`` has been used, a full-text index in ``<file>.idx`` is
+    kept up to date by each commit.
+
+    The file is written in the versioned format of ``todo_cli.fileformat``;
+    a legacy (headerless) file is converted when the storage is opened.
+    Each save also refreshes the aggregates in the header (see ``stats``).
+    Saves replace the file atomically and keep the previous version in
+    ``<file>.bak``, which opening the store restores if the file was left
+    incomplete; ``durability`` sets the fsync policy (``todo_cli.durability``).
+    ``file_format`` forces a layout for every save; by default the layout
+    found in the file is kept. Records are kept in id order, which
+    ``iter_todos(after_id=...)`` paging relies on.
+    """
 
-    def __init__(self, filepath: str = "todos.json"):
+    def __init__(
+        self,
+        filepath: str = "todos.json",
+        file_format: Optional[FileFormat] = None,
+        durability: Optional[Durability] = None,
+    ):
         """Initialize storage with file path."""
         self.filepath = Path(filepath)
+        self.file_format = file_format
+        self._layout = file_format or FileFormat.COMPACT
+        self.lock_path = self.filepath.with_name(self.filepath.name + ".lock")
+        self.index_path = self.filepath.with_name(self.filepath.name + ".idx")
+        self.backup_path = self.filepath.with_name(self.filepath.name + ".bak")
+        self._syncer = Syncer(durability)
+        self._lock = threading.RLock()
+        self._committer = GroupCommitter(self._commit)
+        self._cache: Optional[Dict[int, dict]] = None
+        self._cache_sig: Optional[Tuple[int, int, int]] = None
+        self._max_id = 0
+        self._search_index = None
+        self._query_index: Optional[TodoIndex] = None
+        self._query_sig: Optional[Tuple[int, int, int]] = None
         self._ensure_file()
 
     def _ensure_file(self) -> None:
-        """Ensure storage file exists."""
+        """Ensure storage file exists, is intact and is in the current format."""
         if not self.filepath.exists():
-            self.filepath.write_text("[]")
+            atomic_write(self.filepath, fileformat.encode([], self._layout), self._syncer)
+            return
+        if not fileformat.is_complete(self.filepath):
+            self._recover()
+        if self._file_version() < fileformat.FORMAT_VERSION:
+            self.convert(self._layout, keep=False)
+
+    def _recover(self) -> None:
+        """Restore an incomplete store file from the last good copy.
+
+        The damaged file is kept next to it as ``<file>.corrupt-<time>``.
+        An empty file without a good copy is an empty legacy store; any
+        other damage raises ``ValueError``.
+        """
+        with self._lock, FileLock(self.lock_path):
+            if fileformat.is_complete(self.filepath):
+                return  # another process recovered it first
+            if not (self.backup_path.exists() and fileformat.is_complete(self.backup_path)):
+                if self.filepath.stat().st_size == 0:
+                    return
+                raise ValueError(f"{self.filepath} is damaged and has no intact backup to restore")
+            kept = self.filepath.with_name(f"{self.filepath.name}.corrupt-{datetime.now():%Y%m%d%H%M%S}")
+            link_or_copy(self.filepath, kept)
+            atomic_write(self.filepath, self.backup_path.read_bytes(), self._syncer)
+            warnings.warn(f"{self.filepath} was incomplete; restored the previous version (damaged file kept as {kept.name})")
+
+    def convert(self, file_format: FileFormat, keep: bool = True) -> int:
+        """Rewrite the file in ``file_format`` and return the number of todos.
+
+        With ``keep``, later saves also use ``file_format``.
+        """
+        with self._lock, FileLock(self.lock_path), tracing.span("storage.convert") as span:
+            todos = self._load()
+            loaded_sig = self._cache_sig
+            if keep:
+                self.file_format = file_format
+            self._layout = file_format
+            self._save(todos)
+            self._after_save(todos, (), loaded_sig)
+            span.add(records=len(todos))
+        return len(todos)
+
+    def _file_version(self) -> int:
+        """Read the format version from the file header."""
+        with open(self.filepath, "rb") as f:
+            return fileformat.read_header(f.read(4096))[0]
+
+    def _stat_sig(self) -> Tuple[int, int, int]:
+        """Return an (inode, mtime_ns, size) signature of the file."""
+        st = self.filepath.stat()
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
 
-    def _load(self) -> List[dict]:
-        """Load todos from file."""
-        content = self.filepath.read_text()
-        if not content.strip():
-            return []
-        return json.loads(content)
+    def _set_cache(self, todos: Dict[int, dict]) -> None:
+        """Cache parsed todos and remember the file signature."""
+        self._cache = todos
+        self._cache_sig = self._stat_sig()
+        self._max_id = max(self._max_id, max(todos, default=0))
 
-    def _save(self, todos: List[dict]) -> None:
+    def _load(self) -> Dict[int, dict]:
+        """Load todos keyed by id, reusing the cache while it is current."""
+        if self._cache is not None and self._stat_sig() == self._cache_sig:
+            return self._cache
+        with tracing.span("storage.read") as span:
+            content = self.filepath.read_bytes()
+            span.add(bytes_read=len(content))
+        with tracing.span("storage.decode") as span:
+            _, layout, records = fileformat.decode(content)
+            todos = {t["id"]: t for t in records}
+            _sort_by_id(todos)
+            span.add(records=len(todos))
+        self._layout = self.file_format or layout
+        meta = fileformat.read_meta(content)
+        self._max_id = (meta["next_id"] if meta else 1) - 1
+        self._set_cache(todos)
+        return todos
+
+    def _iter_records(self) -> Iterator[dict]:
+        """Incrementally decode the top-level JSON array, one record at a time.
+
+        Only ``READ_CHUNK`` characters plus the record being decoded are held
+        in memory, and nothing past the last record consumed is parsed.
+        """
+        decoder = json.JSONDecoder()
+        # The span covers the generator's lifetime, including time spent by
+        # the consumer between records.
+        with tracing.span("storage.stream") as span, open(self.filepath, encoding="utf-8") as f:
+            buf = f.read(READ_CHUNK)
+            span.add(bytes_read=len(buf))
+            pos = fileformat.read_header(buf)[2]
+            while True:
+                pos = _BETWEEN_RECORDS.match(buf, pos).end()
+                if pos == len(buf):
+                    buf, pos = f.read(READ_CHUNK), 0
+                    span.add(bytes_read=len(buf))
+                    if not buf:
+                        return
+                    continue
+                if buf[pos] == "]":
+                    return
+                try:
+                    record, pos = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # Record straddles the chunk boundary; read more.
+                    more = f.read(READ_CHUNK)
+                    span.add(bytes_read=len(more))
+                    if not more:
+                        raise
+                    buf, pos = buf[pos:] + more, 0
+                    continue
+                span.add(records=1)
+                yield record
+
+    def _meta(self, todos: Dict[int, dict]) -> dict:
+        """Aggregates to store in the header of a save of ``todos``."""
+        modified = datetime.now().isoformat(timespec="microseconds")
+        return TodoStats.of(todos.values(), self._max_id + 1, modified).to_dict()
+
+    def _encode(self, todos: Dict[int, dict]) -> bytes:
+        """Serialise todos in the store's file format."""
+        return fileformat.encode(todos.values(), self._layout, meta=self._meta(todos))
+
+    def _save(self, todos: Dict[int, dict]) -> None:
         """Save todos to file."""
-        self.filepath.write_text(json.dumps(todos, indent=2))
+        with tracing.span("storage.encode", records=len(todos)):
+            content = self._encode(todos)
+        try:
+            with tracing.span("storage.write", bytes_written=len(content)):
+                atomic_write(self.filepath, content, self._syncer, backup=self.backup_path)
+        except BaseException:
+            # Mutations are applied to the cache in place; drop it so the
+            # next read goes back to whatever is actually on disk.
+            self._cache = None
+            raise
+        self._set_cache(todos)
+
+    def _commit(self, batch: List) -> None:
+        """Apply a batch of queued mutations with one load and one save."""
+        with self._lock, FileLock(self.lock_path):
+            todos = self._load()
+            changed: Set[int] = set()
+            for pending in batch:
+                try:
+                    pending.result, ids = pending.op(todos)
+                except Exception as e:
+                    pending.error = e
+                    continue
+                changed.update(ids)
+            if changed:
+                loaded_sig = self._cache_sig
+                self._save(todos)
+                try:
+                    self._after_save(todos, changed, loaded_sig)
+                except Exception as e:
+                    # The batch is saved, so its callers get their results. The
+                    # search index rolled back and no longer matches its stamp,
+                    # so it and the query index are rebuilt on next use.
+                    self._query_index = None
+                    warnings.warn(f"Saved {self.filepath}, but updating its indexes failed: {e}")
+
+    def _after_save(self, todos: Dict[int, dict], changed: Set[int], loaded_sig) -> None:
+        """Bring derived data up to date with a commit that touched ``changed`` ids.
+
+        ``loaded_sig`` is the signature of the file the commit was applied
+        to; derived data is only patched if it matched that state.
+        """
+        if self._query_index is not None:
+            if self._query_sig == loaded_sig:
+                for i in changed:
+                    if i in todos:
+                        self._query_index.add(todos[i])
+                    else:
+                        self._query_index.remove(i)
+                self._query_sig = self._cache_sig
+            else:
+                self._query_index = None
+        index = self._open_index()
+        if index is None or index.stamp != json.dumps(loaded_sig):
+            return
+        with index.conn:
+            index.upsert(todos[i] for i in changed if i in todos)
+            index.remove(i for i in changed if i not in todos)
+            index.stamp = json.dumps(self._cache_sig)
+
+    def _mutate(self, op: Callable[[Dict[int, dict]], Tuple[object, Collection[int]]]):
+        """Run ``op`` on the locked, freshly loaded todos and persist them.
+
+        ``op`` returns ``(result, changed_ids)``; the file is only rewritten
+        if some mutation in the batch changed a todo.
+        """
+        return self._committer.submit(op)
 
     def _get_next_id(self) -> int:
         """Get next available ID."""
-        todos = self._load()
-        if not todos:
-            return 1
-        return max(t["id"] for t in todos) + 1
+        with self._lock:
+            self._load()
+            return self._max_id + 1
+
+    def _create_op(self, title: str, description: Optional[str] = None):
+        """Mutation adding a todo; its result is the new todo."""
+        def op(todos):
+            todo = Todo(id=self._max_id + 1, title=title, description=description)
+            todos[todo.id] = todo.to_dict()
+            self._max_id = todo.id
+            return todo, (todo.id,)
+
+        return op
 
     def create(self, title: str, description: Optional[str] = None) -> Todo:
         """Create a new todo."""
-        todo_id = self._get_next_id()
-        todo = Todo(id=todo_id, title=title, description=description)
-        todos = self._load()
-        todos.append(todo.to_dict())
-        self._save(todos)
-        return todo
+        return self._mutate(self._create_op(title, description))
+
+    def watch_paths(self) -> List[Path]:
+        """Files whose changes mean another writer touched the store."""
+        return [self.filepath]
 
     def get_all(self, status: Optional[TodoStatus] = None) -> List[Todo]:
         """Get all todos, optionally filtered by status."""
-        todos = self._load()
+        with self._lock:
+            todos = list(self._load().values())
         if status:
             todos = [t for t in todos if t["status"] == status.value]
-        return [Todo.from_dict(t) for t in todos]
+        with tracing.span("model.from_dict", records=len(todos)):
+            return [Todo.from_dict(t) for t in todos]
+
+    def get_columns(self, status: Optional[TodoStatus] = None) -> TodoColumns:
+        """Get all todos as compact columns, optionally filtered by status."""
+        with self._lock:
+            todos = tuple(self._load().values())
+        with tracing.span("model.columns", records=len(todos)):
+            columns = TodoColumns.from_records(todos)
+        return columns.filter_status(status) if status else columns
+
+    def iter_todos(
+        self,
+        status: Optional[TodoStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after_id: Optional[int] = None,
+    ) -> Iterator[Todo]:
+        """Yield todos lazily, optionally filtered by status and paged.
+
+        ``offset`` skips matching todos and ``after_id`` resumes after a
+        cursor (the last id of the previous page). Unless the cache is
+        current, the file is decoded incrementally, so a page only parses
+        as far as it reads.
+        """
+        with self._lock:
+            records = self._scan(status, after_id)
+        matches = (
+            t for t in records
+            if (status is None or t["status"] == status.value)
+            and (after_id is None or t["id"] > after_id)
+        )
+        stop = None if limit is None else offset + limit
+        for t in islice(matches, offset, stop):
+            yield Todo.from_dict(t)
+
+    def _scan(self, status: Optional[TodoStatus] = None, after_id: Optional[int] = None) -> Iterator[dict]:
+        """Return an iterator over the stored records in id order.
+
+        ``status`` and ``after_id`` are hints; callers still filter the
+        records themselves.
+        """
+        if self._cache is not None and self._stat_sig() == self._cache_sig:
+            return iter(tuple(self._cache.values()))
+        return self._iter_records()
+
+    def query(self, query: Query) -> List[Todo]:
+        """Run a filtered, sorted listing through the secondary indexes.
+
+        The indexes are built on the first query and then kept up to date
+        by this instance's writes; a write by another process rebuilds them.
+        """
+        with self._lock:
+            todos = self._load()
+            if self._query_index is None or self._query_sig != self._cache_sig:
+                with tracing.span("query.index", records=len(todos)):
+                    self._query_index = TodoIndex(todos.values())
+                self._query_sig = self._cache_sig
+            with tracing.span("query.select") as span:
+                records = self._query_index.select(query, todos)
+                span.add(records=len(records))
+        return [Todo.from_dict(r) for r in records]
 
     def get_by_id(self, todo_id: int) -> Optional[Todo]:
         """Get todo by ID."""
-        todos = self._load()
-        for t in todos:
-            if t["id"] == todo_id:
-                return Todo.from_dict(t)
-        return None
+        with self._lock:
+            t = self._load().get(todo_id)
+            return Todo.from_dict(t) if t is not None else None
+
+    def _update_op(self, todo_id: int, **kwargs):
+        """Mutation updating a todo; its result is the todo, or None if missing."""
+        if "status" in kwargs:
+            kwargs["status"] = TodoStatus(kwargs["status"]).value
+
+        def op(todos):
+            t = todos.get(todo_id)
+            if t is None:
+                return None, ()
+            t.update(kwargs)
+            return Todo.from_dict(t), (todo_id,)
+
+        return op
 
     def update(self, todo_id: int, **kwargs) -> Optional[Todo]:
         """Update todo by ID."""
-        todos = self._load()
-        for i, t in enumerate(todos):
-            if t["id"] == todo_id:
-                # Update fields
-                for key, value in kwargs.items():
-                    if key == "status" and isinstance(value, TodoStatus):
-                        value = value.value
-                    t[key] = value
-                self._save(todos)
-                return Todo.from_dict(t)
-        return None
+        return self._mutate(self._update_op(todo_id, **kwargs))
+
+    def _delete_op(self, todo_id: int):
+        """Mutation deleting a todo; its result is whether it existed."""
+        def op(todos):
+            if todos.pop(todo_id, None) is None:
+                return False, ()
+            return True, (todo_id,)
+
+        return op
 
     def delete(self, todo_id: int) -> bool:
         """Delete todo by ID."""
-        todos = self._load()
-        original_len = len(todos)
-        todos = [t for t in todos if t["id"] != todo_id]
-        if len(todos) < original_len:
-            self._save(todos)
-            return True
-        return False
+        return self._mutate(self._delete_op(todo_id))
+
+    def _savepoint(self):
+        """Capture the state mutations keep outside the todos dict."""
+        return self._max_id
+
+    def _rollback(self, savepoint) -> None:
+        """Restore state captured by ``_savepoint``."""
+        self._max_id = savepoint
+
+    def apply_batch(self, ops: Iterable[BatchOp], atomic: bool = False) -> List[BatchResult]:
+        """Run add/complete/delete operations in one commit: one load, one save.
+
+        Each operation gets a result; completing or deleting a missing id
+        fails that item only. With ``atomic``, any failure rolls the whole
+        batch back and nothing is saved.
+        """
+        ops = list(ops)
+
+        def op(todos):
+            results = []
+            changed: Set[int] = set()
+            # Previous version of every touched record (None: did not exist).
+            undo: Dict[int, Optional[dict]] = {}
+            savepoint = self._savepoint()
+            for item in ops:
+                if item.action == BatchAction.ADD:
+                    mutation = self._create_op(item.title, item.description)
+                else:
+                    if item.todo_id not in undo:
+                        t = todos.get(item.todo_id)
+                        undo[item.todo_id] = dict(t) if t is not None else None
+                    if item.action == BatchAction.COMPLETE:
+                        mutation = self._update_op(item.todo_id, status=TodoStatus.DONE)
+                    else:
+                        mutation = self._delete_op(item.todo_id)
+                result, ids = mutation(todos)
+                for i in ids:
+                    undo.setdefault(i, None)
+                changed.update(ids)
+                if not ids:
+                    results.append(not_found(item))
+                else:
+                    results.append(BatchResult(item, result if isinstance(result, Todo) else None))
+            if atomic and not all(r.ok for r in results):
+                for i, previous in undo.items():
+                    if previous is None:
+                        todos.pop(i, None)
+                    else:
+                        todos[i] = previous
+                _sort_by_id(todos)
+                self._rollback(savepoint)
+                return results, ()
+            return results, changed
+
+        return self._mutate(op)
+
+    def import_todos(self, todos: Iterable[Todo], chunk_size: int = 10000, keep_ids: bool = False) -> int:
+        """Bulk-insert todos and return how many were added.
+
+        Every commit rewrites the whole JSON file, so the stream is applied
+        in a single commit rather than ``chunk_size`` batches. Unless
+        ``keep_ids`` is set, ids are reassigned after the current maximum;
+        with it, an id that is already taken fails the whole import.
+        """
+        records = [t.to_dict() for t in todos]
+
+        def op(existing):
+            if keep_ids:
+                seen = set()
+                for r in records:
+                    if r["id"] in existing or r["id"] in seen:
+                        raise ValueError(f"Todo with ID {r['id']} already exists")
+                    seen.add(r["id"])
+            else:
+                for todo_id, r in enumerate(records, start=self._max_id + 1):
+                    r["id"] = todo_id
+            previous_max = self._max_id
+            for r in records:
+                existing[r["id"]] = r
+            self._max_id = max(self._max_id, max(existing, default=0))
+            if any(r["id"] < previous_max for r in records):
+                _sort_by_id(existing)
+            return len(records), [r["id"] for r in records]
+
+        return self._mutate(op)
+
+    def stats(self) -> TodoStats:
+        """Return counts per status, the next id and the last write time.
+
+        These are read from the file header alone; a store last written
+        without them (e.g. a legacy file) is loaded and counted instead.
+        """
+        with self._lock:
+            with open(self.filepath, "rb") as f:
+                meta = fileformat.read_meta(f.read(4096))
+            if meta is not None:
+                return TodoStats.from_dict(meta)
+            todos = self._load()
+            return TodoStats.of(todos.values(), self._max_id + 1)
+
+    def _open_index(self, create: bool = False):
+        """Return the search index, or None if it was never built."""
+        if self._search_index is None and (create or self.index_path.exists()):
+            from todo_cli.search import SearchIndex
+
+            self._search_index = SearchIndex.open(self.index_path)
+        return self._search_index
+
+    def _indexable(self, todos: Dict[int, dict]) -> Iterable[dict]:
+        """Records the search index covers, given the loaded todos."""
+        return todos.values()
+
+    def search(self, query: str, limit: Optional[int] = 20, prefix: bool = True) -> List[Todo]:
+        """Find todos whose title or description contain every query word.
+
+        The index is built on first use and rebuilt if another writer
+        changed the file without maintaining it; otherwise a query never
+        loads the JSON file.
+        """
+        with self._lock:
+            index = self._open_index(create=True)
+            if index.stamp != json.dumps(self._stat_sig()):
+                with FileLock(self.lock_path), index.conn:
+                    todos = self._load()
+                    with tracing.span("search.rebuild", records=len(todos)):
+                        index.rebuild(self._indexable(todos))
+                    index.stamp = json.dumps(self._cache_sig)
+            with tracing.span("search.query") as span:
+                hits = index.search(query, limit=limit, prefix=prefix)
+                records = index.records([i for i, _ in hits])
+                span.add(records=len(records))
+        return [Todo.from_dict(r) for r in records]
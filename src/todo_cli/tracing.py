@@ -0,0 +1,155 @@
+"""Lightweight operation tracing for storage, model and command phases.
+
+Code wraps interesting phases in ``tracing.span(name)`` and reports sizes
+with ``span.add(bytes_read=..., records=...)``. While tracing is off,
+``span`` returns a shared no-op object, so instrumented code pays one
+global lookup and a call.
+
+Tracing is switched on with ``todo --profile`` or the ``TODO_TRACE``
+environment variable: ``TODO_TRACE=1`` prints a per-phase summary to stderr
+at exit, and any other value is taken as a file to append JSON lines to.
+
+Long-lived processes (``todo serve``, the TUI) can trace indefinitely: the
+summary is kept as running totals per phase, and only the most recent
+``MAX_EVENTS`` raw spans are kept for the JSON lines output.
+"""
+import atexit
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import IO, Deque, Dict, List, Optional
+
+ENABLED = False
+MAX_EVENTS = 100_000
+
+_events: Deque[dict] = deque(maxlen=MAX_EVENTS)
+_phases: Dict[str, dict] = {}
+
+
+class Span:
+    """A timed phase with counters."""
+
+    __slots__ = ("name", "counts", "start")
+
+    def __init__(self, name: str, counts: Dict[str, int]):
+        self.name = name
+        self.counts = counts
+        self.start = 0.0
+
+    def add(self, **counts: int) -> None:
+        """Add to the span's counters (bytes_read, bytes_written, records)."""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event = {"name": self.name, "ms": (time.perf_counter() - self.start) * 1000}
+        event.update(self.counts)
+        _events.append(event)
+        phase = _phases.get(self.name)
+        if phase is None:
+            phase = _phases[self.name] = {"calls": 0, "ms": 0.0, "bytes_read": 0, "bytes_written": 0, "records": 0}
+        phase["calls"] += 1
+        phase["ms"] += event["ms"]
+        for key, value in self.counts.items():
+            phase[key] = phase.get(key, 0) + value
+
+
+class _NullSpan:
+    """Span stand-in used while tracing is off."""
+
+    __slots__ = ()
+
+    def add(self, **counts: int) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **counts: int):
+    """Return a context manager timing the phase ``name``."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name, counts)
+
+
+def enable() -> None:
+    """Start recording spans."""
+    global ENABLED
+    ENABLED = True
+
+
+def disable() -> None:
+    """Stop recording spans."""
+    global ENABLED
+    ENABLED = False
+
+
+def events() -> List[dict]:
+    """Return the spans recorded so far (the most recent ``MAX_EVENTS``)."""
+    return list(_events)
+
+
+def reset() -> None:
+    """Forget recorded spans and totals."""
+    _events.clear()
+    _phases.clear()
+
+
+def summary() -> Dict[str, dict]:
+    """Aggregate recorded spans per phase name, including ones no longer in ``events``."""
+    return {name: dict(phase) for name, phase in _phases.items()}
+
+
+def print_summary(stream: Optional[IO[str]] = None) -> None:
+    """Print a per-phase summary table."""
+    stream = stream or sys.stderr
+    print(
+        f"{'phase':<24} {'calls':>6} {'total ms':>10} {'bytes in':>12} {'bytes out':>12} {'records':>9}",
+        file=stream,
+    )
+    for name, phase in sorted(summary().items(), key=lambda item: -item[1]["ms"]):
+        print(
+            f"{name:<24} {phase['calls']:>6} {phase['ms']:>10.2f} {phase['bytes_read']:>12} "
+            f"{phase['bytes_written']:>12} {phase['records']:>9}",
+            file=stream,
+        )
+
+
+def write_jsonl(path: str) -> None:
+    """Append recorded spans to ``path`` as JSON lines."""
+    with open(path, "a") as f:
+        for event in _events:
+            f.write(json.dumps(event) + "\n")
+
+
+def report(output: Optional[str] = None) -> None:
+    """Write spans to ``output`` as JSON lines, or print a summary if not given."""
+    if output:
+        write_jsonl(output)
+    else:
+        print_summary()
+
+
+def _enable_from_env() -> None:
+    """Honour ``TODO_TRACE`` for processes that never reach the CLI callback."""
+    setting = os.environ.get("TODO_TRACE", "")
+    if setting in ("", "0"):
+        return
+    enable()
+    atexit.register(report, None if setting == "1" else setting)
+
+
+_enable_from_env()
@@ -0,0 +1,163 @@
+"""Streaming import/export of todos as JSONL or CSV, and machine-readable listings."""
+import csv
+import json
+from enum import Enum
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, TypeVar
+
+from todo_cli.models import Todo
+
+T = TypeVar("T")
+
+CSV_FIELDS = ("id", "title", "description", "status", "created_at")
+TSV_FIELDS = ("id", "status", "created_at", "title", "description")
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+WRITE_BATCH = 1000
+
+
+class TransferFormat(str, Enum):
+    """Supported import/export formats."""
+    JSONL = "jsonl"
+    CSV = "csv"
+
+
+class ListFormat(str, Enum):
+    """Output formats of ``todo list``."""
+    TABLE = "table"
+    JSON = "json"
+    JSONL = "jsonl"
+    TSV = "tsv"
+    IDS = "ids"
+
+
+def detect_format(path: Optional[str]) -> TransferFormat:
+    """Guess the format from a file extension, defaulting to JSONL."""
+    if path and Path(path).suffix.lower() == ".csv":
+        return TransferFormat.CSV
+    return TransferFormat.JSONL
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield successive lists of at most ``size`` items; ``size`` must be positive."""
+    if size < 1:
+        raise ValueError(f"Chunk size must be at least 1, not {size}")
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_records(fp: IO[str], fmt: TransferFormat) -> Iterator[dict]:
+    """Stream raw records from a JSONL or CSV file.
+
+    Records that cannot be parsed raise ``ValueError`` naming the record.
+    """
+    if fmt == TransferFormat.CSV:
+        for n, row in enumerate(csv.DictReader(fp), start=1):
+            record = {k: v for k, v in row.items() if v != ""}
+            if "id" in record:
+                try:
+                    record["id"] = int(record["id"])
+                except ValueError as e:
+                    raise ValueError(f"Invalid record {n}: {e!r}") from e
+            yield record
+        return
+    n = 0
+    for line in fp:
+        if line.strip():
+            n += 1
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid record {n}: {e!r}") from e
+
+
+def validate_records(records: Iterable[dict], keep_ids: bool = False) -> Iterator[Todo]:
+    """Validate raw records through ``Todo.from_dict``.
+
+    Without ``keep_ids`` the id field is optional and left at 0 for the
+    storage backend to assign.
+    """
+    for n, record in enumerate(records, start=1):
+        try:
+            if not isinstance(record, dict):
+                raise TypeError(f"expected an object, got {type(record).__name__}")
+            if not keep_ids:
+                record = dict(record, id=0)
+            todo = Todo.from_dict(record)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid record {n}: {e!r}") from e
+        yield todo
+
+
+def write_records(todos: Iterable[Todo], fp: IO[str], fmt: TransferFormat) -> int:
+    """Stream todos to a JSONL or CSV file and return how many were written."""
+    count = 0
+    if fmt == TransferFormat.CSV:
+        writer = csv.DictWriter(fp, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for todo in todos:
+            writer.writerow(todo.to_dict())
+            count += 1
+        return count
+    for todo in todos:
+        fp.write(json.dumps(todo.to_dict()) + "\n")
+        count += 1
+    return count
+
+
+def _tsv_field(value) -> str:
+    """Render one TSV field, escaping tabs, newlines and backslashes."""
+    return "" if value is None else str(value).translate(_TSV_ESCAPES)
+
+
+def _tsv_row(todo: Todo) -> str:
+    return "\t".join((
+        str(todo.id), todo.status.value, _tsv_field(todo.created_at),
+        _tsv_field(todo.title), _tsv_field(todo.description),
+    ))
+
+
+def _json_row(todo: Todo) -> str:
+    return json.dumps(todo.to_dict(), ensure_ascii=False)
+
+
+_ROW_RENDERERS = {
+    ListFormat.IDS: lambda todo: str(todo.id),
+    ListFormat.TSV: _tsv_row,
+    ListFormat.JSON: _json_row,
+    ListFormat.JSONL: _json_row,
+}
+
+
+def write_listing(todos: Iterable[Todo], fp: IO[str], fmt: ListFormat) -> int:
+    """Stream todos to ``fp`` in a machine-readable list format.
+
+    Rows are written in batches of ``WRITE_BATCH`` without building the
+    whole listing. Returns how many todos were written.
+    """
+    render = _ROW_RENDERERS.get(fmt)
+    if render is None:
+        raise ValueError(f"Not a streaming list format: {fmt.value}")
+    is_json = fmt == ListFormat.JSON
+    separator = ",\n" if is_json else "\n"
+    if fmt == ListFormat.TSV:
+        fp.write("\t".join(TSV_FIELDS) + "\n")
+    elif is_json:
+        fp.write("[")
+    count = 0
+    for batch in chunked(todos, WRITE_BATCH):
+        if count:
+            fp.write(separator)
+        elif is_json:
+            fp.write("\n")
+        fp.write(separator.join(map(render, batch)))
+        count += len(batch)
+    if is_json:
+        fp.write("\n]\n" if count else "]\n")
+    elif count:
+        fp.write("\n")
+    return count
@@ -1,32 +1,273 @@
 """Interactive Terminal UI using Textual with Amber Terminal aesthetic."""
-from typing import Optional
+import threading
+from array import array
+from bisect import bisect_left
+from dataclasses import replace
+from typing import Any, Callable, Iterable, List, Optional, Set, Tuple
 
+from rich.text import Text
+from textual import events, work
 from textual.app import App, ComposeResult
+from textual.binding import Binding
 from textual.containers import Horizontal, Vertical
+from textual.geometry import Region, Size
+from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.worker import get_current_worker
 from textual.widgets import (
     Button,
     Footer,
     Header,
     Input,
     Label,
-    ListItem,
-    ListView,
     Static,
 )
 
+from todo_cli import tracing
 from todo_cli.models import Todo, TodoStatus
-from todo_cli.storage import TodoStorage
+from todo_cli.backends import Storage, open_storage
+from todo_cli.watch import open_watcher
 
 
-class TodoItem(ListItem):
-    """A todo list item widget."""
+def todo_markup(todo: Todo) -> str:
+    """Return the markup for one todo row."""
+    status_color = "green" if todo.status == TodoStatus.DONE else "yellow"
+    status_icon = "✓" if todo.status == TodoStatus.DONE else "○"
+    return f"[{status_color}]▏[/] {status_icon} [bold white]{todo.title}[/]  [dim]{todo.status.value}[/]"
 
-    def __init__(self, todo: Todo):
-        self.todo = todo
-        status_color = "green" if todo.status == TodoStatus.DONE else "yellow"
-        status_icon = "✓" if todo.status == TodoStatus.DONE else "○"
-        super().__init__()
-        self.update(f"[{status_color}]▏[/] {status_icon} [bold white]{todo.title}[/]  [dim]{todo.status.value}[/]")
+
+class TodoList(ScrollView, can_focus=True):
+    """Virtualised list of todos.
+
+    Rows are drawn line by line for the visible region only, so opening a
+    large store creates no per-todo widgets. Todos are kept in id order and
+    ``upsert``/``remove`` patch single rows, repainting only what moved.
+    Todos still being created have no id yet; they are listed after the
+    stored ones as placeholders, identified by object.
+    """
+
+    BINDINGS = [
+        Binding("up", "cursor_up", "Up", show=False),
+        Binding("down", "cursor_down", "Down", show=False),
+        Binding("pageup", "page_up", "Page up", show=False),
+        Binding("pagedown", "page_down", "Page down", show=False),
+        Binding("home", "first", "First", show=False),
+        Binding("end", "last", "Last", show=False),
+        Binding("enter", "select", "Select", show=False),
+    ]
+
+    COMPONENT_CLASSES = {"todo-list--cursor"}
+
+    DEFAULT_CSS = """
+    TodoList {
+        background: #0a0a0a;
+    }
+    TodoList > .todo-list--cursor {
+        background: #ffb000;
+        color: #0a0a0a;
+    }
+    """
+
+    class Selected(Message):
+        """Posted when a todo is chosen with enter or a click."""
+
+        def __init__(self, todo: Todo):
+            self.todo = todo
+            super().__init__()
+
+    def __init__(self, *, id: Optional[str] = None):
+        super().__init__(id=id)
+        self.todos: List[Todo] = []
+        self._ids = array("q")
+        self.cursor = 0
+        self.pending: Set[int] = set()
+        self.placeholders: List[Todo] = []
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows, placeholders included."""
+        return len(self.todos) + len(self.placeholders)
+
+    def _row(self, row: int) -> Todo:
+        """Return the todo or placeholder shown at ``row``."""
+        return self.todos[row] if row < len(self.todos) else self.placeholders[row - len(self.todos)]
+
+    @property
+    def highlighted(self) -> Optional[Todo]:
+        """The todo under the cursor."""
+        return self._row(self.cursor) if self.row_count else None
+
+    def is_placeholder(self, todo: Todo) -> bool:
+        """Report whether ``todo`` is a placeholder for one being created."""
+        return any(p is todo for p in self.placeholders)
+
+    def add_placeholder(self, todo: Todo) -> None:
+        """List a todo that is being created."""
+        self.placeholders.append(todo)
+        self._rows_changed(self.row_count - 1)
+
+    def remove_placeholder(self, todo: Todo) -> None:
+        """Drop a placeholder once its create has finished."""
+        for i, placeholder in enumerate(self.placeholders):
+            if placeholder is todo:
+                del self.placeholders[i]
+                row = len(self.todos) + i
+                if row < self.cursor or self.cursor >= self.row_count:
+                    self.cursor = max(self.cursor - 1, 0)
+                self._rows_changed(row)
+                return
+
+    def position(self, todo_id: int) -> Optional[int]:
+        """Return the row of ``todo_id``, or None if it is not listed."""
+        i = bisect_left(self._ids, todo_id)
+        return i if i < len(self._ids) and self._ids[i] == todo_id else None
+
+    def set_todos(self, todos: Iterable[Todo]) -> None:
+        """Replace every row."""
+        self.todos = sorted(todos, key=lambda t: t.id)
+        self._ids = array("q", (t.id for t in self.todos))
+        self.cursor = min(self.cursor, max(self.row_count - 1, 0))
+        self.virtual_size = Size(0, self.row_count)
+        self.refresh()
+
+    def upsert(self, todo: Todo) -> None:
+        """Add a todo or replace the row showing it."""
+        i = bisect_left(self._ids, todo.id)
+        if i < len(self._ids) and self._ids[i] == todo.id:
+            self.todos[i] = todo
+            self.refresh_line(i)
+            return
+        self.todos.insert(i, todo)
+        self._ids.insert(i, todo.id)
+        if i < self.cursor:
+            self.cursor += 1
+        self._rows_changed(i)
+
+    def remove(self, todo_id: int) -> bool:
+        """Drop a todo's row. Returns False if it was not listed."""
+        i = self.position(todo_id)
+        if i is None:
+            return False
+        del self.todos[i]
+        del self._ids[i]
+        if i < self.cursor or self.cursor >= self.row_count:
+            self.cursor = max(self.cursor - 1, 0)
+        self._rows_changed(i)
+        return True
+
+    def merge(self, todos: Iterable[Todo]) -> Tuple[int, int, int]:
+        """Apply the difference between the rows and ``todos``.
+
+        Rows with a write in flight (including deleted ones) are left
+        alone. Returns the number of todos added, changed and removed.
+        """
+        fresh = {t.id: t for t in todos}
+        removed = [t.id for t in self.todos if t.id not in fresh and t.id not in self.pending]
+        added: List[Todo] = []
+        changed: List[Todo] = []
+        for todo_id, todo in fresh.items():
+            if todo_id in self.pending:
+                continue
+            i = self.position(todo_id)
+            if i is None:
+                added.append(todo)
+            elif self.todos[i] != todo:
+                changed.append(todo)
+
+        if len(added) + len(removed) > max(len(self.todos) // 8, 64):
+            # Shifting rows once per change would be quadratic; rebuild instead.
+            highlighted = self.highlighted
+            fresh.update((t.id, t) for t in self.todos if t.id in self.pending)
+            self.set_todos(fresh.values())
+            i = self.position(highlighted.id) if highlighted is not None else None
+            if i is not None:
+                self.cursor = i
+        else:
+            for todo_id in removed:
+                self.remove(todo_id)
+            for todo in added + changed:
+                self.upsert(todo)
+        return len(added), len(changed), len(removed)
+
+    def set_pending(self, todo_id: int, pending: bool) -> None:
+        """Mark a row as waiting for its storage write, or clear the mark."""
+        if pending:
+            self.pending.add(todo_id)
+        else:
+            self.pending.discard(todo_id)
+        i = self.position(todo_id)
+        if i is not None:
+            self.refresh_line(i)
+
+    def _rows_changed(self, start: int) -> None:
+        """Resize after an insert or delete and repaint rows from ``start`` down."""
+        self.virtual_size = Size(0, self.row_count)
+        bottom = self.scroll_offset.y + self.size.height
+        if start < bottom:
+            self.refresh_lines(start, bottom - start)
+
+    def render_line(self, y: int) -> Strip:
+        """Render one visible row."""
+        row = self.scroll_offset.y + y
+        width = self.size.width
+        if row >= self.row_count:
+            return Strip.blank(width, self.rich_style)
+        todo = self._row(row)
+        text = Text.from_markup(todo_markup(todo), end="")
+        if row >= len(self.todos) or todo.id in self.pending:
+            text.append("  saving…", style="dim italic")
+        if row == self.cursor and self.has_focus:
+            text.stylize(self.get_component_rich_style("todo-list--cursor"))
+        strip = Strip(text.render(self.app.console)).apply_style(self.rich_style)
+        return strip.crop_extend(0, width, self.rich_style)
+
+    def _move_cursor(self, row: int) -> None:
+        """Move the cursor to ``row`` and scroll it into view."""
+        if not self.row_count:
+            return
+        old, self.cursor = self.cursor, max(0, min(row, self.row_count - 1))
+        self.refresh_line(old)
+        self.refresh_line(self.cursor)
+        self.scroll_to_region(Region(0, self.cursor, 1, 1), animate=False)
+
+    def action_cursor_up(self) -> None:
+        self._move_cursor(self.cursor - 1)
+
+    def action_cursor_down(self) -> None:
+        self._move_cursor(self.cursor + 1)
+
+    def action_page_up(self) -> None:
+        self._move_cursor(self.cursor - max(self.size.height - 1, 1))
+
+    def action_page_down(self) -> None:
+        self._move_cursor(self.cursor + max(self.size.height - 1, 1))
+
+    def action_first(self) -> None:
+        self._move_cursor(0)
+
+    def action_last(self) -> None:
+        self._move_cursor(self.row_count - 1)
+
+    def action_select(self) -> None:
+        if self.highlighted is not None:
+            self.post_message(self.Selected(self.highlighted))
+
+    def on_click(self, event: events.Click) -> None:
+        """Select the clicked row."""
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        row = self.scroll_offset.y + offset.y
+        if row < self.row_count:
+            self._move_cursor(row)
+            self.action_select()
+
+    def on_focus(self) -> None:
+        self.refresh_line(self.cursor)
+
+    def on_blur(self) -> None:
+        self.refresh_line(self.cursor)
 
 
 class TodoTui(App):
@@ -72,17 +313,6 @@ class TodoTui(App):
         background: #ffb000;
         color: #0a0a0a;
     }
-    ListView {
-        background: #0a0a0a;
-    }
-    ListItem {
-        background: #1a1a1a;
-        border: solid #333;
-    }
-    ListItem.-selected {
-        background: #ffb000;
-        color: #0a0a0a;
-    }
     Label {
         color: #ffb000;
         text-style: bold;
@@ -101,9 +331,14 @@ class TodoTui(App):
 
     TITLE = "╔═══════════════════════════════════════╗\n║      ✦ TODO TERMINAL UI ✦             ║\n╚═══════════════════════════════════════╝"
 
-    def __init__(self):
+    def __init__(self, storage: Optional[Storage] = None, watch_interval: float = 1.0):
         super().__init__()
-        self.storage = TodoStorage()
+        self.watch_interval = watch_interval
+        # Writes run in worker threads but commit in submission order.
+        self._write_turn = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self.storage = storage if storage is not None else open_storage()
         self.todos: list[Todo] = []
         self.selected_todo: Optional[Todo] = None
 
@@ -113,7 +348,7 @@ class TodoTui(App):
         with Horizontal():
             with Vertical(id="todo_list"):
                 yield Label("╭─ Your Todos ─╮")
-                yield ListView(id="todo_list_view")
+                yield TodoList(id="todo_list_view")
             with Vertical(id="input_panel"):
                 yield Label("╭─ Add Todo ─╮")
                 yield Input(placeholder="Enter todo title...", id="title_input")
@@ -127,15 +362,115 @@ class TodoTui(App):
     def on_mount(self) -> None:
         """Initialize UI on mount."""
         self.refresh_todos()
+        self.watch_store()
         self.update_status("Ready • Press 'q' to quit")
 
+    @property
+    def list_view(self) -> TodoList:
+        """The todo list widget."""
+        return self.query_one("#todo_list_view", TodoList)
+
+    @work(thread=True, exclusive=True, group="refresh")
     def refresh_todos(self) -> None:
-        """Refresh the todo list."""
-        self.todos = self.storage.get_all()
-        list_view = self.query_one("#todo_list_view", ListView)
-        list_view.clear()
-        for todo in self.todos:
-            list_view.append(TodoItem(todo))
+        """Reload every todo from storage in a worker thread."""
+        with tracing.span("tui.refresh") as span:
+            todos = list(self.storage.iter_todos())
+            span.add(records=len(todos))
+        self.call_from_thread(self._show_todos, todos)
+
+    def _show_todos(self, todos: List[Todo]) -> None:
+        """Replace the list with freshly loaded todos."""
+        self.list_view.set_todos(todos)
+        self.todos = self.list_view.todos
+
+    @work(thread=True, exclusive=True, group="watch")
+    def watch_store(self) -> None:
+        """Merge in writes made to the store by other processes.
+
+        Uses inotify where available and otherwise polls every
+        ``watch_interval`` seconds. Only the todos that differ from the list
+        are applied.
+        """
+        watch_paths = getattr(self.storage, "watch_paths", None)
+        paths = watch_paths() if watch_paths is not None else []
+        if not paths:
+            return  # nothing on disk for another process to change
+        worker = get_current_worker()
+        watcher = open_watcher(paths, interval=self.watch_interval)
+        try:
+            while not worker.is_cancelled:
+                if not watcher.wait(timeout=0.5):
+                    continue
+                while watcher.wait(timeout=0.05):
+                    pass  # let a burst of writes settle
+                if worker.is_cancelled:
+                    break
+                try:
+                    with tracing.span("tui.sync") as span:
+                        todos = list(self.storage.iter_todos())
+                        span.add(records=len(todos))
+                except ValueError:
+                    # Caught a writer mid-rewrite; its close will wake us again.
+                    continue
+                self.call_from_thread(self._merge_todos, todos)
+        finally:
+            watcher.close()
+
+    def _merge_todos(self, todos: List[Todo]) -> None:
+        """Apply an externally changed store to the list, keeping the selection."""
+        added, changed, removed = self.list_view.merge(todos)
+        if not (added or changed or removed):
+            return
+        message = f"↻ Store changed on disk: +{added} ~{changed} -{removed}"
+        if self.selected_todo is not None:
+            i = self.list_view.position(self.selected_todo.id)
+            if i is None:
+                message += f" • {self.selected_todo.title} was removed"
+                self.selected_todo = None
+            else:
+                self.selected_todo = self.list_view.todos[i]
+        self.update_status(message)
+
+    def _write(
+        self,
+        name: str,
+        write: Callable[[], Any],
+        on_success: Callable[[Any], None],
+        on_failure: Callable[[Exception], None],
+    ) -> None:
+        """Queue a storage write; writes and their reconciles run in call order."""
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        self._run_write(ticket, name, write, on_success, on_failure)
+
+    @work(thread=True, group="storage")
+    def _run_write(
+        self,
+        ticket: int,
+        name: str,
+        write: Callable[[], Any],
+        on_success: Callable[[Any], None],
+        on_failure: Callable[[Exception], None],
+    ) -> None:
+        """Run a storage write off the event loop, then reconcile on it."""
+        worker = get_current_worker()
+        with self._write_turn:
+            while self._serving != ticket:
+                if worker.is_cancelled:
+                    return
+                self._write_turn.wait(0.1)
+        try:
+            try:
+                with tracing.span(f"tui.write.{name}"):
+                    result = write()
+            except Exception as e:
+                self.call_from_thread(on_failure, e)
+            else:
+                self.call_from_thread(on_success, result)
+        finally:
+            with self._write_turn:
+                self._serving += 1
+                self._write_turn.notify_all()
 
     def update_status(self, message: str) -> None:
         """Update status bar."""
@@ -144,21 +479,31 @@ class TodoTui(App):
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses."""
-        if event.button.id == "add_btn":
-            self.add_todo()
-        elif event.button.id == "complete_btn":
-            self.complete_todo()
-        elif event.button.id == "delete_btn":
-            self.delete_todo()
-
-    def on_list_view_selected(self, event: ListView.Selected) -> None:
+        with tracing.span(f"tui.{event.button.id}"):
+            if event.button.id == "add_btn":
+                self.add_todo()
+            elif event.button.id == "complete_btn":
+                self.complete_todo()
+            elif event.button.id == "delete_btn":
+                self.delete_todo()
+
+    def on_todo_list_selected(self, event: TodoList.Selected) -> None:
         """Handle todo selection."""
-        if event.item:
-            self.selected_todo = event.item.todo
-            self.update_status(f"Selected: {self.selected_todo.title}")
+        self.selected_todo = event.todo
+        self.update_status(f"Selected: {self.selected_todo.title}")
+
+    def _check_selected(self) -> bool:
+        """Report whether the selected todo can be changed right now."""
+        if not self.selected_todo:
+            self.update_status("[bold yellow]◉[/] Select a todo first")
+            return False
+        if self.list_view.is_placeholder(self.selected_todo) or self.selected_todo.id in self.list_view.pending:
+            self.update_status("[bold yellow]◉[/] Still saving, try again in a moment")
+            return False
+        return True
 
     def add_todo(self) -> None:
-        """Add a new todo."""
+        """Add a new todo, showing it before the write finishes."""
         title_input = self.query_one("#title_input", Input)
         desc_input = self.query_one("#desc_input", Input)
 
@@ -168,42 +513,82 @@ class TodoTui(App):
             return
 
         description = desc_input.value.strip() or None
-        todo = self.storage.create(title, description)
-
+        list_view = self.list_view
+        # Storage assigns the id; until then the row is a placeholder.
+        placeholder = Todo(id=0, title=title, description=description)
+        list_view.add_placeholder(placeholder)
         title_input.value = ""
         desc_input.value = ""
-        self.refresh_todos()
-        self.update_status(f"[bold green]✓[/] Added: {todo.title}")
+
+        def saved(todo: Todo) -> None:
+            list_view.remove_placeholder(placeholder)
+            list_view.upsert(todo)
+            self.update_status(f"[bold green]✓[/] Added: {todo.title}")
+
+        def failed(error: Exception) -> None:
+            list_view.remove_placeholder(placeholder)
+            self.update_status(f"[bold red]✗[/] Could not add {title}: {error}")
+
+        self._write("add", lambda: self.storage.create(title, description), saved, failed)
 
     def complete_todo(self) -> None:
         """Mark selected todo as complete."""
-        if not self.selected_todo:
-            self.update_status("[bold yellow]◉[/] Select a todo first")
+        if not self._check_selected():
             return
 
-        if self.selected_todo.status == TodoStatus.DONE:
+        original = self.selected_todo
+        if original.status == TodoStatus.DONE:
             self.update_status("[dim]◉[/] Already done")
             return
 
-        self.storage.update(self.selected_todo.id, status=TodoStatus.DONE)
-        self.refresh_todos()
-        self.update_status(f"[bold green]✓[/] Completed: {self.selected_todo.title}")
+        list_view = self.list_view
+        list_view.upsert(replace(original, status=TodoStatus.DONE))
+        list_view.set_pending(original.id, True)
+        self.update_status(f"[bold green]✓[/] Completed: {original.title}")
         self.selected_todo = None
 
+        def saved(todo: Optional[Todo]) -> None:
+            list_view.set_pending(original.id, False)
+            if todo is None:
+                list_view.remove(original.id)
+                self.update_status(f"[bold red]✗[/] {original.title} no longer exists")
+            else:
+                list_view.upsert(todo)
+
+        def failed(error: Exception) -> None:
+            list_view.set_pending(original.id, False)
+            list_view.upsert(original)
+            self.update_status(f"[bold red]✗[/] Could not complete {original.title}: {error}")
+
+        self._write(
+            "complete", lambda: self.storage.update(original.id, status=TodoStatus.DONE), saved, failed
+        )
+
     def delete_todo(self) -> None:
         """Delete selected todo."""
-        if not self.selected_todo:
-            self.update_status("[bold yellow]◉[/] Select a todo first")
+        if not self._check_selected():
             return
 
-        title = self.selected_todo.title
-        self.storage.delete(self.selected_todo.id)
-        self.refresh_todos()
-        self.update_status(f"[bold red]✗[/] Deleted: {title}")
+        original = self.selected_todo
+        list_view = self.list_view
+        list_view.remove(original.id)
+        # Pending so a watcher merge does not restore the row before the write lands.
+        list_view.set_pending(original.id, True)
+        self.update_status(f"[bold red]✗[/] Deleted: {original.title}")
         self.selected_todo = None
 
+        def saved(_: bool) -> None:
+            list_view.set_pending(original.id, False)
+
+        def failed(error: Exception) -> None:
+            list_view.set_pending(original.id, False)
+            list_view.upsert(original)
+            self.update_status(f"[bold red]✗[/] Could not delete {original.title}: {error}")
+
+        self._write("delete", lambda: self.storage.delete(original.id), saved, failed)
+
 
-def run_tui():
+def run_tui(storage: Optional[Storage] = None):
     """Run the TUI app."""
-    app = TodoTui()
+    app = TodoTui(storage)
     app.run()
@@ -0,0 +1,140 @@
+"""Detect writes to store files made by other processes.
+
+``open_watcher`` returns an inotify watcher on Linux and a stat-polling
+watcher elsewhere (or if inotify is unavailable). Both watch whole files by
+path, so atomic replaces and recreated files are seen too.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """Watch files by polling their inode, mtime and size."""
+
+    def __init__(self, paths: Iterable[Path], interval: float = 1.0):
+        """Initialize with the files to watch and the polling interval in seconds."""
+        self.paths: List[Path] = [Path(p) for p in paths]
+        self.interval = interval
+        self._sigs = self._snapshot()
+
+    def _snapshot(self) -> Dict[Path, Optional[Tuple[int, int, int]]]:
+        """Stat signature of every watched file (None if missing)."""
+        sigs = {}
+        for path in self.paths:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                sigs[path] = None
+            else:
+                sigs[path] = (st.st_ino, st.st_mtime_ns, st.st_size)
+        return sigs
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until a watched file changes or ``timeout`` passes; return True on change."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            sigs = self._snapshot()
+            if sigs != self._sigs:
+                self._sigs = sigs
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            delay = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            time.sleep(max(delay, 0))
+
+    def close(self) -> None:
+        """Release resources (nothing to do for polling)."""
+
+
+class InotifyWatcher:
+    """Watch files through inotify on their parent directories."""
+
+    def __init__(self, paths: Iterable[Path], libc: ctypes.CDLL):
+        """Initialize watches; raises OSError if inotify cannot be set up."""
+        self.paths = [Path(p).absolute() for p in paths]
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._names: Dict[int, set] = {}
+        try:
+            for directory in {p.parent for p in self.paths}:
+                wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+                self._names[wd] = {os.fsencode(p.name) for p in self.paths if p.parent == directory}
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def _drain(self) -> bool:
+        """Read queued events; return True if any concerned a watched file."""
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if name in self._names.get(wd, ()):
+                    changed = True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until a watched file changes or ``timeout`` passes; return True on change."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if ready and self._drain():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self._fd)
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    """Return libc if it provides inotify."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
+
+
+def open_watcher(paths: Iterable[Path], interval: float = 1.0, polling: bool = False):
+    """Return the best available watcher for ``paths``."""
+    paths = list(paths)
+    libc = None if polling else _load_libc()
+    if libc is not None:
+        try:
+            return InotifyWatcher(paths, libc)
+        except OSError:
+            pass
+    return PollingWatcher(paths, interval)
@@ -0,0 +1,174 @@
+"""Tests for the hot/cold partitioned storage."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from todo_cli import fileformat
+from todo_cli.archive import PartitionedTodoStorage
+from todo_cli.models import Todo, TodoStatus
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Partitioned storage with six todos, ids 2, 4 and 6 done."""
+    storage = PartitionedTodoStorage(str(tmp_path / "todos.json"), archive_after=None, block_size=2)
+    for i in range(1, 7):
+        storage.create(f"Todo {i}")
+    for i in (2, 4, 6):
+        storage.update(i, status=TodoStatus.DONE)
+    return storage
+
+
+def hot_ids(storage):
+    """Ids stored in the hot file."""
+    return [r["id"] for r in fileformat.decode(storage.filepath.read_bytes())[2]]
+
+
+def test_archive_moves_done_todos(storage):
+    """Archiving leaves only pending todos in the hot file."""
+    assert storage.archive() == 3
+
+    assert hot_ids(storage) == [1, 3, 5]
+    assert storage.archive_path.exists()
+    assert [t.id for t in storage.get_all()] == [1, 2, 3, 4, 5, 6]
+    assert [t.id for t in storage.get_all(TodoStatus.DONE)] == [2, 4, 6]
+    assert storage.get_by_id(4).title == "Todo 4"
+    assert storage.archive() == 0
+
+
+def test_pending_reads_skip_archive(storage, monkeypatch):
+    """Pending listings never decompress archived blocks."""
+    storage.archive()
+    fresh = PartitionedTodoStorage(str(storage.filepath))
+    monkeypatch.setattr(fresh.archived, "_read_block", lambda block: pytest.fail("decompressed"))
+
+    assert [t.id for t in fresh.iter_todos(status=TodoStatus.PENDING)] == [1, 3, 5]
+    assert fresh.create("Next").id == 7
+
+
+def test_archive_by_age(storage):
+    """Only done todos created before the cutoff are archived."""
+    old = (datetime.now() - timedelta(days=40)).isoformat()
+    storage.import_todos([Todo(id=0, title="Old", status=TodoStatus.DONE, created_at=old)])
+
+    assert storage.archive(older_than=datetime.now() - timedelta(days=30)) == 1
+    assert hot_ids(storage) == [1, 2, 3, 4, 5, 6]
+    assert storage.get_by_id(7).title == "Old"
+
+
+def test_update_and_delete_archived(storage):
+    """Edited archived todos move back to the hot file; deleted ones are gone."""
+    storage.archive()
+
+    todo = storage.update(4, status=TodoStatus.PENDING)
+    assert todo.status == TodoStatus.PENDING
+    assert storage.delete(6)
+    assert not storage.delete(6)
+
+    assert hot_ids(storage) == [1, 3, 4, 5]
+    assert [t.id for t in storage.get_all(TodoStatus.DONE)] == [2]
+    fresh = PartitionedTodoStorage(str(storage.filepath))
+    assert fresh.get_by_id(6) is None
+    assert [t.id for t in fresh.get_all()] == [1, 2, 3, 4, 5]
+
+
+def test_paging_merges_hot_and_archive(storage):
+    """Paged listings interleave hot and archived todos in id order."""
+    storage.archive()
+    page = storage.iter_todos(limit=2, after_id=2)
+    assert [t.id for t in page] == [3, 4]
+
+
+def test_cursor_skips_earlier_blocks(storage, monkeypatch):
+    """A cursor page only decompresses archive blocks past the cursor."""
+    storage.archive()
+    read = []
+    read_block = storage.archived._read_block
+    monkeypatch.setattr(storage.archived, "_read_block", lambda block: (read.append(block["ids"]), read_block(block))[1])
+
+    assert [t.id for t in storage.iter_todos(after_id=4)] == [5, 6]
+    assert read == [[6]]
+
+
+def test_repack_drops_garbage(storage):
+    """The archive is repacked once most of it is deleted."""
+    storage.archive()
+    size = storage.archived.block_path.stat().st_size
+    for i in (2, 4, 6):
+        storage.delete(i)
+    storage.update(5, status=TodoStatus.DONE)
+    storage.archive()
+
+    assert storage.archived.block_path.stat().st_size < size
+    assert storage.archived.garbage == 0
+    assert [t.id for t in storage.get_all(TodoStatus.DONE)] == [5]
+    assert PartitionedTodoStorage(str(storage.filepath)).get_by_id(5).title == "Todo 5"
+
+
+def test_repack_publishes_blocks_with_index(storage, monkeypatch):
+    """A repack that dies before its index is written leaves the old archive readable."""
+    storage.archive()
+    storage.delete(4)
+
+    def crash():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage.archived, "_write_index", crash)
+    with pytest.raises(OSError):
+        storage.archived.repack(2)
+    monkeypatch.undo()
+
+    assert not storage.archived._generation_path(1).exists()
+    fresh = PartitionedTodoStorage(str(storage.filepath))
+    assert [t.id for t in fresh.get_all(TodoStatus.DONE)] == [2, 6]
+    assert [t.id for t in storage.get_all(TodoStatus.DONE)] == [2, 6]
+
+
+def test_repack_keeps_one_previous_generation(storage):
+    """Each repack moves to a new block file and removes the ones before the last."""
+    storage.archive()
+    for generation in (1, 2, 3):
+        storage.archived.repack(1)
+        assert storage.archived.block_path == storage.archived._generation_path(generation)
+    archive = storage.archive_path
+    assert sorted(p.name for p in archive.parent.glob(archive.name + "*")) == [
+        "todos.json.archive.blocks", "todos.json.archive.g2", "todos.json.archive.g3",
+    ]
+    assert [t.id for t in PartitionedTodoStorage(str(storage.filepath)).get_all(TodoStatus.DONE)] == [2, 4, 6]
+
+
+def test_auto_archive(tmp_path):
+    """Done todos are archived once more than ``archive_after`` pile up."""
+    storage = PartitionedTodoStorage(str(tmp_path / "todos.json"), archive_after=2)
+    for i in range(1, 5):
+        storage.create(f"Todo {i}")
+    for i in (1, 2, 3):
+        storage.update(i, status=TodoStatus.DONE)
+
+    assert hot_ids(storage) == [4]
+    assert len(storage.archived) == 3
+
+
+def test_lzma_codec(tmp_path):
+    """Blocks can be compressed with lzma."""
+    storage = PartitionedTodoStorage(str(tmp_path / "todos.json"), codec="lzma", archive_after=None)
+    storage.create("Done")
+    storage.update(1, status=TodoStatus.DONE)
+    storage.archive()
+
+    assert PartitionedTodoStorage(str(storage.filepath)).get_by_id(1).title == "Done"
+
+
+def test_search_covers_archive(storage):
+    """Search finds archived todos."""
+    storage.archive()
+    assert [t.id for t in storage.search("Todo", limit=None)] == [1, 2, 3, 4, 5, 6]
+
+
+def test_stats_count_archived(storage):
+    """Archived todos still count as done, and their ids stay taken."""
+    storage.archive()
+    storage.delete(6)
+    stats = storage.stats()
+    assert stats.counts == {"pending": 3, "done": 2}
+    assert stats.next_id == 7
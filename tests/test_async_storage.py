@@ -0,0 +1,102 @@
+"""Tests for the asyncio storage front end."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from todo_cli.async_storage import AsyncTodoStorage
+from todo_cli.models import TodoStatus
+from todo_cli.storage import TodoStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Create a temporary storage instance."""
+    return TodoStorage(str(tmp_path / "todos.json"))
+
+
+def test_crud(storage):
+    """Awaitable calls mirror the synchronous API."""
+    async def scenario():
+        todos = AsyncTodoStorage(storage)
+        first = await todos.create("First", "Desc")
+        await todos.create("Second")
+        assert (await todos.get_by_id(first.id)).description == "Desc"
+        assert (await todos.update(first.id, status=TodoStatus.DONE)).status == TodoStatus.DONE
+        assert [t.title for t in await todos.get_all(TodoStatus.PENDING)] == ["Second"]
+        assert await todos.delete(first.id)
+        assert await todos.get_by_id(first.id) is None
+        assert [t.title for t in await todos.search("sec")] == ["Second"]
+        assert (await todos.stats()).counts == {"pending": 1, "done": 0}
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_reads_share_one_load(storage, monkeypatch):
+    """Identical reads in flight together run once."""
+    storage.create("Only")
+    calls = []
+    get_all = storage.get_all
+
+    def slow_get_all(status=None):
+        calls.append(status)
+        time.sleep(0.05)
+        return get_all(status)
+
+    monkeypatch.setattr(storage, "get_all", slow_get_all)
+
+    async def scenario():
+        todos = AsyncTodoStorage(storage)
+        results = await asyncio.gather(*(todos.get_all() for _ in range(10)))
+        assert all([t.title for t in r] == ["Only"] for r in results)
+
+    asyncio.run(scenario())
+    assert calls == [None]
+
+
+def test_reads_after_write_see_it(storage):
+    """A read issued after a write does not join an older read."""
+    async def scenario():
+        todos = AsyncTodoStorage(storage)
+        stale = asyncio.ensure_future(todos.get_all())
+        await asyncio.sleep(0)
+        await todos.create("New")
+        assert [t.title for t in await todos.get_all()] == ["New"]
+        await stale
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_writes_share_saves(storage, monkeypatch):
+    """Writes issued together are group-committed."""
+    saves = []
+    save = storage._save
+
+    def slow_save(todos):
+        saves.append(threading.get_ident())
+        time.sleep(0.05)
+        save(todos)
+
+    monkeypatch.setattr(storage, "_save", slow_save)
+
+    async def scenario():
+        todos = AsyncTodoStorage(storage)
+        created = await asyncio.gather(*(todos.create(f"Todo {i}") for i in range(20)))
+        assert sorted(t.id for t in created) == list(range(1, 21))
+
+    asyncio.run(scenario())
+    assert len(saves) < 20
+    assert len(storage.get_all()) == 20
+
+
+def test_iter_todos_streams_in_chunks(storage):
+    """The async iterator yields every matching todo in order."""
+    for i in range(7):
+        storage.create(f"Todo {i}")
+
+    async def scenario():
+        todos = AsyncTodoStorage(storage)
+        return [t.id async for t in todos.iter_todos(after_id=2, chunk_size=2)]
+
+    assert asyncio.run(scenario()) == [3, 4, 5, 6, 7]
@@ -0,0 +1,244 @@
+"""Conformance and performance suite every storage backend must pass.
+
+The ``storage`` fixture is parameterised over every registered backend, so
+a newly registered engine is covered without touching this file.
+"""
+import time
+
+import pytest
+
+from todo_cli import backends
+from todo_cli.backends import Storage
+from todo_cli.batch import BatchAction, BatchOp
+from todo_cli.memory import MemoryTodoStorage
+from todo_cli.models import Todo, TodoStatus
+from todo_cli.query import Query, SortKey
+
+# Generous wall-clock budgets (seconds) for the performance checks: they
+# catch accidental O(n^2) paths, not small regressions.
+PERF_SIZE = 2000
+PERF_BUDGETS = {"import": 5.0, "reads": 2.0, "writes": 10.0}
+
+
+@pytest.fixture(params=backends.names())
+def open_store(request, tmp_path):
+    """Open the same store location again with the backend under test."""
+    opened = []
+
+    def open_store():
+        storage = backends.open_storage(request.param, str(tmp_path / "store"))
+        opened.append(storage)
+        return storage
+
+    yield open_store
+    for storage in opened:
+        if hasattr(storage, "wait_for_compaction"):
+            storage.wait_for_compaction()
+        if hasattr(storage, "close"):
+            storage.close()
+
+
+@pytest.fixture
+def storage(open_store):
+    """A fresh, empty store of the backend under test."""
+    return open_store()
+
+
+def test_implements_protocol(storage):
+    """Every backend provides the whole protocol."""
+    assert isinstance(storage, Storage)
+
+
+def test_crud(storage):
+    """Create, read, update and delete behave the same everywhere."""
+    first = storage.create("First", "Details")
+    second = storage.create("Second")
+    assert (first.id, second.id) == (1, 2)
+    assert storage.get_by_id(1) == first
+    assert storage.get_by_id(99) is None
+
+    done = storage.update(2, status=TodoStatus.DONE, title="Second!")
+    assert done.status == TodoStatus.DONE and done.title == "Second!"
+    assert storage.update(99, title="Nope") is None
+    assert [t.id for t in storage.get_all(TodoStatus.DONE)] == [2]
+
+    assert storage.delete(1) is True
+    assert storage.delete(1) is False
+    assert [t.title for t in storage.get_all()] == ["Second!"]
+    assert storage.create("Third").id == 3
+
+
+def test_paging(storage):
+    """``iter_todos`` pages by offset and by cursor, in id order."""
+    for i in range(1, 8):
+        storage.create(f"Todo {i}")
+    storage.update(4, status=TodoStatus.DONE)
+
+    assert [t.id for t in storage.iter_todos(limit=3, offset=2)] == [3, 4, 5]
+    assert [t.id for t in storage.iter_todos(after_id=5)] == [6, 7]
+    assert [t.id for t in storage.iter_todos(TodoStatus.PENDING, limit=2, after_id=3)] == [5, 6]
+
+
+def test_columns(storage):
+    """``get_columns`` holds the same todos as ``get_all``."""
+    storage.create("A")
+    storage.create("B")
+    storage.update(1, status=TodoStatus.DONE)
+    assert list(storage.get_columns()) == storage.get_all()
+    assert [t.id for t in storage.get_columns(TodoStatus.PENDING)] == [2]
+
+
+def test_query(storage):
+    """Filtered, sorted listings agree across backends."""
+    for title in ("banana", "Apple", "apricot", "cherry"):
+        storage.create(title)
+    storage.update(2, status=TodoStatus.DONE)
+
+    by_title = storage.query(Query(sort=SortKey.TITLE))
+    assert [t.title for t in by_title] == ["Apple", "apricot", "banana", "cherry"]
+    prefixed = storage.query(Query(title_prefix="ap", status=TodoStatus.PENDING))
+    assert [t.title for t in prefixed] == ["apricot"]
+    assert [t.id for t in storage.query(Query(reverse=True, limit=2))] == [4, 3]
+
+
+def test_search(storage):
+    """Search finds todos by title and description words, and sees updates."""
+    storage.create("Buy milk", "From the corner shop")
+    storage.create("Call Bob")
+    assert [t.id for t in storage.search("milk")] == [1]
+    assert [t.id for t in storage.search("corn")] == [1]
+    assert storage.search("corn", prefix=False) == []
+
+    storage.update(2, title="Buy bread")
+    storage.delete(1)
+    assert [t.id for t in storage.search("buy")] == [2]
+
+
+def test_import(storage):
+    """Imports reassign ids unless asked to keep them, and refuse clashes."""
+    storage.create("Existing")
+    count = storage.import_todos([Todo(id=50, title="A"), Todo(id=60, title="B")])
+    assert count == 2
+    assert [t.id for t in storage.get_all()] == [1, 2, 3]
+
+    assert storage.import_todos([Todo(id=10, title="Kept")], keep_ids=True) == 1
+    assert storage.get_by_id(10).title == "Kept"
+    with pytest.raises(ValueError, match="already exists"):
+        storage.import_todos([Todo(id=10, title="Clash")], keep_ids=True)
+    assert storage.create("Next").id == 11
+
+
+def test_batch(storage):
+    """Batches apply item by item, or not at all when atomic."""
+    storage.create("One")
+    results = storage.apply_batch([
+        BatchOp(BatchAction.ADD, title="Two"),
+        BatchOp(BatchAction.COMPLETE, todo_id=1),
+        BatchOp(BatchAction.DELETE, todo_id=9),
+    ])
+    assert [r.ok for r in results] == [True, True, False]
+    assert [(t.id, t.status) for t in storage.get_all()] == [(1, TodoStatus.DONE), (2, TodoStatus.PENDING)]
+
+    before = storage.get_all()
+    storage.apply_batch([BatchOp(BatchAction.DELETE, todo_id=1), BatchOp(BatchAction.DELETE, todo_id=9)], atomic=True)
+    assert storage.get_all() == before
+
+
+def test_stats(storage):
+    """Stats count by status and keep a high-water mark for ids."""
+    for i in range(3):
+        storage.create(f"Todo {i}")
+    storage.update(1, status=TodoStatus.DONE)
+    storage.delete(3)
+    stats = storage.stats()
+    assert stats.counts == {"pending": 1, "done": 1}
+    assert stats.next_id == 4
+    assert stats.modified is not None
+
+
+def test_rejected_update(open_store):
+    """An invalid status is refused before anything is written."""
+    storage = open_store()
+    storage.create("Keep me")
+    with pytest.raises(ValueError):
+        storage.update(1, status="bogus")
+    assert storage.get_by_id(1).status == TodoStatus.PENDING
+    assert [t.title for t in storage.get_all()] == ["Keep me"]
+    if storage.watch_paths():
+        assert [(t.title, t.status) for t in open_store().get_all()] == [("Keep me", TodoStatus.PENDING)]
+
+
+def test_reopen(open_store):
+    """Stores that live on disk hand their todos to the next instance."""
+    storage = open_store()
+    if not storage.watch_paths():
+        pytest.skip("backend keeps nothing on disk")
+    storage.create("Persisted")
+    storage.update(1, status=TodoStatus.DONE)
+    again = open_store()
+    assert [(t.title, t.status) for t in again.get_all()] == [("Persisted", TodoStatus.DONE)]
+    assert again.create("Next").id == 2
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def test_performance(storage):
+    """Bulk import, point reads, listings and writes stay within budget."""
+    todos = (Todo(id=0, title=f"Todo {i}", description="bulk") for i in range(PERF_SIZE))
+    assert _timed(lambda: storage.import_todos(todos)) < PERF_BUDGETS["import"]
+
+    def reads():
+        for todo_id in range(1, PERF_SIZE + 1, 10):
+            assert storage.get_by_id(todo_id) is not None
+        assert len(storage.get_all()) == PERF_SIZE
+        assert len(list(storage.iter_todos(limit=50, after_id=PERF_SIZE // 2))) == 50
+        assert storage.stats().total == PERF_SIZE
+
+    assert _timed(reads) < PERF_BUDGETS["reads"]
+
+    def writes():
+        for todo_id in range(1, 51):
+            storage.update(todo_id, status=TodoStatus.DONE)
+        for i in range(50):
+            storage.create(f"New {i}")
+
+    assert _timed(writes) < PERF_BUDGETS["writes"]
+    assert storage.stats().counts == {"pending": PERF_SIZE, "done": 50}
+
+
+def test_unknown_backend():
+    """Selecting an unregistered backend names the available ones."""
+    with pytest.raises(ValueError, match="memory"):
+        backends.open_storage("nope")
+
+
+def test_selection_from_environment(tmp_path, monkeypatch):
+    """``TODO_BACKEND`` and ``TODO_STORE`` pick the backend and its file."""
+    monkeypatch.setenv("TODO_BACKEND", "sqlite")
+    monkeypatch.setenv("TODO_STORE", str(tmp_path / "elsewhere.db"))
+    storage = backends.open_storage()
+    storage.create("Here")
+    storage.close()
+    assert (tmp_path / "elsewhere.db").exists()
+    assert backends.open_storage("memory").get_all() == []
+
+
+def test_register(monkeypatch):
+    """A registered factory is selectable by name and gets the store path."""
+    monkeypatch.setattr(backends, "_registry", dict(backends._registry))
+    paths = []
+    backends.register("custom", lambda path: paths.append(path) or MemoryTodoStorage())
+    assert "custom" in backends.names()
+    assert isinstance(backends.open_storage("custom", "somewhere"), MemoryTodoStorage)
+    assert paths == ["somewhere"]
+
+
+def test_memory_seed():
+    """The memory backend can start from a list of todos, keeping their ids."""
+    storage = MemoryTodoStorage([Todo(id=5, title="Five"), Todo(id=2, title="Two")])
+    assert [t.id for t in storage.get_all()] == [2, 5]
+    assert storage.create("Six").id == 6
@@ -0,0 +1,114 @@
+"""Tests for batches of operations."""
+import pytest
+
+from todo_cli.archive import PartitionedTodoStorage
+from todo_cli.batch import BatchAction, BatchOp, BatchResult, parse_batch
+from todo_cli.journal import JournalTodoStorage
+from todo_cli.models import TodoStatus
+from todo_cli.offsets import IndexedTodoStorage
+from todo_cli.sqlite_storage import SqliteTodoStorage
+from todo_cli.storage import TodoStorage
+
+
+def test_parse_batch():
+    """Shell-style and JSON lines both parse; comments and blanks are skipped."""
+    ops = list(parse_batch([
+        "# header",
+        'add "Buy milk" "2 litres"',
+        "",
+        "complete 3 4",
+        '{"op": "delete", "id": 5}',
+        '{"op": "add", "title": "Call"}',
+    ]))
+    assert ops == [
+        BatchOp(BatchAction.ADD, title="Buy milk", description="2 litres"),
+        BatchOp(BatchAction.COMPLETE, todo_id=3),
+        BatchOp(BatchAction.COMPLETE, todo_id=4),
+        BatchOp(BatchAction.DELETE, todo_id=5),
+        BatchOp(BatchAction.ADD, title="Call"),
+    ]
+
+
+@pytest.mark.parametrize("line", ["rename 1", "complete", "complete x", "add", '{"op": "delete"}', "{oops"])
+def test_parse_batch_rejects(line):
+    """A bad line names its line number."""
+    with pytest.raises(ValueError, match="line 2"):
+        list(parse_batch(["complete 1", line]))
+
+
+def test_result_round_trip():
+    """Results survive the daemon's JSON encoding."""
+    result = BatchResult(BatchOp(BatchAction.DELETE, todo_id=9), error="Todo with ID 9 not found")
+    assert BatchResult.from_dict(result.to_dict()) == result
+
+
+@pytest.fixture(params=["json", "indexed", "journal", "sqlite", "partitioned"])
+def storage(request, tmp_path):
+    """Each backend with todos 1-4, 2 already archived where supported."""
+    path = str(tmp_path / "todos.json")
+    storage = {
+        "json": lambda: TodoStorage(path),
+        "indexed": lambda: IndexedTodoStorage(path),
+        "journal": lambda: JournalTodoStorage(path),
+        "sqlite": lambda: SqliteTodoStorage(str(tmp_path / "todos.db"), migrate_from=None),
+        "partitioned": lambda: PartitionedTodoStorage(path, archive_after=None),
+    }[request.param]()
+    for i in range(1, 5):
+        storage.create(f"Todo {i}")
+    storage.update(2, status=TodoStatus.DONE)
+    if request.param == "partitioned":
+        storage.archive()
+    return storage
+
+
+def test_apply_batch(storage):
+    """Every item runs; a missing id fails only that item."""
+    results = storage.apply_batch([
+        BatchOp(BatchAction.ADD, title="New", description="Added"),
+        BatchOp(BatchAction.COMPLETE, todo_id=5),
+        BatchOp(BatchAction.COMPLETE, todo_id=1),
+        BatchOp(BatchAction.DELETE, todo_id=2),
+        BatchOp(BatchAction.DELETE, todo_id=42),
+        BatchOp(BatchAction.COMPLETE, todo_id=2),
+    ])
+
+    assert [r.ok for r in results] == [True, True, True, True, False, False]
+    assert results[0].todo.id == 5
+    assert results[1].todo.status == TodoStatus.DONE
+    assert results[4].error == "Todo with ID 42 not found"
+    assert [(t.id, t.status.value) for t in storage.get_all()] == [
+        (1, "done"), (3, "pending"), (4, "pending"), (5, "done"),
+    ]
+    assert storage.stats().counts == {"pending": 2, "done": 2}
+
+
+def test_atomic_batch_rolls_back(storage):
+    """With atomic, one failure leaves the store untouched."""
+    before = storage.get_all()
+    results = storage.apply_batch([
+        BatchOp(BatchAction.ADD, title="New"),
+        BatchOp(BatchAction.COMPLETE, todo_id=1),
+        BatchOp(BatchAction.DELETE, todo_id=2),
+        BatchOp(BatchAction.DELETE, todo_id=42),
+    ], atomic=True)
+
+    assert [r.ok for r in results] == [True, True, True, False]
+    assert storage.get_all() == before
+    assert storage.get_by_id(2).status == TodoStatus.DONE
+    assert storage.create("Next").id == 5
+    assert storage.stats().counts == {"pending": 4, "done": 1}
+
+
+def test_batch_is_one_save(tmp_path, monkeypatch):
+    """The JSON backend loads and saves once for the whole batch."""
+    storage = TodoStorage(str(tmp_path / "todos.json"))
+    for i in range(1, 4):
+        storage.create(f"Todo {i}")
+    saves = []
+    save = storage._save
+    monkeypatch.setattr(storage, "_save", lambda todos: (saves.append(1), save(todos)))
+
+    storage.apply_batch([BatchOp(BatchAction.COMPLETE, todo_id=i) for i in (1, 2, 3)])
+    assert len(saves) == 1
+    storage.apply_batch([BatchOp(BatchAction.DELETE, todo_id=9)])
+    assert len(saves) == 1
@@ -1,8 +1,11 @@
 """Tests for CLI commands."""
+import json
+
 import pytest
 from typer.testing import CliRunner
 
 from todo_cli.cli import app
+from todo_cli.models import Todo
 from todo_cli.storage import TodoStorage
 
 runner = CliRunner()
@@ -12,7 +15,7 @@ runner = CliRunner()
 def temp_storage(tmp_path, monkeypatch):
     """Create temporary storage and patch storage location."""
     filepath = tmp_path / "test_todos.json"
-    monkeypatch.setattr("todo_cli.cli.TodoStorage", lambda: TodoStorage(str(filepath)))
+    monkeypatch.setenv("TODO_STORE", str(filepath))
     return TodoStorage(str(filepath))
 
 
@@ -105,6 +108,49 @@ def test_delete_nonexistent(temp_storage):
     assert "not found" in result.stdout
 
 
+def test_complete_and_delete_many(temp_storage):
+    """Test completing and deleting several todos in one command."""
+    for i in range(1, 6):
+        temp_storage.create(f"Todo {i}")
+
+    result = runner.invoke(app, ["complete", "1", "2", "9"])
+    assert result.exit_code == 1
+    assert "Todo with ID 9 not found" in result.stdout
+    assert "2 todos marked as done" in result.stdout
+
+    result = runner.invoke(app, ["delete", "3", "9", "--atomic"])
+    assert result.exit_code == 1
+    assert "nothing was changed" in result.stdout
+    assert temp_storage.get_by_id(3) is not None
+
+    result = runner.invoke(app, ["delete", "--status", "done"])
+    assert result.exit_code == 0
+    assert "2 todos deleted" in result.stdout
+    assert [t.id for t in temp_storage.get_all()] == [3, 4, 5]
+
+    result = runner.invoke(app, ["complete"])
+    assert result.exit_code == 1
+
+
+def test_batch(temp_storage, tmp_path):
+    """Test running operations from stdin and from a file."""
+    temp_storage.create("First")
+    result = runner.invoke(app, ["batch"], input='add "Second" "From batch"\ncomplete 1\n')
+    assert result.exit_code == 0
+    assert "2 todos changed" in result.stdout
+    assert [(t.title, t.status.value) for t in temp_storage.get_all()] == [("First", "done"), ("Second", "pending")]
+
+    ops = tmp_path / "ops.txt"
+    ops.write_text('delete 2\n{"op": "complete", "id": 7}\n')
+    result = runner.invoke(app, ["batch", str(ops), "--atomic"])
+    assert result.exit_code == 1
+    assert temp_storage.get_by_id(2) is not None
+
+    result = runner.invoke(app, ["batch"], input="complete one\n")
+    assert result.exit_code == 1
+    assert "line 1" in result.stdout
+
+
 def test_cli_help():
     """Test CLI help output."""
     result = runner.invoke(app, ["--help"])
@@ -113,3 +159,276 @@ def test_cli_help():
     assert "list" in result.stdout
     assert "complete" in result.stdout
     assert "delete" in result.stdout
+
+
+def test_backend_option(tmp_path, monkeypatch):
+    """Test selecting the SQLite backend from the CLI."""
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(app, ["--backend", "sqlite", "add", "In sqlite"])
+    assert result.exit_code == 0
+    assert (tmp_path / "todos.db").exists()
+
+    result = runner.invoke(app, ["list"], env={"TODO_BACKEND": "sqlite"})
+    assert "In sqlite" in result.stdout
+
+
+def test_export_and_import(temp_storage, tmp_path):
+    """Test exporting to a file and importing it back."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+
+    dump = tmp_path / "dump.csv"
+    result = runner.invoke(app, ["export", str(dump)])
+    assert result.exit_code == 0
+    assert "Exported 2 todos" in result.stdout
+
+    result = runner.invoke(app, ["import", str(dump)])
+    assert result.exit_code == 0
+    assert "Imported 2 todos" in result.stdout
+    assert [t.title for t in temp_storage.get_all()] == ["First", "Second", "First", "Second"]
+
+
+def test_import_rejects_empty_chunks(temp_storage, tmp_path):
+    """Test that --chunk-size 0 is a usage error, not a silent no-op."""
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text('{"title": "First"}\n')
+    result = runner.invoke(app, ["import", str(dump), "--chunk-size", "0"])
+    assert result.exit_code == 2
+    assert temp_storage.get_all() == []
+
+
+def test_export_to_stdout(temp_storage):
+    """Test streaming an export to stdout."""
+    temp_storage.create("First")
+    result = runner.invoke(app, ["export", "--format", "jsonl"])
+    assert result.exit_code == 0
+    assert '"title": "First"' in result.stdout
+
+
+def test_import_invalid(temp_storage):
+    """Test that invalid input is reported."""
+    result = runner.invoke(app, ["import", "-", "--format", "jsonl"], input='{"title": "ok"}\n{"status": "x"}\n')
+    assert result.exit_code == 1
+    assert "Invalid record 2" in result.stdout
+    assert temp_storage.get_all() == []
+
+    result = runner.invoke(app, ["import", "-", "--format", "jsonl"], input="[1]\n")
+    assert result.exit_code == 1
+    assert "Invalid record 1" in result.stdout
+
+
+def test_list_paging(temp_storage):
+    """Test limiting and paging the list output."""
+    for i in range(1, 6):
+        temp_storage.create(f"Todo {i}")
+
+    result = runner.invoke(app, ["list", "--limit", "2", "--offset", "1"])
+    assert result.exit_code == 0
+    assert "Todo 2" in result.stdout
+    assert "Todo 3" in result.stdout
+    assert "Todo 1" not in result.stdout
+    assert "Todo 4" not in result.stdout
+    assert "--after 3" in result.stdout
+
+    result = runner.invoke(app, ["list", "--after", "3", "--page-size", "1"])
+    assert "Todo 4" in result.stdout
+    assert "Todo 5" in result.stdout
+    assert "Todo 3" not in result.stdout
+
+    result = runner.invoke(app, ["list", "--limit", "2", "--after", "3"])
+    assert "Next page" not in result.stdout
+
+    temp_storage.update(2, status="done")
+    temp_storage.update(4, status="done")
+    result = runner.invoke(app, ["list", "-s", "done", "--limit", "1"])
+    assert "todo list --status done --limit 1 --after 2" in result.stdout
+
+
+def test_list_after_follows_id_order(temp_storage):
+    """Test that a todo imported with a lower id is still reached by --after paging."""
+    temp_storage.create("Gone")
+    temp_storage.create("Todo 2")
+    temp_storage.delete(1)
+    temp_storage.import_todos([Todo(id=1, title="Todo 1")], keep_ids=True)
+
+    result = runner.invoke(app, ["list", "--limit", "1"])
+    assert "Todo 1" in result.stdout
+    assert "--after 1" in result.stdout
+
+
+def test_list_formats(temp_storage):
+    """Test machine-readable list output."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+    temp_storage.update(2, status="done")
+
+    result = runner.invoke(app, ["list", "--format", "ids"])
+    assert result.stdout == "1\n2\n"
+    result = runner.invoke(app, ["list", "-f", "jsonl", "--status", "done"])
+    assert [json.loads(line)["title"] for line in result.stdout.splitlines()] == ["Second"]
+    result = runner.invoke(app, ["list", "-f", "json", "--limit", "1"])
+    assert [t["id"] for t in json.loads(result.stdout)] == [1]
+    result = runner.invoke(app, ["list", "-f", "tsv"])
+    assert result.stdout.splitlines()[1].startswith("1\tpending\t")
+
+
+def test_list_plain_and_capped(temp_storage):
+    """Test the plain-text table and the row cap."""
+    for i in range(1, 4):
+        temp_storage.create(f"Todo {i}")
+
+    result = runner.invoke(app, ["list", "--no-color", "--max-rows", "2"])
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert lines[0].split() == ["ID", "Status", "Created", "Title"]
+    assert lines[1].split()[0::3] == ["1", "Todo"]
+    assert "Todo 3" not in result.stdout
+    assert "Next page: todo list --limit 2 --after 2" in result.stdout
+    assert "\x1b[" not in result.stdout
+
+
+def test_list_query_options(temp_storage):
+    """Test date, title and sort options of list."""
+    temp_storage.import_todos([
+        Todo(id=1, title="Fix bug", created_at="2025-01-03T00:00:00"),
+        Todo(id=2, title="Write docs", created_at="2025-01-01T00:00:00"),
+        Todo(id=3, title="fix tests", created_at="2025-01-02T00:00:00"),
+    ], keep_ids=True)
+
+    result = runner.invoke(app, ["list", "-f", "ids", "--sort", "created"])
+    assert result.stdout.split() == ["2", "3", "1"]
+    result = runner.invoke(app, ["list", "-f", "ids", "--title-prefix", "FIX", "--sort", "title", "--reverse"])
+    assert result.stdout.split() == ["3", "1"]
+    result = runner.invoke(app, ["list", "-f", "ids", "--since", "2025-01-02", "--until", "2025-01-03"])
+    assert result.stdout.split() == ["3"]
+
+    result = runner.invoke(app, ["list", "--sort", "title", "--limit", "1"])
+    assert "Fix bug" in result.stdout
+    assert "todo list --sort title --limit 1 --offset 1" in result.stdout
+
+
+def test_stats(temp_storage):
+    """Test printing the store stats."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+    temp_storage.update(2, status="done")
+
+    result = runner.invoke(app, ["stats"])
+    assert result.exit_code == 0
+    assert "2 todos" in result.stdout
+    assert "next id  3" in result.stdout
+
+    result = runner.invoke(app, ["stats", "--json"])
+    stats = json.loads(result.stdout)
+    assert (stats["counts"], stats["next_id"], stats["total"]) == ({"pending": 1, "done": 1}, 3, 2)
+
+
+def test_import_time_budget():
+    """Test that importing the CLI stays within budget and skips heavy modules."""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    script = Path(__file__).resolve().parent.parent / "scripts" / "check_import_time.py"
+    # Generous budget: this guards against pulling in textual-sized
+    # dependencies, not against machine-to-machine noise.
+    result = subprocess.run(
+        [sys.executable, str(script), "--runs", "1", "--budget-ms", "2000"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout
+
+
+def test_profile_output(temp_storage, tmp_path):
+    """Test writing trace spans for a command."""
+    from todo_cli import tracing
+
+    temp_storage.create("First")
+    trace = tmp_path / "trace.jsonl"
+    result = runner.invoke(app, ["--profile-output", str(trace), "list"])
+    assert result.exit_code == 0
+    assert not tracing.ENABLED
+
+    names = {json.loads(line)["name"] for line in trace.read_text().splitlines()}
+    assert {"cli.list", "cli.render", "storage.stream"} <= names
+
+
+def test_cprofile_dump(temp_storage, tmp_path):
+    """Test writing a cProfile dump for a command."""
+    import pstats
+
+    dump = tmp_path / "list.prof"
+    result = runner.invoke(app, ["--cprofile", str(dump), "list"])
+    assert result.exit_code == 0
+    assert pstats.Stats(str(dump)).total_calls > 0
+
+
+def test_search(temp_storage):
+    """Test searching todos via CLI."""
+    temp_storage.create("Buy groceries")
+    temp_storage.create("Write report")
+
+    result = runner.invoke(app, ["search", "groc"])
+    assert result.exit_code == 0
+    assert "Buy groceries" in result.stdout
+    assert "Write report" not in result.stdout
+
+    result = runner.invoke(app, ["search", "groc", "--exact"])
+    assert "No todos match" in result.stdout
+
+
+def test_storage_convert(temp_storage):
+    """Test converting the store layout via CLI."""
+    temp_storage.create("Keep me")
+    result = runner.invoke(app, ["storage", "convert", "--to", "pretty"])
+    assert result.exit_code == 0
+    assert "Converted 1 todos" in result.stdout
+    assert b'\n[\n  {\n' in temp_storage.filepath.read_bytes()
+
+    result = runner.invoke(app, ["--backend", "sqlite", "storage", "convert"])
+    assert result.exit_code == 1
+
+
+def test_archive_command(tmp_path, monkeypatch):
+    """Test archiving done todos via CLI."""
+    from todo_cli.archive import PartitionedTodoStorage
+
+    filepath = tmp_path / "test_todos.json"
+    monkeypatch.setenv("TODO_STORE", str(filepath))
+    storage = PartitionedTodoStorage(str(filepath), archive_after=None)
+    storage.create("Done")
+    storage.create("Open")
+    storage.update(1, status="done")
+
+    result = runner.invoke(app, ["--backend", "partitioned", "archive", "--older-than", "1"])
+    assert result.exit_code == 0
+    assert "Archived 0 done todos" in result.stdout
+
+    result = runner.invoke(app, ["--backend", "partitioned", "archive"])
+    assert result.exit_code == 0
+    assert "Archived 1 done todos" in result.stdout
+    result = runner.invoke(app, ["--backend", "partitioned", "list", "--status", "done"])
+    assert "Done" in result.stdout
+
+    result = runner.invoke(app, ["archive"])
+    assert result.exit_code == 1
+
+
+def test_durability_option_sets_policy(temp_storage, monkeypatch):
+    """Test that --durability sets the policy of stores the command opens."""
+    from todo_cli import durability
+    from todo_cli.durability import Durability
+
+    monkeypatch.setattr(durability, "POLICY", Durability.ALWAYS)
+    result = runner.invoke(app, ["--no-daemon", "--durability", "none", "add", "Bulk"])
+    assert result.exit_code == 0
+    assert durability.POLICY == Durability.NONE
+    assert temp_storage.get_by_id(1).title == "Bulk"
+
+
+def test_invalid_durability_is_a_usage_error(temp_storage):
+    """Test that a bad TODO_DURABILITY is reported like a bad option."""
+    result = runner.invoke(app, ["list"], env={"TODO_DURABILITY": "bogus"})
+    assert result.exit_code == 2
+    assert "bogus" in result.output
@@ -0,0 +1,166 @@
+"""Tests for the todo daemon and its client."""
+import threading
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from todo_cli.batch import BatchAction, BatchOp
+from todo_cli.cli import app
+from todo_cli.daemon import RemoteStorage, connect, serve, socket_path
+from todo_cli.models import Todo, TodoStatus
+from todo_cli.storage import TodoStorage
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve a temporary store on a socket in a background thread."""
+    server = serve(TodoStorage(str(tmp_path / "todos.json")), tmp_path / "todo.sock")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def remote(server):
+    """Client connected to the server."""
+    client = RemoteStorage(server.path)
+    yield client
+    client.close()
+
+
+def test_remote_crud(remote, server):
+    """Calls through the socket act on the served storage."""
+    todo = remote.create("Remote", "Over the socket")
+    assert todo.id == 1
+    assert remote.get_by_id(1).description == "Over the socket"
+    assert remote.update(1, status=TodoStatus.DONE).status == TodoStatus.DONE
+    assert remote.get_all(TodoStatus.PENDING) == []
+    assert [t.id for t in remote.iter_todos(status=TodoStatus.DONE, limit=5)] == [1]
+    assert [t.title for t in remote.search("sock")] == ["Remote"]
+    assert server.storage.get_by_id(1).status == TodoStatus.DONE
+    assert remote.stats().counts == {"pending": 0, "done": 1}
+    assert remote.delete(1)
+    assert remote.get_by_id(1) is None
+    assert remote.watch_paths() == [server.storage.filepath.resolve()]
+
+
+def test_remote_errors(remote):
+    """Storage errors are raised on the client side."""
+    remote.import_todos([Todo(id=3, title="Kept")], keep_ids=True)
+    with pytest.raises(ValueError, match="already exists"):
+        remote.import_todos([Todo(id=3, title="Again")], keep_ids=True)
+    with pytest.raises(ValueError):
+        remote.update(3, status="bogus")
+    assert remote.get_by_id(3).title == "Kept"
+
+    results = remote.apply_batch([BatchOp(BatchAction.COMPLETE, todo_id=3), BatchOp(BatchAction.DELETE, todo_id=4)])
+    assert [r.ok for r in results] == [True, False]
+    assert results[0].todo.status == TodoStatus.DONE
+
+
+def test_connect_without_daemon(tmp_path):
+    """No daemon (or a stale socket file) means direct access."""
+    path = tmp_path / "todo.sock"
+    assert connect(path) is None
+    path.touch()
+    assert connect(path) is None
+
+
+def test_second_daemon_refused(server):
+    """Only one daemon can serve a socket."""
+    with pytest.raises(FileExistsError):
+        serve(server.storage, server.path)
+
+
+def test_cli_uses_daemon(server, monkeypatch):
+    """CLI commands talk to the daemon when it is running."""
+    monkeypatch.setenv("TODO_SOCKET", str(server.path))
+    def direct():
+        raise RuntimeError("opened the store directly")
+
+    monkeypatch.setattr("todo_cli.cli.open_storage", direct)
+
+    result = runner.invoke(app, ["add", "Via daemon"])
+    assert result.exit_code == 0
+    result = runner.invoke(app, ["complete", "1"])
+    assert result.exit_code == 0
+    result = runner.invoke(app, ["list"])
+    assert "Via daemon" in result.stdout
+    assert server.storage.get_by_id(1).status == TodoStatus.DONE
+
+    result = runner.invoke(app, ["--no-daemon", "list"])
+    assert isinstance(result.exception, RuntimeError)
+
+
+def test_socket_is_per_store(tmp_path, monkeypatch):
+    """Commands for another store file never reach a daemon serving this one."""
+    monkeypatch.delenv("TODO_SOCKET", raising=False)
+    monkeypatch.chdir(tmp_path)
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    assert socket_path("json", "a.json") == socket_path("json", str(a))
+    assert socket_path("json", str(a)) != socket_path("json", str(b))
+    assert socket_path("json") == Path(".todo-json.sock")
+
+    server = serve(TodoStorage(str(a)), socket_path("json", str(a)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        result = runner.invoke(app, ["--store", str(b), "add", "meant for b"])
+        assert result.exit_code == 0
+        result = runner.invoke(app, ["--store", str(a), "add", "meant for a"])
+        assert result.exit_code == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    assert [t.title for t in TodoStorage(str(b)).get_all()] == ["meant for b"]
+    assert [t.title for t in server.storage.get_all()] == ["meant for a"]
+
+
+def test_remote_transfers_are_paged(remote, server, monkeypatch):
+    """Listings and imports cross the socket a page or chunk at a time."""
+    import todo_cli.daemon
+
+    monkeypatch.setattr(todo_cli.daemon, "PAGE_SIZE", 2)
+    calls = []
+    dispatch = server.dispatch
+    monkeypatch.setattr(server, "dispatch", lambda request: (calls.append(request["method"]), dispatch(request))[1])
+
+    assert remote.import_todos((Todo(id=0, title=f"Todo {i}") for i in range(5)), chunk_size=2) == 5
+    assert calls == ["import_todos"] * 3
+
+    calls.clear()
+    assert [t.id for t in remote.iter_todos()] == [1, 2, 3, 4, 5]
+    assert calls == ["iter_todos"] * 3
+    assert [t.id for t in remote.iter_todos(limit=3, offset=1)] == [2, 3, 4]
+    assert [t.id for t in remote.get_columns()] == [1, 2, 3, 4, 5]
+
+
+def test_remote_is_a_storage(remote):
+    """The client implements the whole storage protocol."""
+    from todo_cli.backends import Storage
+
+    assert isinstance(remote, Storage)
+
+
+def test_cli_rejects_durability_the_daemon_does_not_use(server, monkeypatch):
+    """An explicit --durability that differs from the daemon's is an error, not ignored."""
+    monkeypatch.setenv("TODO_SOCKET", str(server.path))
+    monkeypatch.delenv("TODO_DURABILITY", raising=False)
+    served = RemoteStorage(server.path).durability()
+    other = "none" if served != "none" else "always"
+
+    result = runner.invoke(app, ["--durability", other, "add", "Lost?"])
+    assert result.exit_code == 1
+    assert "restart it" in result.stdout
+    assert server.storage.get_all() == []
+
+    assert runner.invoke(app, ["--durability", served, "add", "Kept"]).exit_code == 0
+    assert runner.invoke(app, ["add", "Default"]).exit_code == 0
+    assert [t.title for t in server.storage.get_all()] == ["Kept", "Default"]
@@ -0,0 +1,119 @@
+"""Tests for atomic writes and the fsync policy."""
+import os
+import time
+
+import pytest
+
+from todo_cli import durability
+from todo_cli.durability import Durability, Syncer, atomic_write
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """Count calls to os.fsync."""
+    calls = []
+    real = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (calls.append(fd), real(fd)))
+    return calls
+
+
+def test_always_syncs_file_and_directory(tmp_path, fsyncs):
+    """Test that the always policy fsyncs the data and the rename."""
+    atomic_write(tmp_path / "f", b"data", Syncer(Durability.ALWAYS))
+    assert (tmp_path / "f").read_bytes() == b"data"
+    assert len(fsyncs) == 2
+
+
+def test_none_never_syncs(tmp_path, fsyncs):
+    """Test that the none policy leaves flushing to the OS."""
+    syncer = Syncer(Durability.NONE)
+    for _ in range(3):
+        atomic_write(tmp_path / "f", b"data", syncer)
+    assert fsyncs == []
+
+
+def test_interval_batches_syncs(tmp_path, fsyncs):
+    """Test that the interval policy syncs at most once per interval."""
+    syncer = Syncer(Durability.INTERVAL, interval=60)
+    for _ in range(5):
+        atomic_write(tmp_path / "f", b"data", syncer)
+    assert len(fsyncs) == 2
+    syncer._last -= 60
+    assert syncer.due()
+
+
+def test_atomic_write_keeps_backup(tmp_path):
+    """Test that the replaced version is kept as the backup."""
+    path, backup = tmp_path / "f", tmp_path / "f.bak"
+    syncer = Syncer(Durability.NONE)
+    atomic_write(path, b"one", syncer, backup=backup)
+    assert not backup.exists()
+    atomic_write(path, b"two", syncer, backup=backup)
+    assert path.read_bytes() == b"two"
+    assert backup.read_bytes() == b"one"
+
+
+def test_backup_without_hard_links(tmp_path, monkeypatch):
+    """Test that the backup is copied where hard links are not supported."""
+    def no_links(src, dst):
+        raise PermissionError("Operation not permitted")
+
+    monkeypatch.setattr(os, "link", no_links)
+    path, backup = tmp_path / "f", tmp_path / "f.bak"
+    syncer = Syncer(Durability.NONE)
+    atomic_write(path, b"one", syncer, backup=backup)
+    atomic_write(path, b"two", syncer, backup=backup)
+    assert path.read_bytes() == b"two"
+    assert backup.read_bytes() == b"one"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["f", "f.bak"]
+
+
+def test_failed_write_leaves_target_alone(tmp_path, monkeypatch):
+    """Test that a failing write neither touches the target nor leaves temp files."""
+    path = tmp_path / "f"
+    path.write_bytes(b"old")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        atomic_write(path, b"new", Syncer(Durability.NONE))
+    assert path.read_bytes() == b"old"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["f"]
+
+
+def test_interval_flushes_skipped_writes(monkeypatch):
+    """Test that writes the interval policy skipped are synced once writes stop."""
+    syncs = []
+    monkeypatch.setattr(os, "sync", lambda: syncs.append(1), raising=False)
+    syncer = Syncer(Durability.INTERVAL, interval=0.05)
+    assert syncer.due()
+    assert not syncer.due()
+    assert not syncer.due()
+    assert syncs == []
+    deadline = time.monotonic() + 5
+    while not syncs and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert syncs == [1]
+
+    syncer.flush()
+    assert syncs == [1]
+
+
+def test_configure_sets_default_policy(monkeypatch):
+    """Test that configure changes the policy of syncers made afterwards."""
+    monkeypatch.setattr(durability, "POLICY", Durability.ALWAYS)
+    durability.configure(Durability.NONE)
+    assert Syncer().policy == Durability.NONE
+    assert Syncer(Durability.INTERVAL).policy == Durability.INTERVAL
+
+
+def test_policy_from_environment(monkeypatch):
+    """Test that TODO_DURABILITY is read when a store opens, and checked."""
+    monkeypatch.setattr(durability, "POLICY", None)
+    monkeypatch.setenv("TODO_DURABILITY", "interval")
+    assert Syncer().policy == Durability.INTERVAL
+    monkeypatch.setenv("TODO_DURABILITY", "bogus")
+    with pytest.raises(ValueError, match="TODO_DURABILITY must be one of always, interval, none"):
+        Syncer()
@@ -0,0 +1,78 @@
+"""Tests for the on-disk store format."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from todo_cli import fileformat
+from todo_cli.fileformat import FileFormat
+
+RECORDS = [
+    {"id": 1, "title": "Café", "description": None, "status": "pending", "created_at": "2024-01-01T00:00:00"},
+    {"id": 2, "title": "b", "description": "x", "status": "done", "created_at": "2024-01-02T00:00:00"},
+]
+
+
+@pytest.mark.parametrize("layout", list(FileFormat))
+def test_round_trip(layout):
+    """Test that both layouts decode to the records and report themselves."""
+    data = fileformat.encode(RECORDS, layout)
+    assert fileformat.decode(data) == (fileformat.FORMAT_VERSION, layout, RECORDS)
+
+
+def test_compact_layout_is_one_record_per_line():
+    """Test that the compact layout is plain JSON after the header, a record per line."""
+    data = fileformat.encode(RECORDS)
+    header, body = data.split(b"\n", 1)
+    assert json.loads(header)["version"] == fileformat.FORMAT_VERSION
+    assert json.loads(body) == RECORDS
+    assert len(body.splitlines()) == 2 + len(RECORDS)
+    assert len(data) < len(fileformat.encode(RECORDS, FileFormat.PRETTY))
+    assert fileformat.encode([]).endswith(b"\n[]\n")
+
+
+def test_legacy_files():
+    """Test that a headerless array is read as version 1."""
+    assert fileformat.decode(json.dumps(RECORDS, indent=2).encode()) == (1, FileFormat.PRETTY, RECORDS)
+    assert fileformat.decode(b"") == (1, FileFormat.PRETTY, [])
+
+
+def test_rejects_newer_or_foreign_headers():
+    """Test that unknown versions and formats are refused."""
+    with pytest.raises(ValueError, match="version 3"):
+        fileformat.read_header(b'{"format":"todo-cli","version":3}\n[]')
+    with pytest.raises(ValueError):
+        fileformat.read_header(b'{"format":"other"}\n[]')
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+def test_codecs_agree(codec):
+    """Test that the stdlib fallback and orjson write files the other can read."""
+    if codec == "orjson" and fileformat.orjson is None:
+        pytest.skip("orjson not installed")
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    script = (
+        "import sys; from todo_cli import fileformat as f; "
+        "sys.stdout.buffer.write(f.CODEC.encode() + b'\\n' + f.encode(" + repr(RECORDS) + "))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script],
+        env=dict(os.environ, PYTHONPATH=src, TODO_CODEC=codec),
+        capture_output=True,
+        check=True,
+    ).stdout
+    name, data = out.split(b"\n", 1)
+    assert name.decode() == codec
+    assert fileformat.decode(data)[2] == RECORDS
+
+
+def test_meta_in_header():
+    """Test that header metadata round-trips without disturbing the records."""
+    meta = {"next_id": 3, "counts": {"pending": 1, "done": 1}, "modified": None}
+    data = fileformat.encode(RECORDS, meta=meta)
+    assert fileformat.read_meta(data) == meta
+    assert fileformat.decode(data)[2] == RECORDS
+    assert fileformat.read_meta(fileformat.encode(RECORDS)) is None
+    assert fileformat.read_meta(json.dumps(RECORDS).encode()) is None
@@ -0,0 +1,247 @@
+"""Tests for journal storage."""
+import json
+
+import pytest
+
+from todo_cli import fileformat
+from todo_cli.journal import JournalTodoStorage
+from todo_cli.models import Todo, TodoStatus
+from todo_cli.storage import TodoStorage
+
+
+@pytest.fixture
+def journal_storage(tmp_path):
+    """Create a temporary journal storage instance without auto-compaction."""
+    filepath = tmp_path / "todos.json"
+    return JournalTodoStorage(str(filepath), compact_min_bytes=1 << 30, compact_max_bytes=1 << 30)
+
+
+def test_journal_files_created(journal_storage):
+    """Test that snapshot and journal files are created."""
+    assert journal_storage.filepath.exists()
+    assert journal_storage.journal_path.exists()
+
+
+def test_crud(journal_storage):
+    """Test create, read, update and delete."""
+    t1 = journal_storage.create("First", "Desc")
+    t2 = journal_storage.create("Second")
+    assert (t1.id, t2.id) == (1, 2)
+
+    updated = journal_storage.update(t1.id, status=TodoStatus.DONE)
+    assert updated.status == TodoStatus.DONE
+    assert journal_storage.get_by_id(t1.id).status == TodoStatus.DONE
+
+    assert journal_storage.delete(t2.id) is True
+    assert journal_storage.delete(t2.id) is False
+    assert journal_storage.get_by_id(t2.id) is None
+    assert journal_storage.update(999, title="x") is None
+    assert [t.title for t in journal_storage.get_all()] == ["First"]
+    assert journal_storage.get_all(status=TodoStatus.PENDING) == []
+
+
+def test_mutations_append_without_rewriting_snapshot(journal_storage):
+    """Test that writes only append to the journal."""
+    snapshot = journal_storage.filepath.read_text()
+    journal_storage.create("First")
+    journal_storage.update(1, title="Renamed")
+    journal_storage.delete(1)
+
+    assert journal_storage.filepath.read_text() == snapshot
+    lines = journal_storage.journal_path.read_text().splitlines()
+    assert [json.loads(line)["op"] for line in lines] == ["put", "put", "del"]
+
+
+def test_invalid_status_is_not_journaled(journal_storage):
+    """Test that a rejected update leaves the journal replayable."""
+    journal_storage.create("First")
+    with pytest.raises(ValueError):
+        journal_storage.update(1, status="bogus")
+
+    assert len(journal_storage.journal_path.read_text().splitlines()) == 1
+    fresh = JournalTodoStorage(str(journal_storage.filepath))
+    assert fresh.get_by_id(1).status == TodoStatus.PENDING
+
+
+def test_replay_from_new_instance(journal_storage):
+    """Test that a new instance rebuilds state from snapshot and journal."""
+    journal_storage.create("First")
+    journal_storage.create("Second")
+    journal_storage.update(2, status=TodoStatus.DONE)
+
+    reopened = JournalTodoStorage(str(journal_storage.filepath))
+    todos = reopened.get_all()
+    assert [t.title for t in todos] == ["First", "Second"]
+    assert todos[1].status == TodoStatus.DONE
+    assert reopened.create("Third").id == 3
+
+
+def test_sees_other_writers(journal_storage):
+    """Test that appends from another instance are picked up."""
+    other = JournalTodoStorage(str(journal_storage.filepath))
+    other.create("From other")
+    assert journal_storage.get_by_id(1).title == "From other"
+    assert journal_storage.create("Mine").id == 2
+
+
+def test_torn_tail_is_skipped(journal_storage):
+    """Test that a partial trailing record does not break replay."""
+    journal_storage.create("First")
+    with open(journal_storage.journal_path, "a") as f:
+        f.write('{"op":"put","todo":{"id":')
+    journal_storage.create("Second")
+
+    reopened = JournalTodoStorage(str(journal_storage.filepath))
+    assert [t.title for t in reopened.get_all()] == ["First", "Second"]
+
+
+def test_compact(journal_storage):
+    """Test that compaction folds the journal into the snapshot."""
+    journal_storage.create("First")
+    journal_storage.create("Second")
+    journal_storage.delete(1)
+    journal_storage.compact()
+
+    assert journal_storage.journal_path.read_text() == ""
+    _, _, records = fileformat.decode(journal_storage.filepath.read_bytes())
+    assert [t["title"] for t in records] == ["Second"]
+    # A plain JSON storage can read the compacted snapshot.
+    assert [t.title for t in TodoStorage(str(journal_storage.filepath)).get_all()] == ["Second"]
+    assert journal_storage.create("Third").id == 3
+
+
+def test_other_instance_after_compaction(journal_storage):
+    """Test that a compaction by one instance is detected by another."""
+    other = JournalTodoStorage(str(journal_storage.filepath))
+    journal_storage.create("First")
+    journal_storage.compact()
+    journal_storage.create("Second")
+    assert [t.title for t in other.get_all()] == ["First", "Second"]
+
+
+def test_concurrent_compactions_lose_nothing(journal_storage, monkeypatch):
+    """Test that two compactors whose temp writes interleave keep every todo."""
+    import threading
+    from pathlib import Path
+
+    for i in range(3):
+        journal_storage.create(f"t{i + 1}")
+    events = {name: threading.Event() for name in ("slow_encoded", "fast_written", "slow_written", "fast_done")}
+    write_bytes = Path.write_bytes
+
+    def interleaved_write(path, data):
+        name = threading.current_thread().name
+        if ".compact" not in path.name or name not in ("slow", "fast"):
+            return write_bytes(path, data)
+        if name == "slow":
+            # Older snapshot, written after the fast compactor wrote its own.
+            events["slow_encoded"].set()
+            events["fast_written"].wait(5)
+            result = write_bytes(path, data)
+            events["slow_written"].set()
+            events["fast_done"].wait(5)
+            return result
+        result = write_bytes(path, data)
+        events["fast_written"].set()
+        events["slow_written"].wait(5)
+        return result
+
+    monkeypatch.setattr(Path, "write_bytes", interleaved_write)
+    errors = []
+
+    def compact(storage):
+        try:
+            storage.compact()
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    slow = threading.Thread(target=compact, args=(JournalTodoStorage(str(journal_storage.filepath)),), name="slow")
+    slow.start()
+    assert events["slow_encoded"].wait(5)
+    journal_storage.create("t4")
+    journal_storage.create("t5")
+    fast = threading.Thread(target=compact, args=(journal_storage,), name="fast")
+    fast.start()
+    fast.join()
+    events["fast_done"].set()
+    slow.join()
+    monkeypatch.undo()
+
+    assert errors == []
+    reopened = JournalTodoStorage(str(journal_storage.filepath))
+    assert [t.title for t in reopened.get_all()] == ["t1", "t2", "t3", "t4", "t5"]
+    assert not list(journal_storage.filepath.parent.glob("*.compact"))
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_auto_compaction(tmp_path, background):
+    """Test that crossing the size threshold triggers compaction."""
+    storage = JournalTodoStorage(
+        str(tmp_path / "todos.json"),
+        compact_min_bytes=0,
+        compact_max_bytes=500,
+        compact_ratio=100.0,
+        background=background,
+    )
+    for i in range(20):
+        storage.create(f"Todo {i}")
+    storage.wait_for_compaction()
+
+    assert fileformat.decode(storage.filepath.read_bytes())[2]
+    reopened = JournalTodoStorage(str(storage.filepath))
+    assert len(reopened.get_all()) == 20
+
+
+def test_import_todos_in_chunks(journal_storage):
+    """Test that bulk import appends one journal write per chunk."""
+    from todo_cli.models import Todo
+
+    journal_storage.create("Existing")
+    count = journal_storage.import_todos((Todo(id=0, title=f"Imported {i}") for i in range(5)), chunk_size=2)
+    assert count == 5
+    assert [t.id for t in journal_storage.iter_todos()] == [1, 2, 3, 4, 5, 6]
+
+    with pytest.raises(ValueError):
+        journal_storage.import_todos([Todo(id=1, title="Clash")], keep_ids=True)
+
+
+def test_search(journal_storage):
+    """Test search before and after compaction."""
+    journal_storage.create("Buy groceries")
+    journal_storage.create("Write report", "groceries budget")
+    assert [t.id for t in journal_storage.search("groceries")] == [1, 2]
+
+    journal_storage.delete(1)
+    journal_storage.compact()
+    journal_storage.create("More groceries")
+    assert [t.id for t in journal_storage.search("groceries")] == [3, 2]
+
+
+def test_iter_todos_in_id_order_after_keep_ids_import(journal_storage):
+    """Test that a lower imported id is paged in id order."""
+    journal_storage.create("Gone")
+    journal_storage.create("Three")
+    journal_storage.delete(1)
+    journal_storage.import_todos([Todo(id=1, title="One")], keep_ids=True)
+    assert [t.id for t in journal_storage.iter_todos(after_id=0, limit=2)] == [1, 2]
+    journal_storage.compact()
+    reopened = JournalTodoStorage(str(journal_storage.filepath))
+    assert [t.title for t in reopened.get_all()] == ["One", "Three"]
+
+
+def test_stats(journal_storage):
+    """Test that counts follow the journal and ids stay retired after compaction."""
+    journal_storage.create("First")
+    journal_storage.create("Second")
+    journal_storage.update(1, status=TodoStatus.DONE)
+    journal_storage.delete(2)
+
+    other = JournalTodoStorage(str(journal_storage.filepath))
+    stats = other.stats()
+    assert (stats.counts, stats.next_id) == ({"pending": 0, "done": 1}, 3)
+    assert stats.modified is not None
+
+    journal_storage.compact()
+    reopened = JournalTodoStorage(str(journal_storage.filepath))
+    assert reopened.stats().next_id == 3
+    assert reopened.create("Third").id == 3
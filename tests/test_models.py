@@ -1,7 +1,7 @@
 """Tests for todo models."""
 import pytest
 
-from todo_cli.models import Todo, TodoStatus
+from todo_cli.models import Todo, TodoColumns, TodoStatus
 
 
 def test_todo_creation():
@@ -46,3 +46,60 @@ def test_todo_from_dict():
     assert todo.title == "Test"
     assert todo.description == "Desc"
     assert todo.status == TodoStatus.DONE
+
+
+def test_todo_is_slotted():
+    """Test that todos carry no per-instance __dict__."""
+    todo = Todo(id=1, title="Test")
+    assert not hasattr(todo, "__dict__")
+
+
+def test_from_dict_keeps_created_at(monkeypatch):
+    """Test that the created_at default is only computed when missing."""
+    import todo_cli.models as models
+
+    class NoNow:
+        @staticmethod
+        def now():
+            raise AssertionError("datetime.now() called")
+
+    monkeypatch.setattr(models, "datetime", NoNow)
+    todo = Todo.from_dict({"id": 1, "title": "Test", "created_at": "2025-12-30T00:00:00"})
+    assert todo.created_at == "2025-12-30T00:00:00"
+
+
+def test_from_dict_defaults():
+    """Test defaults for missing optional fields."""
+    todo = Todo.from_dict({"id": 1, "title": "Test"})
+    assert todo.status == TodoStatus.PENDING
+    assert todo.description is None
+    assert todo.created_at
+    with pytest.raises(ValueError):
+        Todo.from_dict({"id": 1, "title": "Test", "status": "bogus"})
+
+
+def test_columns_round_trip():
+    """Test that columns materialise the same todos they were built from."""
+    todos = [
+        Todo(id=1, title="First", created_at="2025-12-30T10:11:12.123456"),
+        Todo(id=2, title="Second", description="Desc", status=TodoStatus.DONE, created_at="2025-12-31T00:00:00"),
+        Todo(id=3, title="Aware", created_at="2025-12-31T00:00:00+02:00"),
+        Todo(id=4, title="Odd", created_at="not a date"),
+    ]
+    columns = TodoColumns.from_records(t.to_dict() for t in todos)
+    assert len(columns) == 4
+    assert list(columns) == todos
+    assert columns[-1] == todos[-1]
+    assert columns.created[1] - columns.created[0] == 49_727_876_544
+
+
+def test_columns_filter_status():
+    """Test filtering columns by status."""
+    columns = TodoColumns.from_records(
+        Todo(id=i, title=f"Todo {i}", status=TodoStatus.DONE if i % 3 == 0 else TodoStatus.PENDING).to_dict()
+        for i in range(1, 10)
+    )
+    done = columns.filter_status(TodoStatus.DONE)
+    assert list(done.ids) == [3, 6, 9]
+    assert [t.title for t in done] == ["Todo 3", "Todo 6", "Todo 9"]
+    assert len(columns.filter_status(TodoStatus.PENDING)) == 6
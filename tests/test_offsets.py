@@ -0,0 +1,107 @@
+"""Tests for the offset-indexed JSON storage."""
+import pytest
+
+from todo_cli import fileformat
+from todo_cli.fileformat import FileFormat
+from todo_cli.models import TodoStatus
+from todo_cli.offsets import IndexedTodoStorage, OffsetIndex, scan_offsets
+from todo_cli.storage import TodoStorage
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    """Path of a store seeded with three todos."""
+    path = tmp_path / "todos.json"
+    storage = IndexedTodoStorage(str(path))
+    for title in ("First", "Second", "Third"):
+        storage.create(title)
+    return path
+
+
+def test_save_writes_matching_offsets(store_path):
+    """The sidecar written on save locates every record line."""
+    data = store_path.read_bytes()
+    index = OffsetIndex(store_path.with_name("todos.json.offsets"))
+    for todo_id, offset, length in scan_offsets(data):
+        assert index.lookup(todo_id) == (offset, length)
+        assert fileformat.loads(data[offset:offset + length])["id"] == todo_id
+    assert index.lookup(99) is None
+    index.close()
+
+
+def test_get_by_id_reads_one_record(store_path, monkeypatch):
+    """A fresh instance answers point lookups without loading the file."""
+    storage = IndexedTodoStorage(str(store_path))
+    monkeypatch.setattr(storage, "_load", lambda: pytest.fail("loaded whole file"))
+    assert storage.get_by_id(2).title == "Second"
+    assert storage.get_by_id(42) is None
+
+
+def test_complete_updates_in_place(store_path):
+    """Completing a todo rewrites only its line; other readers see it."""
+    reader = TodoStorage(str(store_path))
+    assert reader.get_by_id(1).status == TodoStatus.PENDING
+    size = store_path.stat().st_size
+    inode = store_path.stat().st_ino
+
+    storage = IndexedTodoStorage(str(store_path))
+    todo = storage.update(1, status=TodoStatus.DONE)
+
+    assert todo.status == TodoStatus.DONE
+    assert store_path.stat().st_size == size
+    assert store_path.stat().st_ino == inode
+    assert reader.get_by_id(1).status == TodoStatus.DONE
+    assert storage.get_by_id(1).status == TodoStatus.DONE
+    assert [t.title for t in reader.get_all()] == ["First", "Second", "Third"]
+
+
+def test_growing_update_rewrites_file(store_path):
+    """An update that no longer fits its line falls back to a full save."""
+    storage = IndexedTodoStorage(str(store_path))
+    storage.update(2, title="Second, with a much longer title")
+
+    assert storage.get_by_id(2).title == "Second, with a much longer title"
+    fresh = IndexedTodoStorage(str(store_path))
+    assert fresh.get_by_id(3).title == "Third"
+    assert fresh.update(9, status=TodoStatus.DONE) is None
+
+
+def test_external_write_rebuilds_index(store_path):
+    """Writes by the plain backend invalidate the sidecar."""
+    storage = IndexedTodoStorage(str(store_path))
+    assert storage.get_by_id(1).title == "First"
+
+    other = TodoStorage(str(store_path))
+    other.delete(1)
+    other.create("Fourth")
+
+    assert storage.get_by_id(1) is None
+    assert storage.get_by_id(4).title == "Fourth"
+
+
+def test_pretty_store_is_converted(tmp_path):
+    """A pretty store is read without the index and saved compact."""
+    path = tmp_path / "todos.json"
+    TodoStorage(str(path), file_format=FileFormat.PRETTY).create("Only")
+
+    storage = IndexedTodoStorage(str(path))
+    assert storage.get_by_id(1).title == "Only"
+    storage.update(1, status=TodoStatus.DONE)
+
+    assert fileformat.decode(path.read_bytes())[1] == FileFormat.COMPACT
+    assert TodoStorage(str(path)).get_by_id(1).status == TodoStatus.DONE
+
+
+def test_in_place_update_patches_stats(store_path):
+    """An in-place update keeps the header stats current without moving records."""
+    storage = IndexedTodoStorage(str(store_path))
+    size = store_path.stat().st_size
+    before = storage.stats()
+    storage.update(2, status=TodoStatus.DONE)
+
+    assert store_path.stat().st_size == size
+    stats = TodoStorage(str(store_path)).stats()
+    assert stats.counts == {"pending": 2, "done": 1}
+    assert stats.next_id == 4
+    assert stats.modified > before.modified
+    assert storage.get_by_id(3).title == "Third"
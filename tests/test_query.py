@@ -0,0 +1,123 @@
+"""Tests for filtered, sorted queries."""
+import random
+from datetime import datetime
+
+import pytest
+
+from todo_cli.archive import PartitionedTodoStorage
+from todo_cli.journal import JournalTodoStorage
+from todo_cli.models import Todo, TodoStatus
+from todo_cli.query import Query, SortKey, TodoIndex, scan
+from todo_cli.sqlite_storage import SqliteTodoStorage
+from todo_cli.storage import TodoStorage
+
+TITLES = ["Fix bug", "fix docs", "Feature", "alpha", "Zebra", "fixture", "Écrire"]
+
+
+def make_records(count=60, seed=7):
+    """Records with shuffled creation times and repeated title prefixes."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "title": f"{rng.choice(TITLES)} {i}",
+            "description": None,
+            "status": rng.choice(["pending", "done"]),
+            "created_at": datetime(2025, 1, 1 + rng.randrange(28), rng.randrange(24)).isoformat(),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+QUERIES = [
+    Query(),
+    Query(reverse=True, limit=5),
+    Query(status=TodoStatus.DONE, sort=SortKey.CREATED),
+    Query(since=datetime(2025, 1, 10), until=datetime(2025, 1, 12)),
+    Query(since=datetime(2025, 1, 20), sort=SortKey.CREATED, reverse=True, limit=4, offset=2),
+    Query(title_prefix="FIX", sort=SortKey.TITLE),
+    Query(title_prefix="fix", sort=SortKey.CREATED, status=TodoStatus.PENDING),
+    Query(title_prefix="é"),
+    Query(title_prefix="nothing"),
+    Query(sort=SortKey.TITLE, reverse=True, after_id=30, limit=10),
+    Query(until=datetime(2025, 1, 5), title_prefix="f", sort=SortKey.ID),
+]
+
+
+def ids(records):
+    return [r["id"] for r in records]
+
+
+def expected(records, query):
+    """Brute-force answer to ``query``."""
+    matches = sorted((r for r in records if query.matches(r)), key=query.sort_key(), reverse=query.reverse)
+    stop = None if query.limit is None else query.offset + query.limit
+    return ids(matches[query.offset:stop])
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_index_matches_scan(query):
+    """Index lookups return the same rows and order as a full scan."""
+    records = make_records()
+    by_id = {r["id"]: r for r in records}
+    assert ids(TodoIndex(records).select(query, by_id)) == expected(records, query)
+    assert ids(scan(records, query)) == expected(records, query)
+
+
+def test_index_maintenance():
+    """Added, changed and removed records are reflected in range lookups."""
+    records = make_records()
+    by_id = {r["id"]: r for r in records}
+    index = TodoIndex(records)
+
+    by_id[3] = dict(by_id[3], title="Fix renamed", created_at="2025-03-01T00:00:00")
+    index.add(by_id[3])
+    del by_id[4]
+    index.remove(4)
+    by_id[99] = {"id": 99, "title": "fix new", "status": "pending", "created_at": "2025-03-02T00:00:00"}
+    index.add(by_id[99])
+
+    records = list(by_id.values())
+    for query in QUERIES + [Query(since=datetime(2025, 2, 1), sort=SortKey.CREATED)]:
+        assert ids(index.select(query, by_id)) == expected(records, query)
+    assert len(index) == len(by_id)
+
+
+@pytest.fixture(params=["json", "journal", "sqlite", "partitioned"])
+def storage(request, tmp_path):
+    """Each backend, seeded with the same todos."""
+    path = str(tmp_path / "todos.json")
+    storage = {
+        "json": lambda: TodoStorage(path),
+        "journal": lambda: JournalTodoStorage(path),
+        "sqlite": lambda: SqliteTodoStorage(str(tmp_path / "todos.db"), migrate_from=None),
+        "partitioned": lambda: PartitionedTodoStorage(path, archive_after=None),
+    }[request.param]()
+    storage.import_todos([Todo.from_dict(r) for r in make_records(30)], keep_ids=True)
+    if request.param == "partitioned":
+        storage.archive()
+    return storage
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_backends_agree(storage, query):
+    """Every backend answers queries like the brute-force reference."""
+    if query.title_prefix == "é" and isinstance(storage, SqliteTodoStorage):
+        pytest.skip("SQLite NOCASE only folds ASCII")
+    assert [t.id for t in storage.query(query)] == expected(make_records(30), query)
+
+
+def test_query_index_follows_writes(tmp_path):
+    """The JSON backend keeps its indexes current across writes."""
+    storage = TodoStorage(str(tmp_path / "todos.json"))
+    storage.create("Fix one")
+    assert [t.title for t in storage.query(Query(title_prefix="fix"))] == ["Fix one"]
+    index = storage._query_index
+
+    storage.create("fix two")
+    storage.update(1, title="Done with it")
+    assert [t.title for t in storage.query(Query(title_prefix="fix"))] == ["fix two"]
+    assert storage._query_index is index
+
+    TodoStorage(str(tmp_path / "todos.json")).create("Fix three")
+    assert [t.id for t in storage.query(Query(title_prefix="fix"))] == [2, 3]
@@ -0,0 +1,59 @@
+"""Tests for the search index."""
+import sqlite3
+
+import pytest
+
+from todo_cli.search import SearchIndex, term_frequencies, tokenize
+
+
+@pytest.fixture
+def index():
+    """Create an in-memory search index."""
+    idx = SearchIndex(sqlite3.connect(":memory:"))
+    idx.rebuild([
+        {"id": 1, "title": "Buy groceries", "description": "milk and eggs"},
+        {"id": 2, "title": "Write report", "description": "quarterly groceries budget"},
+        {"id": 3, "title": "Fix bug", "description": None},
+    ])
+    yield idx
+    idx.close()
+
+
+def test_tokenize():
+    """Test that text is split into lowercase words."""
+    assert tokenize("Buy MILK, eggs!") == ["buy", "milk", "eggs"]
+    assert tokenize(None) == []
+
+
+def test_title_terms_weigh_more():
+    """Test that title words outweigh description words."""
+    tf = term_frequencies({"title": "milk", "description": "milk bread"})
+    assert tf["milk"] > tf["bread"]
+
+
+def test_ranks_title_matches_first(index):
+    """Test that a title match ranks above a description match."""
+    assert [i for i, _ in index.search("groceries")] == [1, 2]
+
+
+def test_all_words_must_match(index):
+    """Test AND semantics across query words."""
+    assert [i for i, _ in index.search("groceries milk")] == [1]
+    assert index.search("groceries bug") == []
+
+
+def test_prefix_matching(index):
+    """Test that words match by prefix unless disabled."""
+    assert [i for i, _ in index.search("groc")] == [1, 2]
+    assert index.search("groc", prefix=False) == []
+
+
+def test_upsert_and_remove(index):
+    """Test incremental maintenance."""
+    index.upsert([{"id": 3, "title": "Fix groceries app", "description": None}])
+    assert 3 in [i for i, _ in index.search("groceries")]
+    assert index.search("bug") == []
+
+    index.remove([1, 3])
+    assert [i for i, _ in index.search("groceries")] == [2]
+    assert index.records([2, 1]) == [{"id": 2, "title": "Write report", "description": "quarterly groceries budget"}]
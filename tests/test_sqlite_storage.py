@@ -0,0 +1,178 @@
+"""Tests for SQLite storage."""
+import pytest
+
+from todo_cli.models import Todo, TodoStatus
+from todo_cli.sqlite_storage import SqliteTodoStorage
+from todo_cli.storage import TodoStorage
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    """Create a temporary SQLite storage instance."""
+    storage = SqliteTodoStorage(str(tmp_path / "todos.db"), migrate_from=None)
+    yield storage
+    storage.close()
+
+
+def test_wal_mode(sqlite_storage):
+    """Test that the database runs in WAL mode."""
+    mode = sqlite_storage._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_crud(sqlite_storage):
+    """Test create, read, update and delete."""
+    t1 = sqlite_storage.create("First", "Desc")
+    t2 = sqlite_storage.create("Second")
+    assert (t1.id, t2.id) == (1, 2)
+    assert sqlite_storage.get_by_id(1).description == "Desc"
+
+    updated = sqlite_storage.update(t2.id, title="Renamed", status=TodoStatus.DONE)
+    assert updated.title == "Renamed"
+    assert updated.status == TodoStatus.DONE
+    assert sqlite_storage.update(999, title="x") is None
+
+    assert [t.title for t in sqlite_storage.get_all(status=TodoStatus.PENDING)] == ["First"]
+    assert [t.title for t in sqlite_storage.get_all(status=TodoStatus.DONE)] == ["Renamed"]
+
+    assert sqlite_storage.delete(t1.id) is True
+    assert sqlite_storage.delete(t1.id) is False
+    assert sqlite_storage.get_by_id(t1.id) is None
+
+
+def test_update_rejects_unknown_field(sqlite_storage):
+    """Test that updates only touch known columns."""
+    sqlite_storage.create("First")
+    with pytest.raises(ValueError):
+        sqlite_storage.update(1, **{"title = 'x' --": "y"})
+
+
+def test_status_filter_uses_index(sqlite_storage):
+    """Test that status filtering is an index lookup."""
+    plan = sqlite_storage._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM todos WHERE status = ? ORDER BY id", ("pending",)
+    ).fetchall()
+    assert any("idx_todos_status" in row[3] for row in plan)
+
+
+def test_title_prefix_uses_index(sqlite_storage):
+    """Test that title prefix queries are an index range scan."""
+    plan = sqlite_storage._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM todos WHERE title >= ? COLLATE NOCASE AND title < ? COLLATE NOCASE",
+        ("fix", "fix\U0010ffff"),
+    ).fetchall()
+    assert any("idx_todos_title" in row[3] for row in plan)
+
+
+def test_schema_upgrade_skips_migration(tmp_path):
+    """Test that upgrading a version 1 database adds indexes without re-importing JSON."""
+    json_storage = TodoStorage(str(tmp_path / "todos.json"))
+    json_storage.create("First")
+    db = str(tmp_path / "todos.db")
+    storage = SqliteTodoStorage(db, migrate_from=str(json_storage.filepath))
+    with storage._conn:
+        storage._conn.execute("DROP INDEX idx_todos_title")
+        storage._conn.execute("PRAGMA user_version = 1")
+    storage.close()
+
+    reopened = SqliteTodoStorage(db, migrate_from=str(json_storage.filepath))
+    assert len(reopened.get_all()) == 1
+    indexes = {row[1] for row in reopened._conn.execute("PRAGMA index_list(todos)")}
+    assert "idx_todos_title" in indexes
+    reopened.close()
+
+
+def test_migrates_json_once(tmp_path):
+    """Test the one-shot migration from a JSON store."""
+    json_storage = TodoStorage(str(tmp_path / "todos.json"))
+    json_storage.create("First")
+    json_storage.create("Second")
+    json_storage.update(2, status=TodoStatus.DONE)
+
+    db = str(tmp_path / "todos.db")
+    storage = SqliteTodoStorage(db, migrate_from=str(json_storage.filepath))
+    todos = storage.get_all()
+    assert [(t.id, t.title, t.status) for t in todos] == [
+        (1, "First", TodoStatus.PENDING),
+        (2, "Second", TodoStatus.DONE),
+    ]
+    assert storage.create("Third").id == 3
+    storage.close()
+
+    json_storage.create("Added after migration")
+    reopened = SqliteTodoStorage(db, migrate_from=str(json_storage.filepath))
+    assert len(reopened.get_all()) == 3
+    reopened.close()
+
+
+def test_import_and_iterate(sqlite_storage):
+    """Test chunked import and keyset-paged iteration."""
+    from todo_cli.models import Todo
+
+    count = sqlite_storage.import_todos((Todo(id=0, title=f"Imported {i}") for i in range(5)), chunk_size=2)
+    assert count == 5
+    sqlite_storage.update(3, status=TodoStatus.DONE)
+
+    assert [t.id for t in sqlite_storage.iter_todos(batch_size=2)] == [1, 2, 3, 4, 5]
+    assert [t.id for t in sqlite_storage.iter_todos(status=TodoStatus.DONE)] == [3]
+
+    with pytest.raises(ValueError):
+        sqlite_storage.import_todos([Todo(id=1, title="Clash")], keep_ids=True)
+
+
+def test_search(sqlite_storage):
+    """Test that search is kept in step with every mutation."""
+    sqlite_storage.create("Buy groceries")
+    assert [t.id for t in sqlite_storage.search("groc")] == [1]
+
+    sqlite_storage.import_todos([Todo(id=0, title="Groceries again")])
+    sqlite_storage.update(1, title="Buy milk")
+    assert [t.id for t in sqlite_storage.search("groceries")] == [2]
+    sqlite_storage.delete(2)
+    assert sqlite_storage.search("groceries") == []
+
+
+def test_search_index_maintained_by_older_handles(tmp_path):
+    """Test that a connection opened before the index existed still maintains it."""
+    path = str(tmp_path / "todos.db")
+    a = SqliteTodoStorage(path, migrate_from=None)
+    b = SqliteTodoStorage(path, migrate_from=None)
+    b.create("Buy milk")
+    assert b.search("zebra") == []
+
+    a.create("Zebra crossing")
+    a.update(1, title="Zebra milk")
+    fresh = SqliteTodoStorage(path, migrate_from=None)
+    assert [t.id for t in fresh.search("zebra")] == [1, 2]
+    for storage in (a, b, fresh):
+        storage.close()
+
+
+def test_stats_maintained_by_triggers(sqlite_storage):
+    """Test counts, the id high-water mark and the write time."""
+    sqlite_storage.create("First")
+    sqlite_storage.create("Second")
+    sqlite_storage.update(1, status=TodoStatus.DONE)
+    sqlite_storage.update(1, title="First!")
+    sqlite_storage.delete(2)
+
+    stats = sqlite_storage.stats()
+    assert (stats.counts, stats.next_id) == ({"pending": 0, "done": 1}, 3)
+    assert stats.modified is not None
+    assert sqlite_storage.create("Third").id == 3
+
+
+def test_schema_upgrade_counts_existing_rows(tmp_path):
+    """Test that upgrading a version 2 database fills in the stats tables."""
+    db = str(tmp_path / "todos.db")
+    storage = SqliteTodoStorage(db, migrate_from=None)
+    storage.create("First")
+    storage.create("Second")
+    with storage._conn:
+        storage._conn.execute("DROP TABLE todo_counts")
+        storage._conn.execute("PRAGMA user_version = 2")
+    storage.close()
+
+    reopened = SqliteTodoStorage(db, migrate_from=None)
+    assert reopened.stats().counts == {"pending": 2, "done": 0}
+    reopened.close()
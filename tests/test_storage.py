@@ -1,8 +1,13 @@
 """Tests for todo storage."""
+import json
+import os
+
 import pytest
 from pathlib import Path
 
-from todo_cli.models import TodoStatus
+from todo_cli import fileformat
+from todo_cli.fileformat import FileFormat
+from todo_cli.models import Todo, TodoStatus
 from todo_cli.storage import TodoStorage
 
 
@@ -97,3 +102,312 @@ def test_auto_increment_id(temp_storage):
     assert t1.id == 1
     assert t2.id == 2
     assert t3.id == 3
+
+
+def test_reads_reuse_cache(temp_storage, monkeypatch):
+    """Test that repeated reads do not re-read an unchanged file."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+
+    reads = []
+    original = Path.read_text
+    monkeypatch.setattr(Path, "read_text", lambda self, *a, **kw: reads.append(self) or original(self, *a, **kw))
+
+    assert temp_storage.get_by_id(2).title == "Second"
+    assert len(temp_storage.get_all()) == 2
+    temp_storage.create("Third")
+    assert reads == []
+
+
+def test_cache_sees_external_writes(temp_storage):
+    """Test that the cache is revalidated against changes by other writers."""
+    temp_storage.create("First")
+    assert temp_storage.get_by_id(1).title == "First"
+
+    other = TodoStorage(str(temp_storage.filepath))
+    other.update(1, title="Changed elsewhere")
+    other.create("Added elsewhere")
+
+    assert temp_storage.get_by_id(1).title == "Changed elsewhere"
+    assert temp_storage.create("Mine").id == 3
+
+
+def test_failed_save_drops_cache(temp_storage, monkeypatch):
+    """Test that a failed write does not leave a modified cache behind."""
+    temp_storage.create("Original")
+
+    def fail(self, *args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(Path, "write_bytes", fail)
+    with pytest.raises(OSError):
+        temp_storage.update(1, title="Lost")
+    monkeypatch.undo()
+
+    assert temp_storage.get_by_id(1).title == "Original"
+
+
+def _create_many(filepath, prefix, count):
+    """Create todos from a separate process."""
+    storage = TodoStorage(filepath)
+    for i in range(count):
+        storage.create(f"{prefix}-{i}")
+
+
+def test_concurrent_processes_do_not_lose_writes(temp_storage):
+    """Test that concurrent writer processes neither lose updates nor reuse ids."""
+    import multiprocessing
+
+    procs = [
+        multiprocessing.Process(target=_create_many, args=(str(temp_storage.filepath), f"p{n}", 25))
+        for n in range(4)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    todos = temp_storage.get_all()
+    assert len(todos) == 100
+    assert sorted(t.id for t in todos) == list(range(1, 101))
+
+
+def test_index_failure_after_save_is_not_a_failed_write(temp_storage, monkeypatch):
+    """Test that a write succeeds once saved, even if updating indexes fails."""
+    temp_storage.create("First")
+    temp_storage.search("first")
+
+    def broken(*args):
+        raise RuntimeError("index is read-only")
+
+    monkeypatch.setattr(temp_storage, "_after_save", broken)
+    with pytest.warns(UserWarning, match="updating its indexes failed"):
+        todo = temp_storage.create("Second")
+    monkeypatch.undo()
+
+    assert todo.id == 2
+    assert [t.title for t in TodoStorage(str(temp_storage.filepath)).get_all()] == ["First", "Second"]
+    assert [t.id for t in temp_storage.search("second")] == [2]
+
+
+def test_concurrent_threads_are_group_committed(temp_storage, monkeypatch):
+    """Test that writers arriving during a commit share the next one."""
+    import threading
+    import time
+
+    saves = []
+    original = TodoStorage._save
+
+    def slow_save(self, todos):
+        saves.append(len(todos))
+        time.sleep(0.05)
+        original(self, todos)
+
+    monkeypatch.setattr(TodoStorage, "_save", slow_save)
+
+    threads = [threading.Thread(target=temp_storage.create, args=(f"t{i}",)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(temp_storage.get_all()) == 20
+    assert sorted(t.id for t in temp_storage.get_all()) == list(range(1, 21))
+    assert len(saves) < 20
+
+
+def test_iter_todos(temp_storage):
+    """Test lazily iterating todos."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+    temp_storage.update(2, status=TodoStatus.DONE)
+
+    it = temp_storage.iter_todos()
+    assert next(it).title == "First"
+    assert [t.title for t in temp_storage.iter_todos(status=TodoStatus.DONE)] == ["Second"]
+
+
+def test_import_todos(temp_storage):
+    """Test bulk import with renumbered and kept ids."""
+    temp_storage.create("Existing")
+    count = temp_storage.import_todos(Todo(id=0, title=f"Imported {i}") for i in range(3))
+    assert count == 3
+    assert [t.id for t in temp_storage.get_all()] == [1, 2, 3, 4]
+
+    assert temp_storage.import_todos([Todo(id=10, title="Kept")], keep_ids=True) == 1
+    assert temp_storage.get_by_id(10).title == "Kept"
+    assert temp_storage.create("Next").id == 11
+
+    with pytest.raises(ValueError):
+        temp_storage.import_todos([Todo(id=1, title="Clash")], keep_ids=True)
+    assert temp_storage.get_by_id(1).title == "Existing"
+
+
+def test_iter_todos_paging(temp_storage):
+    """Test limit, offset and cursor paging."""
+    for i in range(1, 8):
+        temp_storage.create(f"Todo {i}")
+    temp_storage.update(2, status=TodoStatus.DONE)
+
+    assert [t.id for t in temp_storage.iter_todos(limit=3)] == [1, 2, 3]
+    assert [t.id for t in temp_storage.iter_todos(limit=3, offset=3)] == [4, 5, 6]
+    assert [t.id for t in temp_storage.iter_todos(limit=3, after_id=5)] == [6, 7]
+    assert [t.id for t in temp_storage.iter_todos(status=TodoStatus.PENDING, limit=2, offset=1)] == [3, 4]
+
+
+def test_iter_todos_decodes_incrementally(tmp_path, monkeypatch):
+    """Test that a page from a cold store is decoded without parsing the whole file."""
+    import todo_cli.storage as storage_module
+
+    filepath = tmp_path / "todos.json"
+    TodoStorage(str(filepath)).import_todos(
+        (Todo(id=0, title=f"Todo {i}", description="x" * 50) for i in range(500))
+    )
+    monkeypatch.setattr(storage_module, "READ_CHUNK", 256)
+    monkeypatch.setattr(storage_module.json, "loads", lambda *a, **kw: pytest.fail("full parse"))
+
+    cold = TodoStorage(str(filepath))
+    assert [t.id for t in cold.iter_todos(limit=3, offset=10)] == [11, 12, 13]
+    assert len(list(cold.iter_todos())) == 500
+
+
+def test_iter_records_handles_empty_and_compact_files(temp_storage):
+    """Test the incremental decoder on empty and minified files."""
+    temp_storage.filepath.write_text("")
+    assert list(temp_storage._iter_records()) == []
+    temp_storage.filepath.write_text('[{"id":1,"title":"a","status":"pending"},{"id":2,"title":"b","status":"done"}]')
+    assert [r["id"] for r in temp_storage._iter_records()] == [1, 2]
+
+
+def test_get_columns(temp_storage):
+    """Test bulk reads into compact columns."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+    temp_storage.update(2, status=TodoStatus.DONE)
+
+    columns = temp_storage.get_columns()
+    assert list(columns.ids) == [1, 2]
+    assert list(columns) == temp_storage.get_all()
+    assert [t.title for t in temp_storage.get_columns(status=TodoStatus.DONE)] == ["Second"]
+
+
+def test_search(temp_storage):
+    """Test search with incremental index maintenance."""
+    temp_storage.create("Buy groceries", "milk")
+    temp_storage.create("Write report")
+    assert [t.id for t in temp_storage.search("groc")] == [1]
+    assert temp_storage.index_path.exists()
+
+    temp_storage.update(2, title="Report groceries spend")
+    temp_storage.delete(1)
+    assert [t.title for t in temp_storage.search("groceries")] == ["Report groceries spend"]
+
+
+def test_search_rebuilds_after_external_write(temp_storage):
+    """Test that a write that skipped the index triggers a rebuild."""
+    temp_storage.create("Buy groceries")
+    temp_storage.search("groceries")
+
+    temp_storage.filepath.write_text('[{"id": 7, "title": "Pay taxes", "status": "pending", "created_at": "2024-01-01T00:00:00"}]')
+    assert [t.id for t in TodoStorage(str(temp_storage.filepath)).search("taxes")] == [7]
+    assert temp_storage.search("groceries") == []
+
+
+def test_legacy_file_is_converted_on_open(tmp_path):
+    """Test that a headerless pretty store is rewritten in the compact format."""
+    path = tmp_path / "todos.json"
+    path.write_text(json.dumps([{"id": 1, "title": "Old", "status": "done", "created_at": "2024-01-01T00:00:00"}], indent=2))
+    storage = TodoStorage(str(path))
+    version, layout, _ = fileformat.read_header(path.read_bytes())
+    assert (version, layout) == (fileformat.FORMAT_VERSION, FileFormat.COMPACT)
+    assert storage.get_by_id(1).title == "Old"
+
+
+def test_convert_keeps_layout(temp_storage):
+    """Test that a converted layout is kept by later saves, even by other instances."""
+    temp_storage.create("First")
+    assert temp_storage.convert(FileFormat.PRETTY) == 1
+    TodoStorage(str(temp_storage.filepath)).create("Second")
+    assert fileformat.read_header(temp_storage.filepath.read_bytes())[1] == FileFormat.PRETTY
+    assert [t.title for t in temp_storage.get_all()] == ["First", "Second"]
+
+
+def test_stats_read_from_header(temp_storage, monkeypatch):
+    """Test that stats come from the header record, not a load of the todos."""
+    for title in ("First", "Second", "Third"):
+        temp_storage.create(title)
+    temp_storage.update(2, status=TodoStatus.DONE)
+
+    reader = TodoStorage(str(temp_storage.filepath))
+    monkeypatch.setattr(reader, "_load", lambda: pytest.fail("loaded the todos"))
+    stats = reader.stats()
+    assert stats.counts == {"pending": 2, "done": 1}
+    assert stats.total == 3
+    assert stats.next_id == 4
+    assert stats.modified is not None
+
+
+def test_stats_of_legacy_file(tmp_path):
+    """Test that a store without a stats record is counted instead."""
+    path = tmp_path / "todos.json"
+    path.write_bytes(fileformat.encode([Todo(id=5, title="Old").to_dict()]))
+    stats = TodoStorage(str(path)).stats()
+    assert (stats.counts, stats.next_id, stats.modified) == ({"pending": 1, "done": 0}, 6, None)
+
+
+def test_ids_are_not_reused(temp_storage):
+    """Test that deleting the newest todo does not free its id, across instances."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+    temp_storage.delete(2)
+
+    assert TodoStorage(str(temp_storage.filepath)).create("Third").id == 3
+    temp_storage.delete(3)
+    assert temp_storage.stats().next_id == 4
+    assert temp_storage.create("Fourth").id == 4
+
+
+def test_save_keeps_previous_version(temp_storage):
+    """Test that each save keeps the version it replaces as a backup."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+    assert len(TodoStorage(str(temp_storage.backup_path)).get_all()) == 1
+
+
+def test_truncated_file_is_restored_from_backup(temp_storage):
+    """Test that opening a torn store restores the last good copy."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+    data = temp_storage.filepath.read_bytes()
+    temp_storage.filepath.write_bytes(data[:len(data) // 2])
+
+    with pytest.warns(UserWarning, match="incomplete"):
+        storage = TodoStorage(str(temp_storage.filepath))
+    assert [t.title for t in storage.get_all()] == ["First"]
+    kept = list(temp_storage.filepath.parent.glob("todos.json.corrupt-*"))
+    assert len(kept) == 1 and kept[0].read_bytes() == data[:len(data) // 2]
+
+
+def test_restore_without_hard_links(temp_storage, monkeypatch):
+    """Test that recovery copies the damaged file where hard links are unsupported."""
+    temp_storage.create("First")
+    temp_storage.create("Second")
+    data = temp_storage.filepath.read_bytes()
+    temp_storage.filepath.write_bytes(data[:len(data) // 2])
+
+    def no_links(src, dst):
+        raise PermissionError("Operation not permitted")
+
+    monkeypatch.setattr(os, "link", no_links)
+    with pytest.warns(UserWarning, match="incomplete"):
+        storage = TodoStorage(str(temp_storage.filepath))
+    assert [t.title for t in storage.get_all()] == ["First"]
+    assert len(list(temp_storage.filepath.parent.glob("todos.json.corrupt-*"))) == 1
+
+
+def test_damaged_file_without_backup_raises(tmp_path):
+    """Test that a damaged store with nothing to restore is not silently emptied."""
+    filepath = tmp_path / "todos.json"
+    filepath.write_text('{"version": 2, "todos": [{"id": 1')
+    with pytest.raises(ValueError, match="no intact backup"):
+        TodoStorage(str(filepath))
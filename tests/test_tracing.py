@@ -0,0 +1,82 @@
+"""Tests for operation tracing."""
+import io
+import json
+
+import pytest
+
+from todo_cli import tracing
+from todo_cli.storage import TodoStorage
+
+
+@pytest.fixture
+def traced():
+    """Enable tracing for one test."""
+    tracing.reset()
+    tracing.enable()
+    yield
+    tracing.disable()
+    tracing.reset()
+
+
+def test_disabled_span_is_shared_noop():
+    """Test that spans cost nothing while tracing is off."""
+    assert not tracing.ENABLED
+    with tracing.span("anything") as span:
+        span.add(records=1)
+    assert tracing.span("other") is span
+    assert tracing.events() == []
+
+
+def test_span_records_time_and_counts(traced):
+    """Test that enabled spans record wall time and counters."""
+    with tracing.span("phase", records=2) as span:
+        span.add(bytes_read=10)
+        span.add(bytes_read=5)
+    (event,) = tracing.events()
+    assert event["name"] == "phase"
+    assert event["ms"] >= 0
+    assert event["records"] == 2
+    assert event["bytes_read"] == 15
+
+
+def test_summary_aggregates_phases(traced, tmp_path):
+    """Test per-phase aggregation over storage operations."""
+    storage = TodoStorage(str(tmp_path / "todos.json"))
+    storage.create("First")
+    storage._cache = None
+    storage.get_all()
+
+    phases = tracing.summary()
+    assert phases["storage.write"]["calls"] == 1
+    assert phases["storage.write"]["bytes_written"] == storage.filepath.stat().st_size
+    assert phases["storage.read"]["bytes_read"] > 0
+    assert phases["model.from_dict"]["records"] == 1
+
+    out = io.StringIO()
+    tracing.print_summary(out)
+    assert "storage.decode" in out.getvalue()
+
+
+def test_write_jsonl(traced, tmp_path):
+    """Test writing spans as JSON lines."""
+    with tracing.span("one"):
+        pass
+    with tracing.span("two"):
+        pass
+    path = tmp_path / "trace.jsonl"
+    tracing.write_jsonl(str(path))
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["one", "two"]
+
+
+def test_long_traces_stay_bounded(traced, monkeypatch):
+    """Test that raw spans are capped while the summary still counts every span."""
+    from collections import deque
+
+    monkeypatch.setattr(tracing, "_events", deque(maxlen=3))
+    for i in range(10):
+        with tracing.span("tick", records=1):
+            pass
+
+    assert len(tracing.events()) == 3
+    assert tracing.summary()["tick"]["calls"] == 10
+    assert tracing.summary()["tick"]["records"] == 10
@@ -0,0 +1,107 @@
+"""Tests for import/export formats."""
+import io
+import json
+
+import pytest
+
+from todo_cli.models import Todo, TodoStatus
+from todo_cli.transfer import (
+    ListFormat,
+    TransferFormat,
+    chunked,
+    detect_format,
+    read_records,
+    validate_records,
+    write_listing,
+    write_records,
+)
+
+
+def test_detect_format():
+    """Test format detection from file extensions."""
+    assert detect_format("todos.csv") == TransferFormat.CSV
+    assert detect_format("todos.jsonl") == TransferFormat.JSONL
+    assert detect_format(None) == TransferFormat.JSONL
+
+
+def test_chunked():
+    """Test splitting a stream into chunks."""
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+    with pytest.raises(ValueError, match="at least 1"):
+        list(chunked(range(5), 0))
+
+
+@pytest.mark.parametrize("fmt", list(TransferFormat))
+def test_round_trip(fmt):
+    """Test writing and reading back todos."""
+    todos = [
+        Todo(id=1, title="First", description="Desc", created_at="2025-12-30T00:00:00"),
+        Todo(id=2, title="Second, with comma", status=TodoStatus.DONE, created_at="2025-12-31T00:00:00"),
+    ]
+    fp = io.StringIO()
+    assert write_records(iter(todos), fp, fmt) == 2
+
+    fp.seek(0)
+    assert list(validate_records(read_records(fp, fmt), keep_ids=True)) == todos
+
+
+def test_validate_assigns_placeholder_ids():
+    """Test that ids are optional unless they are kept."""
+    todos = list(validate_records([{"title": "No id"}]))
+    assert todos[0].id == 0
+    assert todos[0].status == TodoStatus.PENDING
+
+
+def test_validate_rejects_bad_records():
+    """Test that invalid records are reported with their position."""
+    with pytest.raises(ValueError, match="record 2"):
+        list(validate_records([{"title": "ok"}, {"title": "bad", "status": "nope"}]))
+    with pytest.raises(ValueError, match="record 1"):
+        list(validate_records([{"title": "missing id"}], keep_ids=True))
+    with pytest.raises(ValueError, match="record 2.*expected an object"):
+        list(validate_records([{"title": "ok"}, [1]]))
+
+
+def test_read_rejects_unparseable_records():
+    """Test that parse errors name the record."""
+    with pytest.raises(ValueError, match="record 2"):
+        list(read_records(io.StringIO('{"title": "ok"}\n\n{oops\n'), TransferFormat.JSONL))
+    with pytest.raises(ValueError, match="record 1"):
+        list(read_records(io.StringIO("id,title\nabc,x\n"), TransferFormat.CSV))
+
+
+def test_write_listing_formats():
+    """Test the machine-readable list formats."""
+    todos = [
+        Todo(id=1, title="Tab\there", description="Two\nlines", created_at="2025-12-30T00:00:00"),
+        Todo(id=2, title="Second", status=TodoStatus.DONE, created_at="2025-12-31T00:00:00"),
+    ]
+
+    def render(fmt, items):
+        fp = io.StringIO()
+        assert write_listing(iter(items), fp, fmt) == len(items)
+        return fp.getvalue()
+
+    assert render(ListFormat.IDS, todos) == "1\n2\n"
+    assert json.loads(render(ListFormat.JSON, todos)) == [t.to_dict() for t in todos]
+    assert json.loads(render(ListFormat.JSON, [])) == []
+    assert [json.loads(line) for line in render(ListFormat.JSONL, todos).splitlines()] == [
+        t.to_dict() for t in todos
+    ]
+    assert render(ListFormat.TSV, todos).splitlines() == [
+        "id\tstatus\tcreated_at\ttitle\tdescription",
+        "1\tpending\t2025-12-30T00:00:00\tTab\\there\tTwo\\nlines",
+        "2\tdone\t2025-12-31T00:00:00\tSecond\t",
+    ]
+    with pytest.raises(ValueError):
+        render(ListFormat.TABLE, todos)
+
+
+def test_write_listing_batches(monkeypatch):
+    """Test that listings spanning several batches stay well-formed."""
+    monkeypatch.setattr("todo_cli.transfer.WRITE_BATCH", 2)
+    todos = [Todo(id=i, title=f"Todo {i}") for i in range(1, 6)]
+    fp = io.StringIO()
+    write_listing(iter(todos), fp, ListFormat.JSON)
+    assert [r["id"] for r in json.loads(fp.getvalue())] == [1, 2, 3, 4, 5]
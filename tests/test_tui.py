@@ -0,0 +1,201 @@
+"""Tests for the terminal UI."""
+import asyncio
+
+import pytest
+
+from todo_cli.models import Todo, TodoStatus
+from todo_cli.storage import TodoStorage
+from todo_cli.tui import TodoList, TodoTui
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Create storage holding a few thousand todos."""
+    storage = TodoStorage(str(tmp_path / "todos.json"))
+    storage.import_todos(Todo(id=0, title=f"Todo {i}") for i in range(5000))
+    return storage
+
+
+async def settle(app, pilot):
+    """Wait for loads and writes (but not the store watcher) to finish."""
+    for worker in list(app.workers):
+        if worker.group != "watch":
+            await worker.wait()
+    await pilot.pause()
+
+
+def run(app, test):
+    """Run ``test(app, pilot)`` against the app in headless mode."""
+    async def main():
+        async with app.run_test(size=(80, 30)) as pilot:
+            await settle(app, pilot)
+            await test(app, pilot)
+    asyncio.run(main())
+
+
+def test_list_is_virtualised(storage):
+    """Test that a large store mounts no per-todo widgets."""
+    async def check(app, pilot):
+        list_view = app.query_one(TodoList)
+        assert len(list_view.todos) == 5000
+        assert len(app.query("*")) < 50
+        assert "Todo 0" in list_view.render_line(0).text
+
+    run(TodoTui(storage), check)
+
+
+def test_mutations_patch_rows(storage):
+    """Test that complete, delete and add update rows in place."""
+    async def check(app, pilot):
+        list_view = app.query_one(TodoList)
+        todos = list_view.todos
+        list_view.focus()
+        await pilot.press("down", "enter")
+        assert app.selected_todo.id == 2
+
+        app.complete_todo()
+        assert list_view.todos is todos
+        assert todos[1].status == TodoStatus.DONE
+
+        app.selected_todo = todos[2]
+        app.delete_todo()
+        assert list_view.position(3) is None
+        assert len(todos) == 4999
+
+        app.query_one("#title_input").value = "Fresh"
+        app.add_todo()
+        assert [p.title for p in list_view.placeholders] == ["Fresh"]
+        assert list_view.row_count == 5000
+
+        await settle(app, pilot)
+        assert not list_view.pending
+        assert not list_view.placeholders
+        assert todos[-1].title == "Fresh"
+        assert storage.get_by_id(2).status == TodoStatus.DONE
+        assert storage.get_by_id(3) is None
+        assert storage.get_by_id(todos[-1].id).title == "Fresh"
+
+    run(TodoTui(storage), check)
+
+
+def test_failed_write_rolls_back(storage, monkeypatch):
+    """Test that a failed write restores the row and reports the error."""
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    async def check(app, pilot):
+        list_view = app.query_one(TodoList)
+        monkeypatch.setattr(storage, "update", fail)
+        monkeypatch.setattr(storage, "create", fail)
+        app.selected_todo = list_view.todos[0]
+        app.complete_todo()
+        app.query_one("#title_input").value = "Lost"
+        app.add_todo()
+        assert list_view.row_count == 5001
+
+        await settle(app, pilot)
+        assert list_view.todos[0].status == TodoStatus.PENDING
+        assert list_view.row_count == 5000
+        assert "disk full" in str(app.query_one("#status_bar").render())
+
+    run(TodoTui(storage), check)
+
+
+def test_writes_commit_in_order(storage, monkeypatch):
+    """Test that quick successive adds are stored and listed in the order made."""
+    import time
+
+    create = storage.create
+
+    def slow_first(title, description=None):
+        if title == "A":
+            time.sleep(0.2)
+        return create(title, description)
+
+    async def check(app, pilot):
+        list_view = app.query_one(TodoList)
+        monkeypatch.setattr(storage, "create", slow_first)
+        for title in ("A", "B"):
+            app.query_one("#title_input").value = title
+            app.add_todo()
+        await settle(app, pilot)
+        assert [t.title for t in list_view.todos[-2:]] == ["A", "B"]
+        assert list_view.todos[-1].id == list_view.todos[-2].id + 1
+        assert not list_view.placeholders
+
+    run(TodoTui(storage), check)
+
+
+def test_merge_does_not_restore_pending_delete(storage, monkeypatch):
+    """Test that a watcher merge landing before a delete is written keeps the row gone."""
+    import threading
+
+    release = threading.Event()
+    delete = storage.delete
+
+    def blocked_delete(todo_id):
+        release.wait(5)
+        return delete(todo_id)
+
+    async def check(app, pilot):
+        list_view = app.query_one(TodoList)
+        monkeypatch.setattr(storage, "delete", blocked_delete)
+        app.selected_todo = list_view.todos[0]
+        app.delete_todo()
+        list_view.merge(storage.iter_todos())
+        assert list_view.position(1) is None
+        release.set()
+        await settle(app, pilot)
+        assert not list_view.pending
+        assert storage.get_by_id(1) is None
+
+    run(TodoTui(storage), check)
+
+
+def test_external_changes_are_merged(storage):
+    """Test that another process's writes are applied as deltas, keeping the selection."""
+    async def check(app, pilot):
+        list_view = app.query_one(TodoList)
+        todos = list_view.todos
+        app.selected_todo = todos[9]
+
+        other = TodoStorage(str(storage.filepath))
+        other.update(10, title="Renamed elsewhere")
+        other.delete(1)
+        other.create("From cron")
+        for _ in range(100):
+            await pilot.pause(0.05)
+            if todos[-1].title == "From cron" and list_view.position(1) is None:
+                break
+
+        assert list_view.todos is todos
+        assert list_view.position(1) is None
+        assert todos[-1].title == "From cron"
+        assert app.selected_todo.title == "Renamed elsewhere"
+        assert "changed on disk" in str(app.query_one("#status_bar").render())
+
+    run(TodoTui(storage), check)
+
+
+def test_merge_rebuilds_on_bulk_change():
+    """Test that a large external change rebuilds the rows but keeps the cursor."""
+    list_view = TodoList()
+    def todo(i):
+        return Todo(id=i, title=str(i), created_at="2024-01-01T00:00:00")
+
+    list_view.set_todos(todo(i) for i in range(1, 101))
+    list_view.cursor = 49
+    assert list_view.merge(todo(i) for i in range(50, 1000)) == (899, 0, 49)
+    assert list_view.highlighted.id == 50
+    assert len(list_view.todos) == 950
+
+
+def test_upsert_keeps_cursor_on_item():
+    """Test that inserting above the cursor keeps it on the same todo."""
+    list_view = TodoList()
+    list_view.set_todos([Todo(id=2, title="b"), Todo(id=5, title="e")])
+    list_view.cursor = 1
+    list_view.upsert(Todo(id=1, title="a"))
+    assert list_view.highlighted.id == 5
+    list_view.remove(1)
+    assert list_view.highlighted.id == 5
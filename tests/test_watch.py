@@ -0,0 +1,44 @@
+"""Tests for store file watchers."""
+import pytest
+
+from todo_cli.watch import InotifyWatcher, PollingWatcher, open_watcher
+
+
+@pytest.mark.parametrize("polling", [False, True])
+def test_detects_writes_to_watched_files(tmp_path, polling):
+    """Test that writes, replaces and deletes are seen, other files are not."""
+    watched = tmp_path / "todos.json"
+    watched.write_text("[]")
+    watcher = open_watcher([watched], interval=0.01, polling=polling)
+    try:
+        if polling:
+            assert isinstance(watcher, PollingWatcher)
+        assert not watcher.wait(timeout=0.05)
+
+        (tmp_path / "other.txt").write_text("x")
+        assert not watcher.wait(timeout=0.05)
+
+        watched.write_text("[1]")
+        assert watcher.wait(timeout=2)
+
+        replacement = tmp_path / "todos.json.tmp"
+        replacement.write_text("[1, 2]")
+        replacement.replace(watched)
+        assert watcher.wait(timeout=2)
+
+        watched.unlink()
+        assert watcher.wait(timeout=2)
+    finally:
+        watcher.close()
+
+
+def test_inotify_used_on_linux(tmp_path):
+    """Test that inotify is preferred where available."""
+    import sys
+
+    watcher = open_watcher([tmp_path / "todos.json"])
+    try:
+        if sys.platform.startswith("linux"):
+            assert isinstance(watcher, InotifyWatcher)
+    finally:
+        watcher.close()